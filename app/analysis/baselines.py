@@ -0,0 +1,243 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from .bloom_filter import RotatingBloomFilter
+from .quantile_sketch import KLLSketch
+from ..services.async_io import atomic_write_json
+
+# Stats tracked per participant; most match the generate_suggestion thresholds
+BASELINE_METRICS = ('kda', 'deaths', 'vision_score', 'damage_dealt', 'gold_earned', 'cs_per_min')
+
+# A narrower scope needs this many samples before its percentiles are used
+BASELINE_MIN_SAMPLES = int(os.getenv("BASELINE_MIN_SAMPLES", "30"))
+
+# Ingested match ids are remembered in fixed-size Bloom filters of this many ids per generation
+BASELINE_DEDUP_CAPACITY = int(os.getenv("BASELINE_DEDUP_CAPACITY", "200000"))
+
+# Wildcard in a (champion, position, queue) key
+ANY = "*"
+
+# Saved files before version 2 have no cross-queue scopes for matches with a queue
+BASELINES_FORMAT_VERSION = 2
+
+BaselineKey = Tuple[str, str, str]
+
+
+def participant_metrics(participant: Dict, duration: int) -> Dict[str, float]:
+    """Compute BASELINE_METRICS for one match-v5 participant."""
+    deaths = participant['deaths']
+    if deaths > 0:
+        kda = (participant['kills'] + participant['assists']) / deaths
+    else:
+        kda = participant['kills'] + participant['assists']  # Perfect KDA
+    cs = participant['totalMinionsKilled'] + participant['neutralMinionsKilled']
+    return {
+        "kda": kda,
+        "deaths": deaths,
+        "vision_score": participant['visionScore'],
+        "damage_dealt": participant['totalDamageDealtToChampions'],
+        "gold_earned": participant['goldEarned'],
+        "cs_per_min": cs / (duration / 60) if duration > 0 else 0.0
+    }
+
+
+class BaselineEngine:
+    """Population percentiles per champion x position x queue from KLL sketches.
+
+    Every participant of every ingested match updates one sketch per metric
+    in each of its scopes: (champion, position, queue), (champion, *, queue),
+    (*, position, queue) and (*, *, queue), and the same four with queue *.
+    A percentile query uses the narrowest scope with at least min_samples
+    values and costs a binary search, never a scan of stored matches.
+
+    Ingested match ids go into a rotating Bloom filter rather than a set, so
+    memory and the saved file stay bounded. A new match is skipped with
+    probability about 0.1%, and a match ingested more than
+    `dedup_capacity` matches ago may count twice; neither visibly moves a
+    population percentile. Methods are safe to call from several threads.
+    """
+
+    def __init__(self, k: int = 128, min_samples: int = BASELINE_MIN_SAMPLES, dedup_capacity: int = BASELINE_DEDUP_CAPACITY):
+        self.k = k
+        self.min_samples = min_samples
+        self.sketches: Dict[BaselineKey, Dict[str, KLLSketch]] = {}
+        self.seen = RotatingBloomFilter(dedup_capacity)
+        self.matches = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _scopes(champion: str, position: str, queue: str) -> Tuple[BaselineKey, ...]:
+        """Scopes from narrowest to widest; duplicates collapse when a part is already ANY."""
+        return tuple(dict.fromkeys((
+            (champion, position, queue),
+            (champion, ANY, queue),
+            (ANY, position, queue),
+            (ANY, ANY, queue)
+        )))
+
+    @classmethod
+    def _ingest_scopes(cls, champion: str, position: str, queue: str) -> Tuple[BaselineKey, ...]:
+        """Every scope a participant updates: its queue's scopes and the cross-queue ones."""
+        return tuple(dict.fromkeys(cls._scopes(champion, position, queue) + cls._scopes(champion, position, ANY)))
+
+    def _sketches_for(self, key: BaselineKey) -> Dict[str, KLLSketch]:
+        sketches = self.sketches.get(key)
+        if sketches is None:
+            sketches = self.sketches[key] = {metric: KLLSketch(self.k) for metric in BASELINE_METRICS}
+        return sketches
+
+    def has_ingested(self, match_id: str) -> bool:
+        with self._lock:
+            return match_id in self.seen
+
+    def ingest(self, match_data: Dict) -> bool:
+        """Add a match's participants. Returns False if the match was already ingested."""
+        match_id = match_data['metadata']['matchId']
+        if self.has_ingested(match_id):
+            return False
+        info = match_data['info']
+        queue = str(info.get('queueId', ANY))
+        updates = [
+            (self._ingest_scopes(participant['championName'], participant['teamPosition'] or ANY, queue),
+             participant_metrics(participant, info['gameDuration']))
+            for participant in info['participants']
+        ]
+        with self._lock:
+            # Checked again in case another thread ingested it meanwhile
+            if match_id in self.seen:
+                return False
+            self.seen.add(match_id)
+            self.matches += 1
+            for scopes, metrics in updates:
+                for key in scopes:
+                    sketches = self._sketches_for(key)
+                    for metric, value in metrics.items():
+                        sketches[metric].update(value)
+        return True
+
+    def ingest_many(self, matches: Iterable[Dict]) -> int:
+        # One match per lock hold, so queries aren't held up for a whole batch
+        return sum(1 for match_data in matches if self.ingest(match_data))
+
+    def _sketch(
+        self, metric: str, champion: Optional[str], position: Optional[str], queue: Optional[str]
+    ) -> Tuple[Optional[KLLSketch], Optional[BaselineKey]]:
+        """Find the narrowest scope with enough samples for a metric."""
+        if metric not in BASELINE_METRICS:
+            raise ValueError(f"Unknown metric '{metric}', expected one of {', '.join(BASELINE_METRICS)}")
+        scopes = self._scopes(champion or ANY, position or ANY, str(queue) if queue is not None else ANY)
+        fallback = None
+        for key in scopes:
+            sketches = self.sketches.get(key)
+            if sketches is None:
+                continue
+            sketch = sketches[metric]
+            if len(sketch) >= self.min_samples:
+                return sketch, key
+            fallback = fallback or (sketch, key)
+        return fallback or (None, None)
+
+    def percentile(
+        self,
+        metric: str,
+        value: float,
+        champion: Optional[str] = None,
+        position: Optional[str] = None,
+        queue: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Get the population percentile (0-100) of a stat value, or None without data."""
+        with self._lock:
+            sketch, key = self._sketch(metric, champion, position, queue)
+            if sketch is None:
+                return None
+            return {
+                "metric": metric,
+                "value": value,
+                "percentile": round(sketch.rank(value) * 100, 1),
+                "samples": len(sketch),
+                "scope": {"champion": key[0], "position": key[1], "queue": key[2]}
+            }
+
+    def quantiles(
+        self,
+        metric: str,
+        champion: Optional[str] = None,
+        position: Optional[str] = None,
+        queue: Optional[str] = None,
+        fractions: Iterable[float] = (0.1, 0.25, 0.5, 0.75, 0.9)
+    ) -> Optional[Dict]:
+        """Get the stat values at several population fractions, or None without data."""
+        with self._lock:
+            sketch, key = self._sketch(metric, champion, position, queue)
+            if sketch is None:
+                return None
+            return {
+                "metric": metric,
+                "quantiles": {str(q): sketch.quantile(q) for q in fractions},
+                "samples": len(sketch),
+                "scope": {"champion": key[0], "position": key[1], "queue": key[2]}
+            }
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "matches": self.matches,
+                "scopes": len(self.sketches),
+                "retained_values": sum(
+                    sketch.size for sketches in self.sketches.values() for sketch in sketches.values()
+                ),
+                "dedup_bytes": self.seen.nbytes()
+            }
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "version": BASELINES_FORMAT_VERSION,
+                "k": self.k,
+                "matches": self.matches,
+                "seen": self.seen.to_dict(),
+                "sketches": [
+                    {"key": list(key), "metrics": {metric: sketch.to_dict() for metric, sketch in sketches.items()}}
+                    for key, sketches in self.sketches.items()
+                ]
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict, min_samples: int = BASELINE_MIN_SAMPLES) -> "BaselineEngine":
+        engine = cls(data["k"], min_samples)
+        if "seen" in data:
+            engine.seen = RotatingBloomFilter.from_dict(data["seen"])
+            engine.matches = data["matches"]
+        else:
+            # Files saved before the Bloom filter list every ingested id
+            for match_id in data["match_ids"]:
+                engine.seen.add(match_id)
+            engine.matches = len(data["match_ids"])
+        for entry in data["sketches"]:
+            engine.sketches[tuple(entry["key"])] = {
+                metric: KLLSketch.from_dict(sketch) for metric, sketch in entry["metrics"].items()
+            }
+        if data.get("version", 1) < 2:
+            # Older files only hold * queue scopes for matches without a queue; fold the rest in
+            for (champion, position, queue), sketches in list(engine.sketches.items()):
+                if queue == ANY:
+                    continue
+                merged = engine._sketches_for((champion, position, ANY))
+                for metric, sketch in sketches.items():
+                    merged[metric].merge(sketch)
+        return engine
+
+    def save(self, path: str):
+        """Write the baselines to a JSON file, replacing it atomically."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(path, self.to_dict(), separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path: str, min_samples: int = BASELINE_MIN_SAMPLES) -> "BaselineEngine":
+        """Load saved baselines, or start empty if none were saved."""
+        if not Path(path).exists():
+            return cls(min_samples=min_samples)
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f), min_samples)
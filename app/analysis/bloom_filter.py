@@ -0,0 +1,85 @@
+import base64
+import hashlib
+import math
+import zlib
+from typing import Dict, List
+
+
+class BloomFilter:
+    """Fixed-size set membership with false positives but no false negatives."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bit_count = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.bit_count / capacity * math.log(2))))
+        self.bits = bytearray((self.bit_count + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> List[int]:
+        # Double hashing: the i-th position is h1 + i * h2
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bit_count for i in range(self.hash_count)]
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def to_dict(self) -> Dict:
+        return {
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "count": self.count,
+            "bits": base64.b64encode(zlib.compress(bytes(self.bits))).decode()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "BloomFilter":
+        bloom = cls(data["capacity"], data["error_rate"])
+        bloom.bits = bytearray(zlib.decompress(base64.b64decode(data["bits"])))
+        bloom.count = data["count"]
+        return bloom
+
+
+class RotatingBloomFilter:
+    """Two Bloom filter generations, so memory stays fixed however many keys are added.
+
+    Keys go into the current generation; once it holds `capacity` keys it
+    becomes the previous one and the old previous one is dropped. Lookups
+    check both, so a key is remembered for at least `capacity` later adds.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous = BloomFilter(capacity, error_rate)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.current or key in self.previous
+
+    def add(self, key: str):
+        if self.current.count >= self.capacity:
+            self.previous = self.current
+            self.current = BloomFilter(self.capacity, self.error_rate)
+        self.current.add(key)
+
+    def nbytes(self) -> int:
+        return len(self.current.bits) + len(self.previous.bits)
+
+    def to_dict(self) -> Dict:
+        return {"current": self.current.to_dict(), "previous": self.previous.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RotatingBloomFilter":
+        current = BloomFilter.from_dict(data["current"])
+        bloom = cls(current.capacity, current.error_rate)
+        bloom.current = current
+        bloom.previous = BloomFilter.from_dict(data["previous"])
+        return bloom
@@ -0,0 +1,148 @@
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+from . import suggestion_engine
+from .suggestion_engine import generate_suggestion
+from ..ml import performance_model
+from ..ml.performance_model import PerformanceModel
+
+performance = PerformanceModel()
+
+
+def _source_version() -> str:
+    """Hash the source of every module that shapes a match analysis."""
+    digest = hashlib.sha256()
+    for module_file in (__file__, suggestion_engine.__file__, performance_model.__file__):
+        digest.update(Path(module_file).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+# Changes whenever the stats, scoring or suggestion code changes, so cached
+# analyses from older code are never served
+ANALYSIS_VERSION = _source_version()
+
+
+def find_participant(match_data: Dict, puuid: str) -> Optional[Dict]:
+    for participant in match_data['info']['participants']:
+        if participant['puuid'] == puuid:
+            return participant
+    return None
+
+
+def _kda(participant: Dict) -> float:
+    kda = 0.0
+    if participant['deaths'] > 0:
+        kda = (participant['kills'] + participant['assists']) / participant['deaths']
+    elif participant['kills'] + participant['assists'] > 0:
+        kda = participant['kills'] + participant['assists']  # Perfect KDA
+    return round(kda, 2)
+
+
+def _minutes(match_data: Dict) -> float:
+    return max(match_data['info']['gameDuration'], 1) / 60
+
+
+def get_basic_stats(match_data: Dict, participant: Dict) -> Dict:
+    """Get champion, result, KDA, CS and gold for one participant."""
+    minutes = _minutes(match_data)
+    cs = participant['totalMinionsKilled'] + participant['neutralMinionsKilled']
+    return {
+        "champion": participant['championName'],
+        "position": participant['teamPosition'],
+        "win": participant['win'],
+        "kills": participant['kills'],
+        "deaths": participant['deaths'],
+        "assists": participant['assists'],
+        "kda": _kda(participant),
+        "cs": cs,
+        "cs_per_min": round(cs / minutes, 2),
+        "gold_earned": participant['goldEarned'],
+        "gold_per_min": round(participant['goldEarned'] / minutes, 2)
+    }
+
+
+def get_vision_stats(match_data: Dict, participant: Dict) -> Dict:
+    """Get vision score and ward counts for one participant."""
+    return {
+        "vision_score": participant['visionScore'],
+        "vision_score_per_min": round(participant['visionScore'] / _minutes(match_data), 2),
+        "wards_placed": participant.get('wardsPlaced', 0),
+        "wards_killed": participant.get('wardsKilled', 0),
+        "control_wards_bought": participant.get('visionWardsBoughtInGame', 0)
+    }
+
+
+def get_objective_stats(match_data: Dict, participant: Dict) -> Dict:
+    """Get the epic monsters and structures one participant took."""
+    stats = {
+        "dragon_kills": participant.get('dragonKills', 0),
+        "baron_kills": participant.get('baronKills', 0),
+        "turret_kills": participant.get('turretKills', 0),
+        "inhibitor_kills": participant.get('inhibitorKills', 0),
+        "objectives_stolen": participant.get('objectivesStolen', 0)
+    }
+    stats["objectives_secured"] = sum(stats.values())
+    return stats
+
+
+def get_damage_stats(match_data: Dict, participant: Dict) -> Dict:
+    """Get champion damage, damage taken and team damage share for one participant."""
+    team_damage = sum(
+        p['totalDamageDealtToChampions']
+        for p in match_data['info']['participants']
+        if p['teamId'] == participant['teamId']
+    )
+    damage = participant['totalDamageDealtToChampions']
+    return {
+        "damage_dealt": damage,
+        "damage_taken": participant['totalDamageTaken'],
+        "damage_per_min": round(damage / _minutes(match_data), 2),
+        "team_damage_share": round(damage / team_damage * 100, 2) if team_damage else 0.0,
+        "time_ccing_others": participant['timeCCingOthers']
+    }
+
+
+def get_timeline(match_data: Dict, participant: Dict) -> Dict:
+    """Get game length and time spent dead or alive for one participant."""
+    return {
+        "game_start": match_data['info']['gameStartTimestamp'],
+        "game_duration": match_data['info']['gameDuration'],
+        "time_spent_dead": participant['totalTimeSpentDead'],
+        "longest_time_alive": participant.get('longestTimeSpentLiving', 0)
+    }
+
+
+def analyze_match(match_data: Dict, puuid: str) -> Optional[Dict]:
+    """Score and analyze one match for one player, in the MatchAnalysis shape.
+
+    Only the match itself is used, never the player's other games, so the
+    result can be cached for as long as ANALYSIS_VERSION stays the same.
+    Returns None if the player isn't in the match.
+    """
+    participant = find_participant(match_data, puuid)
+    if participant is None:
+        return None
+
+    analysis = {
+        "match_id": match_data['metadata']['matchId'],
+        "basic_stats": get_basic_stats(match_data, participant),
+        "vision_stats": get_vision_stats(match_data, participant),
+        "objective_stats": get_objective_stats(match_data, participant),
+        "damage_stats": get_damage_stats(match_data, participant),
+        "timeline": get_timeline(match_data, participant)
+    }
+    score, text = performance.predict_performance(analysis)
+
+    suggestion = generate_suggestion({
+        **analysis["basic_stats"],
+        "damage_dealt": analysis["damage_stats"]["damage_dealt"],
+        "damage_taken": analysis["damage_stats"]["damage_taken"],
+        "vision_score": analysis["vision_stats"]["vision_score"],
+        "time_ccing_others": analysis["damage_stats"]["time_ccing_others"]
+    })
+    return {
+        **analysis,
+        "performance_score": round(score, 2),
+        "analysis": text,
+        "improvement_suggestions": [suggestion] if suggestion else []
+    }
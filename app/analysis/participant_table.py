@@ -0,0 +1,134 @@
+from typing import Dict, Iterable, List
+import numpy as np
+
+# Numeric participant fields stored as contiguous int32 columns
+INT_COLUMNS = (
+    'championId',
+    'teamId',
+    'kills',
+    'deaths',
+    'assists',
+    'totalDamageDealtToChampions',
+    'totalDamageTaken',
+    'goldEarned',
+    'visionScore',
+    'timeCCingOthers',
+    'totalTimeSpentDead',
+    'totalMinionsKilled',
+    'neutralMinionsKilled',
+    'doubleKills',
+    'tripleKills',
+    'quadraKills',
+    'pentaKills',
+)
+
+# String fields stored as int32 codes into a per-column dictionary
+STRING_COLUMNS = (
+    'puuid',
+    'championName',
+    'teamPosition',
+    'individualPosition',
+)
+
+
+class StringDictionary:
+    """Dictionary encoding for a string column; codes follow first appearance."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def decode(self, code: int) -> str:
+        return self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class ParticipantTable:
+    """Columnar store of participant rows, one row per participant per match.
+
+    Each field lives in its own NumPy array so aggregations over a player's
+    games are vectorized instead of looping over Python objects. Arrays grow
+    by doubling; `column(name)` returns a view of the filled rows.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.capacity = capacity
+        self.dictionaries = {name: StringDictionary() for name in STRING_COLUMNS}
+        self._columns: Dict[str, np.ndarray] = {}
+        for name in INT_COLUMNS:
+            self._columns[name] = np.zeros(capacity, dtype=np.int32)
+        for name in STRING_COLUMNS:
+            self._columns[name] = np.zeros(capacity, dtype=np.int32)
+        self._columns['win'] = np.zeros(capacity, dtype=np.bool_)
+        self._columns['match_row'] = np.zeros(capacity, dtype=np.int32)
+
+    def _reserve(self, rows: int):
+        needed = self.size + rows
+        if needed <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name, array in self._columns.items():
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            self._columns[name] = grown
+        self.capacity = capacity
+
+    def append_match(self, match_row: int, participants: Iterable[Dict]) -> range:
+        """Append the participants of one match from their match-v5 dicts."""
+        participants = list(participants)
+        self._reserve(len(participants))
+        start = self.size
+        columns = self._columns
+        for offset, participant in enumerate(participants):
+            row = start + offset
+            for name in INT_COLUMNS:
+                columns[name][row] = participant[name]
+            for name in STRING_COLUMNS:
+                columns[name][row] = self.dictionaries[name].encode(participant[name])
+            columns['win'][row] = participant['win']
+            columns['match_row'][row] = match_row
+        self.size = start + len(participants)
+        return range(start, self.size)
+
+    def extend(self, other: "ParticipantTable", match_row_offset: int) -> range:
+        """Append every row of another table, e.g. one built in a worker process.
+
+        String codes are translated into this table's dictionaries and
+        match_row values are shifted by match_row_offset.
+        """
+        self._reserve(other.size)
+        start, end = self.size, self.size + other.size
+        columns = self._columns
+        for name in INT_COLUMNS:
+            columns[name][start:end] = other.column(name)
+        for name in STRING_COLUMNS:
+            codes = np.array(
+                [self.dictionaries[name].encode(value) for value in other.dictionaries[name].values],
+                dtype=np.int32
+            )
+            if len(codes):
+                columns[name][start:end] = codes[other.column(name)]
+        columns['win'][start:end] = other.column('win')
+        columns['match_row'][start:end] = other.column('match_row') + match_row_offset
+        self.size = end
+        return range(start, end)
+
+    def column(self, name: str) -> np.ndarray:
+        """Get the filled part of a column."""
+        return self._columns[name][:self.size]
+
+    def decode(self, column: str, code: int) -> str:
+        return self.dictionaries[column].decode(int(code))
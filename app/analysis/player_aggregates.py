@@ -0,0 +1,275 @@
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+
+# Participant fields the running aggregates are built from, in PlayerGame order
+AGGREGATE_FIELDS = (
+    'championName',
+    'teamPosition',
+    'individualPosition',
+    'win',
+    'kills',
+    'deaths',
+    'assists',
+    'totalDamageDealtToChampions',
+    'totalDamageTaken',
+    'goldEarned',
+    'visionScore',
+)
+
+# One game of a player as a tuple of AGGREGATE_FIELDS values
+PlayerGame = Tuple[str, str, str, bool, int, int, int, int, int, int, int]
+
+# Summed counters, kept per player and per champion
+COUNTERS = ('games', 'wins', 'kills', 'deaths', 'assists', 'damage_dealt', 'damage_taken', 'gold', 'vision')
+
+
+def _new_counters() -> Dict[str, int]:
+    return {name: 0 for name in COUNTERS}
+
+
+def _apply(counters: Dict[str, int], game: PlayerGame, sign: int):
+    _, _, _, win, kills, deaths, assists, damage_dealt, damage_taken, gold, vision = game
+    counters['games'] += sign
+    counters['wins'] += sign if win else 0
+    counters['kills'] += sign * kills
+    counters['deaths'] += sign * deaths
+    counters['assists'] += sign * assists
+    counters['damage_dealt'] += sign * damage_dealt
+    counters['damage_taken'] += sign * damage_taken
+    counters['gold'] += sign * gold
+    counters['vision'] += sign * vision
+
+
+def _group_sums(codes: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sum the rows of `values` by code.
+
+    Returns each code, the index of its first occurrence and its summed row,
+    ordered by first occurrence.
+    """
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    sums = np.add.reduceat(values[order], starts, axis=0)
+    firsts = order[starts]
+    by_first = np.argsort(firsts)
+    return sorted_codes[starts][by_first], firsts[by_first], sums[by_first]
+
+
+class _Group:
+    """Counters for one champion or position, plus the row that first introduced it."""
+
+    __slots__ = ('first_row', 'counters', 'positions')
+
+    def __init__(self, first_row: int):
+        self.first_row = first_row
+        self.counters = _new_counters()
+        # individualPosition -> [games, first_row]; only used for champion groups
+        self.positions: Dict[str, list] = {}
+
+
+class PlayerAggregates:
+    """Running totals for one PUUID, kept up to date as games are added and removed.
+
+    Champions and positions keep the order in which they were first played,
+    which is the order a from-scratch pass over the matches produces. Rows are
+    participant-table row numbers, so they grow with insertion order.
+    """
+
+    def __init__(self, games: Iterable[Tuple[int, PlayerGame]] = ()):
+        self.totals = _new_counters()
+        self.champions: Dict[str, _Group] = {}
+        self.positions: Dict[str, _Group] = {}
+        for row, game in games:
+            self.add(row, game)
+
+    @classmethod
+    def from_columns(
+        cls, rows: np.ndarray, columns: Dict[str, np.ndarray], decoded: Dict[str, List[str]]
+    ) -> "PlayerAggregates":
+        """Build the aggregates of many games at once with NumPy group-bys.
+
+        `columns` holds the AGGREGATE_FIELDS values of `rows`, in row order,
+        with string fields as codes into the `decoded` value lists.
+        """
+        aggregates = cls()
+        if len(rows) == 0:
+            return aggregates
+        # One column per COUNTERS entry
+        values = np.stack([
+            np.ones(len(rows), dtype=np.int64),
+            columns['win'].astype(np.int64),
+            columns['kills'],
+            columns['deaths'],
+            columns['assists'],
+            columns['totalDamageDealtToChampions'],
+            columns['totalDamageTaken'],
+            columns['goldEarned'],
+            columns['visionScore'],
+        ], axis=1).astype(np.int64)
+        aggregates.totals = dict(zip(COUNTERS, values.sum(axis=0).tolist()))
+
+        for field, groups in (('championName', aggregates.champions), ('teamPosition', aggregates.positions)):
+            names = decoded[field]
+            codes, firsts, sums = _group_sums(columns[field], values)
+            for code, first, row_sums in zip(codes.tolist(), firsts.tolist(), sums.tolist()):
+                group = groups[names[code]] = _Group(int(rows[first]))
+                group.counters = dict(zip(COUNTERS, row_sums))
+
+        # individualPosition counts per champion, keyed by the (champion, position) code pair
+        champions = columns['championName'].astype(np.int64)
+        individual_positions = columns['individualPosition'].astype(np.int64)
+        position_count = len(decoded['individualPosition'])
+        pairs, firsts, counts = _group_sums(
+            champions * position_count + individual_positions, np.ones((len(rows), 1), dtype=np.int64)
+        )
+        champion_names, position_names = decoded['championName'], decoded['individualPosition']
+        for pair, first, count in zip(pairs.tolist(), firsts.tolist(), counts[:, 0].tolist()):
+            champion, position = divmod(pair, position_count)
+            aggregates.champions[champion_names[champion]].positions[position_names[position]] = [count, int(rows[first])]
+        return aggregates
+
+    def add(self, row: int, game: PlayerGame):
+        """Count a game appended after every game already counted."""
+        champion, team_position, individual_position = game[0], game[1], game[2]
+        _apply(self.totals, game, 1)
+
+        group = self.champions.get(champion)
+        if group is None:
+            group = self.champions[champion] = _Group(row)
+        _apply(group.counters, game, 1)
+        position = group.positions.get(individual_position)
+        if position is None:
+            group.positions[individual_position] = [1, row]
+        else:
+            position[0] += 1
+
+        group = self.positions.get(team_position)
+        if group is None:
+            group = self.positions[team_position] = _Group(row)
+        _apply(group.counters, game, 1)
+
+    def remove(self, row: int, game: PlayerGame) -> bool:
+        """Uncount a game.
+
+        Returns False when the removal changes which game first introduced a
+        champion or position that is still played; the key order can't be
+        fixed from the totals alone, so the caller should rebuild instead.
+        """
+        champion, team_position, individual_position = game[0], game[1], game[2]
+        champion_group = self.champions[champion]
+        position_group = self.positions[team_position]
+        position = champion_group.positions[individual_position]
+        if (
+            (champion_group.first_row == row and champion_group.counters['games'] > 1)
+            or (position_group.first_row == row and position_group.counters['games'] > 1)
+            or (position[1] == row and position[0] > 1)
+        ):
+            return False
+
+        _apply(self.totals, game, -1)
+        _apply(champion_group.counters, game, -1)
+        _apply(position_group.counters, game, -1)
+        position[0] -= 1
+        if position[0] == 0:
+            del champion_group.positions[individual_position]
+        if champion_group.counters['games'] == 0:
+            del self.champions[champion]
+        if position_group.counters['games'] == 0:
+            del self.positions[team_position]
+        return True
+
+    def player_stats(self) -> Dict:
+        """Build the get_player_stats result from the running totals."""
+        totals = self.totals
+        total_matches = totals['games']
+        wins = totals['wins']
+        total_kills = totals['kills']
+        total_deaths = totals['deaths']
+        total_assists = totals['assists']
+
+        # Calculate KDA safely
+        kda = 0.0
+        if total_deaths > 0:
+            kda = (total_kills + total_assists) / total_deaths
+        elif total_kills + total_assists > 0:
+            kda = total_kills + total_assists  # Perfect KDA
+
+        # Calculate win rate safely
+        win_rate = (wins / total_matches * 100) if total_matches > 0 else 0.0
+
+        champions_played = {}
+        for champion, group in self.champions.items():
+            counters = group.counters
+            champions_played[champion] = {
+                "games": counters['games'],
+                "wins": counters['wins'],
+                "kills": counters['kills'],
+                "deaths": counters['deaths'],
+                "assists": counters['assists']
+            }
+
+        positions_played = {}
+        for position, group in self.positions.items():
+            positions_played[position] = {
+                "games": group.counters['games'],
+                "wins": group.counters['wins']
+            }
+
+        return {
+            "total_matches": total_matches,
+            "wins": wins,
+            "losses": total_matches - wins,
+            "win_rate": round(win_rate, 2),
+            "kills": total_kills,
+            "deaths": total_deaths,
+            "assists": total_assists,
+            "kda": round(kda, 2),
+            "total_damage_dealt": totals['damage_dealt'],
+            "total_damage_taken": totals['damage_taken'],
+            "total_gold_earned": totals['gold'],
+            "vision_score": totals['vision'],
+            "champions_played": champions_played,
+            "positions_played": positions_played
+        }
+
+    def champion_stats(self) -> Dict:
+        """Build the get_champion_stats result from the running totals."""
+        champion_stats = {}
+        for champion, group in self.champions.items():
+            counters = group.counters
+            games = counters['games']
+            stats = {
+                "games_played": games,
+                "wins": counters['wins'],
+                "losses": games - counters['wins'],
+                "kills": counters['kills'],
+                "deaths": counters['deaths'],
+                "assists": counters['assists'],
+                "total_damage_dealt": counters['damage_dealt'],
+                "total_damage_taken": counters['damage_taken'],
+                "total_gold_earned": counters['gold'],
+                "vision_score": counters['vision'],
+                "positions": {position: entry[0] for position, entry in group.positions.items()}
+            }
+
+            # Calculate win rate
+            stats["win_rate"] = (stats["wins"] / games * 100) if games > 0 else 0
+
+            # Calculate KDA
+            deaths = stats["deaths"]
+            if deaths > 0:
+                stats["kda"] = (stats["kills"] + stats["assists"]) / deaths
+            else:
+                stats["kda"] = stats["kills"] + stats["assists"]
+
+            # Calculate averages
+            stats["avg_kills"] = stats["kills"] / games if games > 0 else 0
+            stats["avg_deaths"] = stats["deaths"] / games if games > 0 else 0
+            stats["avg_assists"] = stats["assists"] / games if games > 0 else 0
+            stats["avg_damage"] = stats["total_damage_dealt"] / games if games > 0 else 0
+            stats["avg_gold"] = stats["total_gold_earned"] / games if games > 0 else 0
+            stats["avg_vision"] = stats["vision_score"] / games if games > 0 else 0
+
+            champion_stats[champion] = stats
+
+        return champion_stats
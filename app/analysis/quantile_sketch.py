@@ -0,0 +1,125 @@
+import math
+import random
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+
+
+class KLLSketch:
+    """Mergeable streaming quantile sketch (Karnin, Lang and Liberty, 2016).
+
+    Values go into a hierarchy of compactors. An item at level h stands for
+    2**h inserted values. When the sketch is full, the lowest over-capacity
+    compactor is sorted and every other item is promoted one level up, which
+    halves it. Capacities shrink by a factor 2/3 per level below the top, so
+    memory stays O(k) whatever the stream length, with rank error roughly
+    1.7 / k. Two sketches merge by concatenating levels and compacting.
+    """
+
+    C = 2 / 3
+    MIN_CAPACITY = 8
+
+    def __init__(self, k: int = 128, seed: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self.compactors: List[array] = [array('d')]
+        self.size = 0
+        self.max_size = self._capacity(0)
+        self._rng = random.Random(seed)
+        # Sorted values and cumulative weights, rebuilt lazily after updates
+        self._cdf: Optional[Tuple[List[float], List[int]]] = None
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(self.MIN_CAPACITY, int(math.ceil(self.k * self.C ** depth)))
+
+    def _grow(self):
+        self.compactors.append(array('d'))
+        self.max_size = sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def update(self, value: float):
+        self.compactors[0].append(value)
+        self.n += 1
+        self.size += 1
+        self._cdf = None
+        if self.size >= self.max_size:
+            self._compress()
+
+    def _compress(self):
+        for level in range(len(self.compactors)):
+            items = self.compactors[level]
+            if len(items) < self._capacity(level):
+                continue
+            if level + 1 >= len(self.compactors):
+                self._grow()
+            ordered = sorted(items)
+            # An odd item out stays behind at this level: the lowest or highest
+            # at random, since always keeping one end would bias ranks that way
+            kept = None
+            if len(ordered) % 2:
+                kept = ordered.pop() if self._rng.randrange(2) else ordered.pop(0)
+            offset = self._rng.randrange(2)
+            self.compactors[level + 1].extend(ordered[offset::2])
+            self.compactors[level] = array('d', [] if kept is None else [kept])
+            self.size = sum(len(compactor) for compactor in self.compactors)
+            if self.size < self.max_size:
+                break
+
+    def merge(self, other: "KLLSketch"):
+        """Fold another sketch's values into this one."""
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.n += other.n
+        self.size = sum(len(compactor) for compactor in self.compactors)
+        self._cdf = None
+        while self.size >= self.max_size:
+            self._compress()
+
+    def _sorted_weights(self) -> Tuple[List[float], List[int]]:
+        if self._cdf is None:
+            weighted = sorted(
+                (value, 1 << level)
+                for level, items in enumerate(self.compactors)
+                for value in items
+            )
+            self._cdf = ([value for value, _ in weighted], list(accumulate(weight for _, weight in weighted)))
+        return self._cdf
+
+    def rank(self, value: float) -> float:
+        """Estimated fraction of values below `value`, counting ties as half."""
+        values, cumulative = self._sorted_weights()
+        if not values:
+            return 0.0
+        total = cumulative[-1]
+        low = bisect_left(values, value)
+        high = bisect_right(values, value)
+        below = cumulative[low - 1] if low else 0
+        at_or_below = cumulative[high - 1] if high else 0
+        return (below + at_or_below) / 2 / total
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at fraction q (0..1) of the distribution."""
+        values, cumulative = self._sorted_weights()
+        if not values:
+            return None
+        target = q * cumulative[-1]
+        index = bisect_left(cumulative, target)
+        return values[min(index, len(values) - 1)]
+
+    def __len__(self) -> int:
+        return self.n
+
+    def to_dict(self) -> Dict:
+        return {"k": self.k, "n": self.n, "compactors": [list(items) for items in self.compactors]}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "KLLSketch":
+        sketch = cls(data["k"])
+        sketch.compactors = [array('d', items) for items in data["compactors"]] or [array('d')]
+        sketch.n = data["n"]
+        sketch.size = sum(len(compactor) for compactor in sketch.compactors)
+        sketch.max_size = sum(sketch._capacity(level) for level in range(len(sketch.compactors)))
+        return sketch
@@ -1,16 +1,35 @@
-from typing import Dict, List, Optional
+import gc
+import json
+import pickle
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from bisect import bisect_left, insort
+import numpy as np
 from .suggestion_engine import generate_suggestion
+from .participant_table import ParticipantTable
+from .player_aggregates import AGGREGATE_FIELDS, PlayerAggregates, PlayerGame
+from .trends import TREND_WINDOW, PlayerTrends, TrendGame
+from ..services.match_store import MatchStore
+
+# Matches are kept for as long as the analyzer lives, so every model class
+# uses __slots__ rather than a per-instance __dict__.
 
 @dataclass
 class PerkStats:
+    __slots__ = ('defense', 'flex', 'offense')
     defense: int
     flex: int
     offense: int
 
 @dataclass
 class PerkStyleSelection:
+    __slots__ = ('perk', 'var1', 'var2', 'var3')
     perk: int
     var1: int
     var2: int
@@ -18,17 +37,78 @@ class PerkStyleSelection:
 
 @dataclass
 class PerkStyle:
+    __slots__ = ('description', 'selections', 'style')
     description: str
     selections: List[PerkStyleSelection]
     style: int
 
 @dataclass
 class Perks:
+    __slots__ = ('statPerks', 'styles')
     statPerks: PerkStats
     styles: List[PerkStyle]
 
+# Perks packed into nested tuples:
+# ((defense, flex, offense), ((description, style, ((perk, var1, var2, var3), ...)), ...))
+PackedPerks = Tuple
+
+def pack_perks(data: Dict) -> PackedPerks:
+    """Pack a match-v5 perks dict into nested tuples."""
+    stat_perks = data['statPerks']
+    return (
+        (stat_perks['defense'], stat_perks['flex'], stat_perks['offense']),
+        tuple(
+            (
+                style['description'],
+                style['style'],
+                tuple(
+                    (selection['perk'], selection['var1'], selection['var2'], selection['var3'])
+                    for selection in style['selections']
+                )
+            )
+            for style in data['styles']
+        )
+    )
+
+def unpack_perks(packed: PackedPerks) -> Perks:
+    """Build the Perks model from packed perks."""
+    stat_perks, styles = packed
+    return Perks(
+        statPerks=PerkStats(*stat_perks),
+        styles=[
+            PerkStyle(
+                description=description,
+                selections=[PerkStyleSelection(*selection) for selection in selections],
+                style=style
+            )
+            for description, style, selections in styles
+        ]
+    )
+
+# Challenge key tuples shared by every participant with the same set of keys
+_challenge_keys: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+def split_challenges(data: Dict) -> Tuple[Tuple[str, ...], Tuple]:
+    """Split a challenges dict into a shared key tuple and a value tuple."""
+    keys = tuple(data)
+    return _challenge_keys.setdefault(keys, keys), tuple(data.values())
+
 @dataclass
 class Participant:
+    """One player's stats in a match.
+
+    Perks and challenges are stored packed and only turned into a Perks model
+    and a dict the first time they are read.
+    """
+    __slots__ = (
+        'puuid', 'summonerId', 'summonerName', 'championId', 'championName', 'teamId',
+        'teamPosition', 'individualPosition', 'win', 'kills', 'deaths', 'assists',
+        'totalDamageDealtToChampions', 'totalDamageTaken', 'goldEarned', 'visionScore',
+        'timeCCingOthers', 'totalTimeSpentDead', 'doubleKills', 'tripleKills', 'quadraKills',
+        'pentaKills', 'totalMinionsKilled', 'neutralMinionsKilled', 'totalDamageDealt',
+        'magicDamageDealt', 'physicalDamageDealt', 'trueDamageDealt',
+        'packedPerks', 'challengeKeys', 'challengeValues', '_perks', '_challenges'
+    )
     puuid: str
     summonerId: str
     summonerName: str
@@ -57,17 +137,39 @@ class Participant:
     magicDamageDealt: int
     physicalDamageDealt: int
     trueDamageDealt: int
-    perks: Perks
-    challenges: Dict
+    packedPerks: PackedPerks
+    challengeKeys: Tuple[str, ...]
+    challengeValues: Tuple
+
+    def __post_init__(self):
+        self._perks: Optional[Perks] = None
+        self._challenges: Optional[Dict] = None
+
+    @property
+    def perks(self) -> Perks:
+        if self._perks is None:
+            self._perks = unpack_perks(self.packedPerks)
+        return self._perks
+
+    @property
+    def challenges(self) -> Dict:
+        if self._challenges is None:
+            self._challenges = dict(zip(self.challengeKeys, self.challengeValues))
+        return self._challenges
 
 @dataclass
 class Team:
+    __slots__ = ('teamId', 'win', 'objectives')
     teamId: int
     win: bool
     objectives: Dict
 
 @dataclass
 class MatchInfo:
+    __slots__ = (
+        'gameId', 'gameCreation', 'gameDuration', 'gameEndTimestamp', 'gameStartTimestamp',
+        'gameMode', 'gameType', 'gameVersion', 'mapId', 'participants', 'teams', 'queueId'
+    )
     gameId: int
     gameCreation: int
     gameDuration: int
@@ -83,28 +185,142 @@ class MatchInfo:
 
 @dataclass
 class MatchMetadata:
+    __slots__ = ('dataVersion', 'matchId', 'participants')
     dataVersion: str
     matchId: str
     participants: List[str]
 
 @dataclass
 class Match:
+    __slots__ = ('metadata', 'info')
     metadata: MatchMetadata
     info: MatchInfo
 
+# Matches parsed per batch by add_matches
+BULK_BATCH_SIZE = 500
+
+# What add_matches accepts: a match-v5 dict, a match id in the match store, or a path to a match JSON file
+MatchSource = Union[Dict, str, Path]
+
+@dataclass
+class MatchBatch:
+    """A batch of parsed matches and their participant columns."""
+    match_ids: List[str]
+    starts: List[int]
+    durations: List[int]
+    # Match models, or pickled ones when the batch was parsed in a worker process
+    models: List[Union[Match, bytes]]
+    participant_counts: List[int]
+    table: ParticipantTable
+    missing: int
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _is_file(item: MatchSource) -> bool:
+    return isinstance(item, Path) or item.endswith('.json')
+
+def _load_matches(items: List[MatchSource], store: Optional[MatchStore]) -> Tuple[List[Dict], int]:
+    """Resolve match dicts, match ids and JSON file paths to match dicts, keeping their order.
+
+    Returns the dicts and how many match ids weren't in the store.
+    """
+    match_ids = [item for item in items if isinstance(item, str) and not _is_file(item)]
+    if match_ids and store is None:
+        raise ValueError("Adding matches by id needs a match store")
+    stored = store.get_many(match_ids) if match_ids else {}
+
+    matches_data = []
+    missing = 0
+    for item in items:
+        if isinstance(item, dict):
+            matches_data.append(item)
+        elif _is_file(item):
+            with open(item, 'r') as f:
+                matches_data.append(json.load(f))
+        elif item in stored:
+            matches_data.append(stored[item])
+        else:
+            missing += 1
+    return matches_data, missing
+
+# Per-process state of add_matches workers
+_worker_parser: Optional["StatsAnalyzer"] = None
+_worker_stores: Dict[str, MatchStore] = {}
+
+def _parse_batch_in_worker(items: List[MatchSource], store_path: Optional[str]) -> MatchBatch:
+    """Process pool entry point: load and parse one batch, returning pickled models."""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = StatsAnalyzer()
+    store = None
+    if store_path is not None:
+        store = _worker_stores.get(store_path)
+        if store is None:
+            store = _worker_stores[store_path] = MatchStore(store_path)
+    gc.disable()
+    try:
+        return _worker_parser._parse_batch(items, store, pickle_models=True)
+    finally:
+        gc.enable()
+
 class StatsAnalyzer:
     def __init__(self):
-        self.matches: List[Match] = []
+        # Match slots by match row; removed matches leave None behind
+        self._matches: List[Union[Match, bytes, None]] = []
+        self._match_table_rows: List[range] = []
+        self._match_starts: List[int] = []
+        self._match_durations: List[int] = []
         self.puuid: Optional[str] = None
+        # Participant fields of every stored match as NumPy columns
+        self.participants = ParticipantTable()
+        # Indexes maintained by add_match and remove_match
+        self._match_index: Dict[str, List[int]] = {}
+        self._player_rows_index: Dict[str, List[int]] = {}
+        self._player_timeline: Dict[str, List[Tuple[int, int, int]]] = {}
+        # Running aggregates and trends for every PUUID whose stats have been read
+        self._aggregates: Dict[str, PlayerAggregates] = {}
+        self._trends: Dict[str, PlayerTrends] = {}
+
+    @property
+    def matches(self) -> List[Match]:
+        """Stored matches in the order they were added."""
+        return [self._match_at(match_row) for match_row, match in enumerate(self._matches) if match is not None]
+
+    @property
+    def slot_count(self) -> int:
+        """Match slots held, including ones emptied by remove_match whose table rows stay allocated."""
+        return len(self._matches)
+
+    def match_ids(self) -> List[str]:
+        """Ids of the stored matches, each once."""
+        return list(self._match_index)
+
+    def __contains__(self, match_id: str) -> bool:
+        return match_id in self._match_index
+
+    def _match_at(self, match_row: int) -> Match:
+        match = self._matches[match_row]
+        if isinstance(match, bytes):
+            # Matches parsed in a worker process stay pickled until first read
+            match = pickle.loads(match)
+            self._matches[match_row] = match
+        return match
 
     def _parse_participant(self, data: Dict) -> Participant:
         """Parse participant data from the match response."""
+        challenge_keys, challenge_values = split_challenges(data['challenges'])
         return Participant(
-            puuid=data['puuid'],
+            puuid=sys.intern(data['puuid']),
             summonerId=data['summonerId'],
             summonerName=data['summonerName'],
             championId=data['championId'],
-            championName=data['championName'],
+            championName=sys.intern(data['championName']),
             teamId=data['teamId'],
             teamPosition=data['teamPosition'],
             individualPosition=data['individualPosition'],
@@ -128,25 +344,9 @@ class StatsAnalyzer:
             magicDamageDealt=data['magicDamageDealt'],
             physicalDamageDealt=data['physicalDamageDealt'],
             trueDamageDealt=data['trueDamageDealt'],
-            perks=self._parse_perks(data['perks']),
-            challenges=data['challenges']
-        )
-
-    def _parse_perks(self, data: Dict) -> Perks:
-        """Parse perks data from the match response."""
-        return Perks(
-            statPerks=PerkStats(**data['statPerks']),
-            styles=[
-                PerkStyle(
-                    description=style['description'],
-                    selections=[
-                        PerkStyleSelection(**selection)
-                        for selection in style['selections']
-                    ],
-                    style=style['style']
-                )
-                for style in data['styles']
-            ]
+            packedPerks=pack_perks(data['perks']),
+            challengeKeys=challenge_keys,
+            challengeValues=challenge_values
         )
 
     def _parse_team(self, data: Dict) -> Team:
@@ -160,7 +360,11 @@ class StatsAnalyzer:
     def _parse_match(self, data: Dict) -> Match:
         """Parse match data from the API response."""
         return Match(
-            metadata=MatchMetadata(**data['metadata']),
+            metadata=MatchMetadata(
+                dataVersion=data['metadata']['dataVersion'],
+                matchId=data['metadata']['matchId'],
+                participants=[sys.intern(puuid) for puuid in data['metadata']['participants']]
+            ),
             info=MatchInfo(
                 gameId=data['info']['gameId'],
                 gameCreation=data['info']['gameCreation'],
@@ -180,43 +384,253 @@ class StatsAnalyzer:
     def add_match(self, match_data: Dict):
         """Add a match to the analyzer."""
         match = self._parse_match(match_data)
-        self.matches.append(match)
-        
-        # Set PUUID if not set and we find it in the participants
+        rows = self.participants.append_match(len(self._matches), match_data['info']['participants'])
+        self._register_match(match, match.metadata.matchId, match.info.gameStartTimestamp, match.info.gameDuration, rows)
+
+    def add_matches(
+        self,
+        matches: Iterable[MatchSource],
+        store: Optional[MatchStore] = None,
+        workers: int = 0,
+        batch_size: int = BULK_BATCH_SIZE,
+        parsed: Optional[Dict[str, Match]] = None
+    ) -> int:
+        """Add many matches, in order, parsing them in batches.
+
+        Items are match-v5 dicts, match ids in `store`, or paths to match JSON
+        files. With workers > 1 batches are loaded and parsed in a process
+        pool and their participant columns merged here. That pays off for ids
+        and paths, since the workers also do the decompression and JSON
+        decoding; dicts would have to be pickled over to them instead.
+        `parsed` maps match ids to models shared between analyzers: models
+        found there aren't parsed again, and new ones are added to it. It is
+        only used without workers.
+        Returns how many matches were added; ids missing from the store are skipped.
+        """
+        was_enabled = gc.isenabled()
+        # Parsed models hold no reference cycles, so collecting during a bulk load is wasted work
+        gc.disable()
+        unsorted: Set[str] = set()
+        added = 0
+        try:
+            if workers > 1:
+                batches = self._parse_in_pool(matches, store, workers, batch_size)
+            else:
+                batches = (self._parse_batch(chunk, store, parsed=parsed) for chunk in _chunks(matches, batch_size))
+            for batch in batches:
+                added += self._merge_batch(batch, unsorted)
+        finally:
+            for puuid in unsorted:
+                if puuid in self._player_timeline:
+                    self._player_timeline[puuid].sort()
+            for puuid in unsorted:
+                # Games may have arrived out of time order; rebuilt on the next read
+                self._trends.pop(puuid, None)
+            if was_enabled:
+                gc.enable()
+        return added
+
+    def _parse_batch(
+        self,
+        items: List[MatchSource],
+        store: Optional[MatchStore],
+        pickle_models: bool = False,
+        parsed: Optional[Dict[str, Match]] = None
+    ) -> MatchBatch:
+        """Load and parse a batch of matches into models and participant columns."""
+        matches_data, missing = _load_matches(items, store)
+        batch = MatchBatch([], [], [], [], [], ParticipantTable(capacity=max(1, 10 * len(matches_data))), missing)
+        for index, match_data in enumerate(matches_data):
+            match = parsed.get(match_data['metadata']['matchId']) if parsed is not None else None
+            if match is None:
+                match = self._parse_match(match_data)
+                if parsed is not None:
+                    parsed[match.metadata.matchId] = match
+            rows = batch.table.append_match(index, match_data['info']['participants'])
+            batch.match_ids.append(match.metadata.matchId)
+            batch.starts.append(match.info.gameStartTimestamp)
+            batch.durations.append(match.info.gameDuration)
+            batch.models.append(pickle.dumps(match, pickle.HIGHEST_PROTOCOL) if pickle_models else match)
+            batch.participant_counts.append(len(rows))
+        return batch
+
+    def _parse_in_pool(
+        self, matches: Iterable[MatchSource], store: Optional[MatchStore], workers: int, batch_size: int
+    ) -> Iterator[MatchBatch]:
+        """Parse batches in a process pool, yielding them in input order."""
+        store_path = str(store.path) if store is not None else None
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for chunk in _chunks(matches, batch_size):
+                pending.append(pool.submit(_parse_batch_in_worker, chunk, store_path))
+                # Bound the batches in flight so a huge import isn't queued all at once
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _merge_batch(self, batch: MatchBatch, unsorted: Set[str]) -> int:
+        """Append a parsed batch's columns and register its matches."""
+        rows = self.participants.extend(batch.table, len(self._matches))
+        row = rows.start
+        for model, match_id, start, duration, count in zip(
+            batch.models, batch.match_ids, batch.starts, batch.durations, batch.participant_counts
+        ):
+            self._register_match(model, match_id, start, duration, range(row, row + count), unsorted)
+            row += count
+        return len(batch.models)
+
+    def _register_match(
+        self,
+        match: Union[Match, bytes],
+        match_id: str,
+        start: int,
+        duration: int,
+        rows: range,
+        unsorted: Optional[Set[str]] = None
+    ):
+        self._matches.append(match)
+        self._match_table_rows.append(rows)
+        self._match_starts.append(start)
+        self._match_durations.append(duration)
+        self._index_match(match_id, start, len(self._matches) - 1, rows, unsorted)
+
+        # Set PUUID if not set, from the match's first participant
+        if not self.puuid and len(rows):
+            self.puuid = self.participants.decode('puuid', self.participants.column('puuid')[rows.start])
+
+    def remove_match(self, match_id: str) -> bool:
+        """Remove every stored copy of a match. Returns False if it wasn't stored."""
+        match_rows = self._match_index.pop(match_id, None)
+        if not match_rows:
+            return False
+        for match_row in match_rows:
+            self._unindex_match(match_row)
+            self._matches[match_row] = None
+        return True
+
+    def _player_participants(self, rows: range) -> Iterator[Tuple[str, int]]:
+        """Yield (puuid, table row) for each player's first entry in a match."""
+        names = self.participants.dictionaries['puuid'].values
+        seen = set()
+        for code, row in zip(self.participants.column('puuid')[rows.start:rows.stop].tolist(), rows):
+            if code in seen:
+                continue
+            seen.add(code)
+            yield names[code], row
+
+    def _index_match(self, match_id: str, start: int, match_row: int, rows: range, unsorted: Optional[Set[str]] = None):
+        """Index a newly added match by id, by player and by game start time.
+
+        With `unsorted`, time-ordered lists are appended to rather than kept
+        sorted, and the PUUIDs whose timelines need sorting are collected.
+        """
+        self._match_index.setdefault(match_id, []).append(match_row)
+        for puuid, row in self._player_participants(rows):
+            self._player_rows_index.setdefault(puuid, []).append(row)
+            timeline = self._player_timeline.setdefault(puuid, [])
+            if unsorted is None:
+                insort(timeline, (start, match_row, row))
+            else:
+                timeline.append((start, match_row, row))
+                unsorted.add(puuid)
+            aggregates = self._aggregates.get(puuid)
+            if aggregates is not None:
+                aggregates.add(row, self._player_games([row])[0])
+            trends = self._trends.get(puuid)
+            if trends is not None and not trends.add(start, self._trend_games([match_row], [row])[0]):
+                # An older game arrived late; rebuilt on the next read
+                del self._trends[puuid]
+
+    def _unindex_match(self, match_row: int):
+        """Drop a removed match from the player, timeline and aggregate indexes."""
+        start = self._match_starts[match_row]
+        for puuid, row in self._player_participants(self._match_table_rows[match_row]):
+            player_rows = self._player_rows_index[puuid]
+            del player_rows[bisect_left(player_rows, row)]
+            timeline = self._player_timeline[puuid]
+            del timeline[bisect_left(timeline, (start, match_row, row))]
+            if not player_rows:
+                del self._player_rows_index[puuid]
+                del self._player_timeline[puuid]
+            aggregates = self._aggregates.get(puuid)
+            if aggregates is not None and not aggregates.remove(row, self._player_games([row])[0]):
+                # Rebuilt from the remaining games on the next read
+                del self._aggregates[puuid]
+            self._trends.pop(puuid, None)
+
+    def _player_games(self, rows) -> List[PlayerGame]:
+        """Read the aggregated fields of participant rows from the table."""
+        table = self.participants
+        columns = []
+        for name in AGGREGATE_FIELDS:
+            values = table.column(name)[rows].tolist()
+            if name in table.dictionaries:
+                decoded = table.dictionaries[name].values
+                values = [decoded[code] for code in values]
+            columns.append(values)
+        return list(zip(*columns))
+
+    def _trend_games(self, match_rows: List[int], rows: List[int]) -> List[TrendGame]:
+        """Read the fields trends are computed from for participant rows."""
+        table = self.participants
+        cs = table.column('totalMinionsKilled')[rows].astype(np.int64) + table.column('neutralMinionsKilled')[rows]
+        return list(zip(
+            table.column('kills')[rows].tolist(),
+            table.column('deaths')[rows].tolist(),
+            table.column('assists')[rows].tolist(),
+            table.column('visionScore')[rows].tolist(),
+            cs.tolist(),
+            [self._match_durations[match_row] for match_row in match_rows],
+            table.column('win')[rows].tolist()
+        ))
+
+    def _player_rows(self) -> np.ndarray:
+        """Get the participant rows of the tracked player, one per match, in match order."""
         if not self.puuid:
-            for participant in match.info.participants:
-                if participant.puuid == match_data.get('info', {}).get('participants', [{}])[0].get('puuid'):
-                    self.puuid = participant.puuid
-                    break
+            return np.zeros(0, dtype=np.int64)
+        return np.array(self._player_rows_index.get(self.puuid, []), dtype=np.int64)
 
-    def get_player_stats(self) -> Dict:
-        """Get aggregated stats for the player."""
+    def _player_aggregates(self) -> Optional[PlayerAggregates]:
+        """Get the running aggregates of the tracked player, building them on first use."""
         if not self.puuid:
-            return {
-                "total_matches": 0,
-                "wins": 0,
-                "losses": 0,
-                "win_rate": 0.0,
-                "kills": 0,
-                "deaths": 0,
-                "assists": 0,
-                "kda": 0.0,
-                "total_damage_dealt": 0,
-                "total_damage_taken": 0,
-                "total_gold_earned": 0,
-                "vision_score": 0,
-                "champions_played": {},
-                "positions_played": {}
-            }
+            return None
+        aggregates = self._aggregates.get(self.puuid)
+        if aggregates is None:
+            rows = self._player_rows()
+            table = self.participants
+            aggregates = PlayerAggregates.from_columns(
+                rows,
+                {name: table.column(name)[rows] for name in AGGREGATE_FIELDS},
+                {name: dictionary.values for name, dictionary in table.dictionaries.items()}
+            )
+            self._aggregates[self.puuid] = aggregates
+        return aggregates
 
-        player_matches = []
-        for match in self.matches:
-            for participant in match.info.participants:
-                if participant.puuid == self.puuid:
-                    player_matches.append(participant)
-                    break
+    def get_trends(self, window: int = TREND_WINDOW) -> Dict:
+        """Get sliding-window and EWMA metrics over the player's most recent games."""
+        if not self.puuid:
+            return PlayerTrends(window).to_dict()
+        trends = self._trends.get(self.puuid)
+        if trends is None or trends.window != window:
+            trends = PlayerTrends(window)
+            timeline = self._player_timeline.get(self.puuid, [])
+            games = self._trend_games([entry[1] for entry in timeline], [entry[2] for entry in timeline])
+            for (start, _, _), game in zip(timeline, games):
+                trends.add(start, game)
+            self._trends[self.puuid] = trends
+        return trends.to_dict()
+
+    def _find_participant(self, match: Match, puuid: str) -> Optional[Participant]:
+        for participant in match.info.participants:
+            if participant.puuid == puuid:
+                return participant
+        return None
 
-        if not player_matches:
+    def get_player_stats(self) -> Dict:
+        """Get aggregated stats for the player."""
+        aggregates = self._player_aggregates()
+        if aggregates is None or aggregates.totals['games'] == 0:
             return {
                 "total_matches": 0,
                 "wins": 0,
@@ -233,226 +647,89 @@ class StatsAnalyzer:
                 "champions_played": {},
                 "positions_played": {}
             }
+        return aggregates.player_stats()
+
+    def get_champion_stats(self) -> Dict:
+        """Get aggregated statistics for each champion played."""
+        aggregates = self._player_aggregates()
+        if aggregates is None:
+            return {}
+        return aggregates.champion_stats()
 
-        total_matches = len(player_matches)
-        wins = sum(1 for p in player_matches if p.win)
-        total_kills = sum(p.kills for p in player_matches)
-        total_deaths = sum(p.deaths for p in player_matches)
-        total_assists = sum(p.assists for p in player_matches)
-        
+    def _participant_summary(self, participant: Participant) -> Dict:
+        """Summarize a participant's core stats in the shape generate_suggestion expects."""
         # Calculate KDA safely
         kda = 0.0
-        if total_deaths > 0:
-            kda = (total_kills + total_assists) / total_deaths
-        elif total_kills + total_assists > 0:
-            kda = total_kills + total_assists  # Perfect KDA
-
-        # Calculate win rate safely
-        win_rate = (wins / total_matches * 100) if total_matches > 0 else 0.0
-
-        # Calculate champion and position stats
-        champions_played = {}
-        positions_played = {}
-        for participant in player_matches:
-            # Update champion stats
-            if participant.championName not in champions_played:
-                champions_played[participant.championName] = {
-                    "games": 0,
-                    "wins": 0,
-                    "kills": 0,
-                    "deaths": 0,
-                    "assists": 0
-                }
-            champ_stats = champions_played[participant.championName]
-            champ_stats["games"] += 1
-            if participant.win:
-                champ_stats["wins"] += 1
-            champ_stats["kills"] += participant.kills
-            champ_stats["deaths"] += participant.deaths
-            champ_stats["assists"] += participant.assists
-
-            # Update position stats
-            position = participant.teamPosition
-            if position not in positions_played:
-                positions_played[position] = {
-                    "games": 0,
-                    "wins": 0
-                }
-            pos_stats = positions_played[position]
-            pos_stats["games"] += 1
-            if participant.win:
-                pos_stats["wins"] += 1
+        if participant.deaths > 0:
+            kda = (participant.kills + participant.assists) / participant.deaths
+        elif participant.kills + participant.assists > 0:
+            kda = participant.kills + participant.assists  # Perfect KDA
 
         return {
-            "total_matches": total_matches,
-            "wins": wins,
-            "losses": total_matches - wins,
-            "win_rate": round(win_rate, 2),
-            "kills": total_kills,
-            "deaths": total_deaths,
-            "assists": total_assists,
+            "champion": participant.championName,
+            "position": participant.teamPosition,
+            "win": participant.win,
+            "kills": participant.kills,
+            "deaths": participant.deaths,
+            "assists": participant.assists,
             "kda": round(kda, 2),
-            "total_damage_dealt": sum(p.totalDamageDealtToChampions for p in player_matches),
-            "total_damage_taken": sum(p.totalDamageTaken for p in player_matches),
-            "total_gold_earned": sum(p.goldEarned for p in player_matches),
-            "vision_score": sum(p.visionScore for p in player_matches),
-            "champions_played": champions_played,
-            "positions_played": positions_played
+            "damage_dealt": participant.totalDamageDealtToChampions,
+            "damage_taken": participant.totalDamageTaken,
+            "gold_earned": participant.goldEarned,
+            "vision_score": participant.visionScore,
+            "time_ccing_others": participant.timeCCingOthers
         }
 
-    def get_champion_stats(self) -> Dict:
-        """Get aggregated statistics for each champion played."""
-        if not self.puuid:
-            return {}
-
-        champion_stats = {}
-        
-        for match in self.matches:
-            for participant in match.info.participants:
-                if participant.puuid == self.puuid:
-                    champion = participant.championName
-                    if champion not in champion_stats:
-                        champion_stats[champion] = {
-                            "games_played": 0,
-                            "wins": 0,
-                            "losses": 0,
-                            "kills": 0,
-                            "deaths": 0,
-                            "assists": 0,
-                            "total_damage_dealt": 0,
-                            "total_damage_taken": 0,
-                            "total_gold_earned": 0,
-                            "vision_score": 0,
-                            "positions": {}
-                        }
-                    
-                    stats = champion_stats[champion]
-                    stats["games_played"] += 1
-                    stats["wins"] += 1 if participant.win else 0
-                    stats["losses"] += 0 if participant.win else 1
-                    stats["kills"] += participant.kills
-                    stats["deaths"] += participant.deaths
-                    stats["assists"] += participant.assists
-                    stats["total_damage_dealt"] += participant.totalDamageDealtToChampions
-                    stats["total_damage_taken"] += participant.totalDamageTaken
-                    stats["total_gold_earned"] += participant.goldEarned
-                    stats["vision_score"] += participant.visionScore
-                    
-                    # Track positions played
-                    position = participant.individualPosition
-                    if position not in stats["positions"]:
-                        stats["positions"][position] = 0
-                    stats["positions"][position] += 1
-                    
-                    break
-
-        # Calculate averages and rates
-        for champion in champion_stats:
-            stats = champion_stats[champion]
-            games = stats["games_played"]
-            
-            # Calculate win rate
-            stats["win_rate"] = (stats["wins"] / games * 100) if games > 0 else 0
-            
-            # Calculate KDA
-            deaths = stats["deaths"]
-            if deaths > 0:
-                stats["kda"] = (stats["kills"] + stats["assists"]) / deaths
-            else:
-                stats["kda"] = stats["kills"] + stats["assists"]
-            
-            # Calculate averages
-            stats["avg_kills"] = stats["kills"] / games if games > 0 else 0
-            stats["avg_deaths"] = stats["deaths"] / games if games > 0 else 0
-            stats["avg_assists"] = stats["assists"] / games if games > 0 else 0
-            stats["avg_damage"] = stats["total_damage_dealt"] / games if games > 0 else 0
-            stats["avg_gold"] = stats["total_gold_earned"] / games if games > 0 else 0
-            stats["avg_vision"] = stats["vision_score"] / games if games > 0 else 0
-
-        return champion_stats
-
     def get_match_details(self, match_id: str) -> Optional[Dict]:
         """Get detailed stats for a specific match."""
-        for match in self.matches:
-            if match.metadata.matchId == match_id:
-                for participant in match.info.participants:
-                    if participant.puuid == self.puuid:
-                        # Calculate KDA safely
-                        kda = 0.0
-                        if participant.deaths > 0:
-                            kda = (participant.kills + participant.assists) / participant.deaths
-                        elif participant.kills + participant.assists > 0:
-                            kda = participant.kills + participant.assists  # Perfect KDA
-
-                        match_stats = {
-                            "champion": participant.championName,
-                            "position": participant.teamPosition,
-                            "win": participant.win,
-                            "kills": participant.kills,
-                            "deaths": participant.deaths,
-                            "assists": participant.assists,
-                            "kda": round(kda, 2),
-                            "damage_dealt": participant.totalDamageDealtToChampions,
-                            "damage_taken": participant.totalDamageTaken,
-                            "gold_earned": participant.goldEarned,
-                            "vision_score": participant.visionScore,
-                            "time_ccing_others": participant.timeCCingOthers
-                        }
-                        # Prepare recent match stats (excluding this match)
-                        history_stats = []
-                        for m in self.matches:
-                            if m.metadata.matchId != match_id:
-                                for p in m.info.participants:
-                                    if p.puuid == self.puuid:
-                                        kda_hist = 0.0
-                                        if p.deaths > 0:
-                                            kda_hist = (p.kills + p.assists) / p.deaths
-                                        elif p.kills + p.assists > 0:
-                                            kda_hist = p.kills + p.assists
-                                        history_stats.append({
-                                            "champion": p.championName,
-                                            "position": p.teamPosition,
-                                            "win": p.win,
-                                            "kills": p.kills,
-                                            "deaths": p.deaths,
-                                            "assists": p.assists,
-                                            "kda": round(kda_hist, 2),
-                                            "damage_dealt": p.totalDamageDealtToChampions,
-                                            "damage_taken": p.totalDamageTaken,
-                                            "gold_earned": p.goldEarned,
-                                            "vision_score": p.visionScore,
-                                            "time_ccing_others": p.timeCCingOthers
-                                        })
-                        # Only use last 5 matches for context
-                        history_stats = history_stats[-5:]
-                        suggestion = generate_suggestion(match_stats, history_stats)
-                        return {
-                            "match_id": match_id,
-                            "game_mode": match.info.gameMode,
-                            "game_type": match.info.gameType,
-                            "game_version": match.info.gameVersion,
-                            "game_duration": match.info.gameDuration,
-                            "champion": participant.championName,
-                            "position": participant.teamPosition,
-                            "win": participant.win,
-                            "kills": participant.kills,
-                            "deaths": participant.deaths,
-                            "assists": participant.assists,
-                            "kda": round(kda, 2),
-                            "damage_dealt": participant.totalDamageDealtToChampions,
-                            "damage_taken": participant.totalDamageTaken,
-                            "gold_earned": participant.goldEarned,
-                            "vision_score": participant.visionScore,
-                            "time_ccing_others": participant.timeCCingOthers,
-                            "total_time_spent_dead": participant.totalTimeSpentDead,
-                            "minions_killed": participant.totalMinionsKilled,
-                            "neutral_minions_killed": participant.neutralMinionsKilled,
-                            "double_kills": participant.doubleKills,
-                            "triple_kills": participant.tripleKills,
-                            "quadra_kills": participant.quadraKills,
-                            "penta_kills": participant.pentaKills,
-                            "challenges": participant.challenges,
-                            "analysis": suggestion,
-                            "improvement_suggestions": [suggestion] if suggestion else []
-                        }
-        return None 
\ No newline at end of file
+        match_rows = self._match_index.get(match_id)
+        if not match_rows or not self.puuid:
+            return None
+        match = self._match_at(match_rows[0])
+        participant = self._find_participant(match, self.puuid)
+        if participant is None:
+            return None
+
+        match_stats = self._participant_summary(participant)
+
+        # Prepare recent match stats from the player's other games, most recent last
+        history_stats = []
+        for _, other_row, participant_row in reversed(self._player_timeline.get(self.puuid, [])):
+            if len(history_stats) == 5:
+                break
+            other = self._match_at(other_row)
+            if other.metadata.matchId == match_id:
+                continue
+            history_stats.append(self._participant_summary(self._find_participant(other, self.puuid)))
+        # Only use last 5 matches for context
+        history_stats.reverse()
+        suggestion = generate_suggestion(match_stats, history_stats)
+        return {
+            "match_id": match_id,
+            "game_mode": match.info.gameMode,
+            "game_type": match.info.gameType,
+            "game_version": match.info.gameVersion,
+            "game_duration": match.info.gameDuration,
+            "champion": participant.championName,
+            "position": participant.teamPosition,
+            "win": participant.win,
+            "kills": participant.kills,
+            "deaths": participant.deaths,
+            "assists": participant.assists,
+            "kda": match_stats["kda"],
+            "damage_dealt": participant.totalDamageDealtToChampions,
+            "damage_taken": participant.totalDamageTaken,
+            "gold_earned": participant.goldEarned,
+            "vision_score": participant.visionScore,
+            "time_ccing_others": participant.timeCCingOthers,
+            "total_time_spent_dead": participant.totalTimeSpentDead,
+            "minions_killed": participant.totalMinionsKilled,
+            "neutral_minions_killed": participant.neutralMinionsKilled,
+            "double_kills": participant.doubleKills,
+            "triple_kills": participant.tripleKills,
+            "quadra_kills": participant.quadraKills,
+            "penta_kills": participant.pentaKills,
+            "challenges": participant.challenges,
+            "analysis": suggestion,
+            "improvement_suggestions": [suggestion] if suggestion else []
+        }
@@ -0,0 +1,104 @@
+import os
+from typing import Dict, List, Optional, Tuple
+
+# Games per sliding window unless a request asks for another size
+TREND_WINDOW = int(os.getenv("TREND_WINDOW", "20"))
+
+TREND_METRICS = ('kda', 'deaths', 'vision_score', 'cs_per_min', 'win_rate')
+
+# One game as (kills, deaths, assists, visionScore, cs, gameDuration seconds, win)
+TrendGame = Tuple[int, int, int, int, int, int, bool]
+
+
+class RollingWindow:
+    """Ring buffer over the last `size` values with a running sum, plus an EWMA of every value.
+
+    push() is O(1): the value it overwrites is subtracted from the sum.
+    """
+
+    __slots__ = ('size', 'alpha', 'values', 'index', 'count', 'total', 'ewma')
+
+    def __init__(self, size: int, alpha: float):
+        self.size = size
+        self.alpha = alpha
+        self.values = [0.0] * size
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+        self.ewma: Optional[float] = None
+
+    def push(self, value: float):
+        if self.count == self.size:
+            self.total -= self.values[self.index]
+        else:
+            self.count += 1
+        self.values[self.index] = value
+        self.total += value
+        self.index = (self.index + 1) % self.size
+        self.ewma = value if self.ewma is None else self.alpha * value + (1 - self.alpha) * self.ewma
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def recent(self) -> List[float]:
+        """Values in the window, oldest first."""
+        if self.count < self.size:
+            return self.values[:self.count]
+        return self.values[self.index:] + self.values[:self.index]
+
+
+def _game_metrics(game: TrendGame) -> Tuple[float, float, float, float, float]:
+    kills, deaths, assists, vision_score, cs, duration, win = game
+    if deaths > 0:
+        kda = (kills + assists) / deaths
+    else:
+        kda = float(kills + assists)  # Perfect KDA
+    cs_per_min = cs / (duration / 60) if duration > 0 else 0.0
+    return kda, float(deaths), float(vision_score), cs_per_min, 100.0 if win else 0.0
+
+
+class PlayerTrends:
+    """Sliding-window and EWMA metrics over one player's games in time order.
+
+    The EWMA smoothing factor is 2 / (window + 1), the usual span-to-alpha
+    mapping, so both views weigh roughly the same number of recent games.
+    """
+
+    def __init__(self, window: int = TREND_WINDOW):
+        self.window = window
+        alpha = 2 / (window + 1)
+        self.windows = {name: RollingWindow(window, alpha) for name in TREND_METRICS}
+        self.games = 0
+        self.last_start: Optional[int] = None
+
+    def add(self, start: int, game: TrendGame) -> bool:
+        """Push a game in O(1).
+
+        Returns False, without pushing, if the game started before the newest
+        one already pushed; windows can only grow at the recent end, so the
+        caller should rebuild instead.
+        """
+        if self.last_start is not None and start < self.last_start:
+            return False
+        self.last_start = start
+        self.games += 1
+        for name, value in zip(TREND_METRICS, _game_metrics(game)):
+            self.windows[name].push(value)
+        return True
+
+    def to_dict(self) -> Dict:
+        metrics = {}
+        for name, window in self.windows.items():
+            recent = window.recent()
+            metrics[name] = {
+                "last": round(recent[-1], 2) if recent else 0.0,
+                "window_avg": round(window.mean(), 2),
+                "ewma": round(window.ewma, 2) if window.ewma is not None else 0.0,
+                "values": [round(value, 2) for value in recent]
+            }
+        return {
+            "window": self.window,
+            "games_in_window": self.windows['kda'].count,
+            "total_games": self.games,
+            "metrics": metrics
+        }
@@ -0,0 +1,108 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate the memory held by a JSON-like value by its encoded length."""
+    try:
+        return len(json.dumps(value, separators=(',', ':')))
+    except (TypeError, ValueError):
+        return 1024
+
+
+class TTLCache:
+    """In-memory LRU cache with a per-entry TTL, bounded by entries and bytes.
+
+    Keys are tuples whose first element names the lookup kind (e.g. 'account'),
+    which is used to break hit/miss counts down per kind.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self.total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        self.kind_stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, key: Hashable, counter: str):
+        self.stats[counter] += 1
+        kind = key[0] if isinstance(key, tuple) and key else "other"
+        kind_stats = self.kind_stats.setdefault(kind, {"hits": 0, "misses": 0})
+        if counter in kind_stats:
+            kind_stats[counter] += 1
+
+    def _remove(self, key: Hashable):
+        _, _, size = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a value, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._count(key, "misses")
+            return None
+        value, expires_at, _ = entry
+        if expires_at <= self.clock():
+            self._remove(key)
+            self.stats["expirations"] += 1
+            self._count(key, "misses")
+            return None
+        self._entries.move_to_end(key)
+        self._count(key, "hits")
+        return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Get an unexpired value without counting a lookup or marking it recently used."""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= self.clock():
+            return None
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: float, size: Optional[int] = None):
+        """Store a value for `ttl` seconds, evicting least recently used entries as needed."""
+        if size is None:
+            size = estimate_size(value)
+        if key in self._entries:
+            self._remove(key)
+        # Too large to keep; the old value is gone too, so it can't be served stale
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, self.clock() + ttl, size)
+        self.total_bytes += size
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def invalidate(self, key: Hashable):
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict:
+        """Get hit, miss and eviction counts plus current size."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "by_kind": {kind: dict(counts) for kind, counts in self.kind_stats.items()},
+        }
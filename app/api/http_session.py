@@ -0,0 +1,187 @@
+import os
+import aiohttp
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment."""
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment."""
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+@dataclass
+class PoolSettings:
+    """Connection pool and timeout settings for Riot API sessions."""
+    limit_per_host: int = 20
+    host_limits: Dict[str, int] = field(default_factory=dict)
+    keepalive_timeout: float = 30.0
+    dns_cache_ttl: int = 300
+    total_timeout: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 20.0
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        """Build settings from RIOT_HTTP_* environment variables."""
+        settings = cls(
+            limit_per_host=_env_int("RIOT_HTTP_LIMIT_PER_HOST", cls.limit_per_host),
+            keepalive_timeout=_env_float("RIOT_HTTP_KEEPALIVE", cls.keepalive_timeout),
+            dns_cache_ttl=_env_int("RIOT_HTTP_DNS_TTL", cls.dns_cache_ttl),
+            total_timeout=_env_float("RIOT_HTTP_TOTAL_TIMEOUT", cls.total_timeout),
+            connect_timeout=_env_float("RIOT_HTTP_CONNECT_TIMEOUT", cls.connect_timeout),
+            read_timeout=_env_float("RIOT_HTTP_READ_TIMEOUT", cls.read_timeout),
+        )
+        # Per routing host overrides, e.g. RIOT_HTTP_LIMIT_AMERICAS=40
+        for routing in ("americas", "europe", "asia", "sea"):
+            limit = os.getenv(f"RIOT_HTTP_LIMIT_{routing.upper()}")
+            if limit:
+                settings.host_limits[routing] = int(limit)
+        return settings
+
+    def limit_for(self, host_key: str) -> int:
+        """Get the connection limit for a routing host."""
+        return self.host_limits.get(host_key, self.limit_per_host)
+
+
+@dataclass
+class HostPoolStats:
+    """Connection reuse counters for a single routing host."""
+    requests: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    queued: int = 0
+    dns_cache_hits: int = 0
+    dns_cache_misses: int = 0
+    errors: int = 0
+
+    def to_dict(self) -> Dict:
+        acquired = self.connections_created + self.connections_reused
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": round(self.connections_reused / acquired, 4) if acquired else 0.0,
+            "queued": self.queued,
+            "dns_cache_hits": self.dns_cache_hits,
+            "dns_cache_misses": self.dns_cache_misses,
+            "errors": self.errors,
+        }
+
+
+class HTTPSessionPool:
+    """Long-lived pooled aiohttp sessions, one per routing host.
+
+    Each routing value (americas, europe, asia, sea) and each platform host
+    (na1, euw1, ...) gets its own connector so connection limits are applied
+    per routing host. Sessions keep connections alive between requests and
+    cache DNS lookups.
+    """
+
+    def __init__(self, settings: Optional[PoolSettings] = None):
+        self.settings = settings or PoolSettings.from_env()
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._stats: Dict[str, HostPoolStats] = {}
+
+    def _trace_config(self, stats: HostPoolStats) -> aiohttp.TraceConfig:
+        """Build a trace config that records connection reuse for one host."""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            stats.requests += 1
+
+        async def on_request_exception(session, ctx, params):
+            stats.errors += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            stats.connections_created += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            stats.connections_reused += 1
+
+        async def on_connection_queued_start(session, ctx, params):
+            stats.queued += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            stats.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            stats.dns_cache_misses += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_exception.append(on_request_exception)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_connection_queued_start.append(on_connection_queued_start)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
+
+    def _create_session(self, host_key: str) -> aiohttp.ClientSession:
+        """Create a pooled session for a routing host."""
+        stats = self._stats.setdefault(host_key, HostPoolStats())
+        connector = aiohttp.TCPConnector(
+            limit=self.settings.limit_for(host_key),
+            keepalive_timeout=self.settings.keepalive_timeout,
+            ttl_dns_cache=self.settings.dns_cache_ttl,
+            use_dns_cache=True,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=self.settings.total_timeout,
+            sock_connect=self.settings.connect_timeout,
+            sock_read=self.settings.read_timeout,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            trace_configs=[self._trace_config(stats)],
+        )
+
+    def open(self, host_keys) -> None:
+        """Eagerly create sessions for the given routing hosts."""
+        for host_key in host_keys:
+            self.session(host_key)
+
+    def session(self, host_key: str) -> aiohttp.ClientSession:
+        """Get the session for a routing host, creating it on first use."""
+        session = self._sessions.get(host_key)
+        if session is None or session.closed:
+            session = self._create_session(host_key)
+            self._sessions[host_key] = session
+        return session
+
+    async def close(self) -> None:
+        """Close all sessions and release pooled connections."""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+
+    def get_stats(self) -> Dict:
+        """Get connection pool statistics per routing host."""
+        hosts = {}
+        for host_key, stats in self._stats.items():
+            host = stats.to_dict()
+            session = self._sessions.get(host_key)
+            host["open"] = session is not None and not session.closed
+            host["limit"] = self.settings.limit_for(host_key)
+            hosts[host_key] = host
+        return {
+            "settings": {
+                "limit_per_host": self.settings.limit_per_host,
+                "host_limits": dict(self.settings.host_limits),
+                "keepalive_timeout": self.settings.keepalive_timeout,
+                "dns_cache_ttl": self.settings.dns_cache_ttl,
+                "total_timeout": self.settings.total_timeout,
+                "connect_timeout": self.settings.connect_timeout,
+                "read_timeout": self.settings.read_timeout,
+            },
+            "hosts": hosts,
+        }
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+from ..services.async_io import run_io
+
+logger = logging.getLogger(__name__)
+
+# Riot returns at most 100 match ids per call
+PAGE_SIZE = 100
+
+# How far back background paging goes per PUUID
+HISTORY_BACKFILL_LIMIT = int(os.getenv("HISTORY_BACKFILL_LIMIT", "1000"))
+
+
+class MatchHistorySync:
+    """Incremental, paged match history per PUUID, kept in the match store.
+
+    The first sync lists the newest page of match ids. Later syncs only ask
+    for games started at or after the newest known match (startTime) and stop
+    at the newest known id. Older history is paged in 100-id chunks by a
+    background task, so deep histories are listed once rather than on every
+    request. Each older page asks for games started at or before the oldest
+    known one (endTime) rather than for a position in the list, since
+    positions shift whenever the player finishes another game.
+    """
+
+    def __init__(self, client, backfill_limit: int = HISTORY_BACKFILL_LIMIT):
+        self.client = client
+        self.store = client.match_store
+        self.backfill_limit = backfill_limit
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._backfills: Dict[str, asyncio.Task] = {}
+        self.stats = {"syncs": 0, "pages": 0, "new_ids": 0, "backfilled_ids": 0}
+
+    def _lock(self, puuid: str) -> asyncio.Lock:
+        lock = self._locks.get(puuid)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[puuid] = lock
+        return lock
+
+    async def _fetch_page(
+        self, puuid: str, region: str, start: int, start_time: Optional[int] = None, end_time: Optional[int] = None
+    ) -> List[str]:
+        self.stats["pages"] += 1
+        return await self.client.get_match_history(
+            puuid, region, count=PAGE_SIZE, use_cache=False, start=start, start_time=start_time, end_time=end_time
+        ) or []
+
+    async def _start_timestamp(self, match_id: str, region: str) -> Optional[int]:
+        match_data, _ = await self.client.get_match(match_id, region)
+        return match_data["info"]["gameStartTimestamp"] if match_data else None
+
+    async def sync(self, puuid: str, region: str) -> Dict:
+        """List games newer than the newest known match and record them."""
+        async with self._lock(puuid):
+            state = await run_io(self.store.get_history_state, puuid) or {
+                "region": region,
+                "newest_match_id": None,
+                "newest_timestamp": None,
+                "last_synced": None,
+                "backfill_complete": False
+            }
+            newest_id = state["newest_match_id"]
+            start_time = state["newest_timestamp"] // 1000 if state["newest_timestamp"] else None
+
+            new_ids: List[str] = []
+            start = 0
+            while True:
+                page = await self._fetch_page(puuid, region, start, start_time)
+                if newest_id in page:
+                    new_ids.extend(page[:page.index(newest_id)])
+                    break
+                new_ids.extend(page)
+                # A first sync takes one page; deeper history is left to the backfill
+                if len(page) < PAGE_SIZE or newest_id is None:
+                    break
+                start += PAGE_SIZE
+
+            if new_ids:
+                await run_io(self.store.add_history_ids, puuid, new_ids, True)
+                state["newest_match_id"] = new_ids[0]
+                newest_timestamp = await self._start_timestamp(new_ids[0], region)
+                if newest_timestamp:
+                    state["newest_timestamp"] = newest_timestamp
+                if newest_id is None and len(new_ids) < PAGE_SIZE:
+                    state["backfill_complete"] = True
+
+            state["region"] = region
+            state["last_synced"] = time.time()
+            await run_io(self.store.save_history_state, puuid, state)
+            self.stats["syncs"] += 1
+            self.stats["new_ids"] += len(new_ids)
+            return state
+
+    async def backfill(self, puuid: str, region: str, max_matches: Optional[int] = None):
+        """Page through older history until it ends or max_matches ids are known."""
+        limit = max_matches or self.backfill_limit
+        state = await self.sync(puuid, region)
+        oldest_timestamp = state.get("oldest_timestamp")
+        if oldest_timestamp is None and not state["backfill_complete"]:
+            oldest_id = await run_io(self.store.get_oldest_history_id, puuid)
+            oldest_timestamp = await self._start_timestamp(oldest_id, region) if oldest_id else None
+        while not state["backfill_complete"] and oldest_timestamp is not None:
+            known = await run_io(self.store.count_history_ids, puuid)
+            if known >= limit:
+                break
+            # The page may repeat the oldest known game; already known ids are ignored
+            end_time = oldest_timestamp // 1000
+            page = await self._fetch_page(puuid, region, 0, end_time=end_time)
+            next_timestamp = await self._start_timestamp(page[-1], region) if page else None
+            async with self._lock(puuid):
+                added = await run_io(self.store.add_history_ids, puuid, page, False)
+                self.stats["backfilled_ids"] += added
+                # Reloaded since a sync may have saved it meanwhile
+                state = await run_io(self.store.get_history_state, puuid)
+                if next_timestamp is not None:
+                    state["oldest_timestamp"] = next_timestamp
+                # A full page within one second would page in place, so it ends the history too
+                if len(page) < PAGE_SIZE or (next_timestamp is not None and next_timestamp // 1000 >= end_time):
+                    state["backfill_complete"] = True
+                await run_io(self.store.save_history_state, puuid, state)
+            # Without the oldest game's start time the next page is unknown; a later backfill retries
+            oldest_timestamp = next_timestamp
+
+    def start_backfill(self, puuid: str, region: str) -> bool:
+        """Start a background backfill for a PUUID unless one is already running."""
+        task = self._backfills.get(puuid)
+        if task is not None and not task.done():
+            return False
+
+        async def run():
+            try:
+                await self.backfill(puuid, region)
+            except Exception as e:
+                logger.error(f"Match history backfill failed for {puuid}: {str(e)}")
+
+        task = asyncio.ensure_future(run())
+        self._backfills[puuid] = task
+        task.add_done_callback(lambda _: self._backfills.pop(puuid, None))
+        return True
+
+    async def get_match_ids(self, puuid: str, region: str, count: int) -> List[str]:
+        """Sync newer games and return up to `count` known match ids, newest first.
+
+        When fewer ids are known than requested, older history is paged in the
+        background and later requests see more of it.
+        """
+        state = await self.sync(puuid, region)
+        match_ids = await run_io(self.store.get_history_ids, puuid, count)
+        if len(match_ids) < count and not state["backfill_complete"]:
+            self.start_backfill(puuid, region)
+        return match_ids
+
+    async def get_status(self, puuid: str) -> Dict:
+        """Get the sync state, known id count and backfill status for a PUUID."""
+        state = await run_io(self.store.get_history_state, puuid) or {}
+        task = self._backfills.get(puuid)
+        return {
+            **state,
+            "known_matches": await run_io(self.store.count_history_ids, puuid),
+            "backfill_running": task is not None and not task.done()
+        }
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "backfills_running": sum(1 for t in self._backfills.values() if not t.done())}
@@ -0,0 +1,225 @@
+import asyncio
+import time
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+# Development key defaults, used until Riot tells us the real limits
+DEFAULT_APP_LIMITS = "20:1,100:120"
+
+# Endpoint families sharing a method limit, matched against the URL path
+ENDPOINT_FAMILIES = [
+    ("/riot/account/", "account"),
+    ("/lol/match/", "match"),
+    ("/lol/summoner/", "summoner"),
+    ("/lol/league/", "league"),
+    ("/lol/champion-mastery/", "champion-mastery"),
+]
+
+
+def get_endpoint_family(path: str) -> str:
+    """Get the endpoint family (account, match, summoner, league) for a URL path."""
+    for prefix, family in ENDPOINT_FAMILIES:
+        if path.startswith(prefix):
+            return family
+    return "other"
+
+
+def parse_rate_limits(value: Optional[str]) -> List[Tuple[int, int]]:
+    """Parse a Riot rate limit header such as '20:1,100:120' into (count, seconds) pairs."""
+    limits = []
+    if not value:
+        return limits
+    for part in value.split(','):
+        try:
+            count, seconds = part.strip().split(':')
+            limits.append((int(count), int(seconds)))
+        except ValueError:
+            continue
+    return limits
+
+
+class TokenBucket:
+    """Token bucket holding `capacity` tokens that refill over `window` seconds."""
+
+    def __init__(self, capacity: int, window: float, clock: Callable[[], float]):
+        self.capacity = capacity
+        self.window = window
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.window
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until one token is available."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+    def sync(self, used: int):
+        """Align the bucket with the count Riot reports for the current window."""
+        self._refill()
+        self.tokens = min(self.tokens, float(self.capacity - used))
+
+
+class RateLimitGroup:
+    """All windows of one rate limit (e.g. 20:1 and 100:120) for one key."""
+
+    def __init__(self, limits: List[Tuple[int, int]], clock: Callable[[], float]):
+        self.clock = clock
+        self.buckets: Dict[int, TokenBucket] = {}
+        self.blocked_until = 0.0
+        self.set_limits(limits)
+
+    def set_limits(self, limits: List[Tuple[int, int]]):
+        """Apply limits from headers, keeping existing buckets where the window is unchanged."""
+        buckets = {}
+        for count, seconds in limits:
+            bucket = self.buckets.get(seconds)
+            if bucket is None or bucket.capacity != count:
+                bucket = TokenBucket(count, seconds, self.clock)
+            buckets[seconds] = bucket
+        self.buckets = buckets
+
+    def delay(self) -> float:
+        wait = max(0.0, self.blocked_until - self.clock())
+        for bucket in self.buckets.values():
+            wait = max(wait, bucket.delay())
+        return wait
+
+    def consume(self):
+        for bucket in self.buckets.values():
+            bucket.consume()
+
+    def sync(self, counts: List[Tuple[int, int]]):
+        for used, seconds in counts:
+            bucket = self.buckets.get(seconds)
+            if bucket:
+                bucket.sync(used)
+
+    def block(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+    def to_dict(self) -> Dict:
+        return {
+            "limits": {f"{b.capacity}:{seconds}": round(b.tokens, 2) for seconds, b in self.buckets.items()},
+            "blocked_for": round(max(0.0, self.blocked_until - self.clock()), 3),
+        }
+
+
+class RateLimiter:
+    """Header-aware rate limiter for the Riot API.
+
+    Keeps one application limit group per routing value and one method limit
+    group per routing value and endpoint family. Callers await `acquire` before
+    sending a request so they are paced up front, and report response headers
+    through `update` so the buckets track the limits and counts Riot reports.
+    """
+
+    def __init__(
+        self,
+        default_app_limits: str = DEFAULT_APP_LIMITS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], "asyncio.Future"] = asyncio.sleep,
+        default_retry_after: float = 1.0,
+    ):
+        self.default_app_limits = parse_rate_limits(default_app_limits)
+        self.clock = clock
+        self.sleep = sleep
+        self.default_retry_after = default_retry_after
+        self.app_limits: Dict[str, RateLimitGroup] = {}
+        self.method_limits: Dict[Tuple[str, str], RateLimitGroup] = {}
+        self.stats = {"acquired": 0, "delayed": 0, "total_wait": 0.0, "throttled": 0}
+
+    def _app_group(self, routing: str) -> RateLimitGroup:
+        group = self.app_limits.get(routing)
+        if group is None:
+            group = RateLimitGroup(self.default_app_limits, self.clock)
+            self.app_limits[routing] = group
+        return group
+
+    def _method_group(self, routing: str, family: str) -> RateLimitGroup:
+        key = (routing, family)
+        group = self.method_limits.get(key)
+        if group is None:
+            # Method limits are unknown until the first response for this family
+            group = RateLimitGroup([], self.clock)
+            self.method_limits[key] = group
+        return group
+
+    def delay(self, routing: str, family: str) -> float:
+        """Seconds the next request for this routing value and family must wait."""
+        return max(self._app_group(routing).delay(), self._method_group(routing, family).delay())
+
+    async def acquire(self, routing: str, family: str):
+        """Wait until a request may be sent, then take a token from every bucket."""
+        app_group = self._app_group(routing)
+        method_group = self._method_group(routing, family)
+        waited = 0.0
+        while True:
+            wait = max(app_group.delay(), method_group.delay())
+            if wait <= 0:
+                break
+            waited += wait
+            await self.sleep(wait)
+        app_group.consume()
+        method_group.consume()
+        self.stats["acquired"] += 1
+        if waited:
+            self.stats["delayed"] += 1
+            self.stats["total_wait"] += waited
+
+    def update(self, routing: str, family: str, headers: Mapping[str, str]):
+        """Update limits and counts from the X-App/X-Method rate limit response headers."""
+        app_group = self._app_group(routing)
+        method_group = self._method_group(routing, family)
+
+        app_limits = parse_rate_limits(headers.get("X-App-Rate-Limit"))
+        if app_limits:
+            app_group.set_limits(app_limits)
+        app_group.sync(parse_rate_limits(headers.get("X-App-Rate-Limit-Count")))
+
+        method_limits = parse_rate_limits(headers.get("X-Method-Rate-Limit"))
+        if method_limits:
+            method_group.set_limits(method_limits)
+        method_group.sync(parse_rate_limits(headers.get("X-Method-Rate-Limit-Count")))
+
+    def on_rate_limited(self, routing: str, family: str, headers: Mapping[str, str]) -> float:
+        """Record a 429 response and block the limited key until Retry-After has passed."""
+        self.stats["throttled"] += 1
+        try:
+            retry_after = float(headers.get("Retry-After", self.default_retry_after))
+        except ValueError:
+            retry_after = self.default_retry_after
+
+        limit_type = headers.get("X-Rate-Limit-Type", "").lower()
+        if limit_type == "method":
+            self._method_group(routing, family).block(retry_after)
+        else:
+            # Application and service limits both hold back the whole routing value
+            self._app_group(routing).block(retry_after)
+        return retry_after
+
+    def get_stats(self) -> Dict:
+        """Get limiter counters and the current state of every bucket."""
+        return {
+            **self.stats,
+            "total_wait": round(self.stats["total_wait"], 3),
+            "app": {routing: group.to_dict() for routing, group in self.app_limits.items()},
+            "method": {
+                f"{routing}:{family}": group.to_dict()
+                for (routing, family), group in self.method_limits.items()
+            },
+        }
+
@@ -0,0 +1,173 @@
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Upstream statuses worth retrying; 5xx responses, timeouts (504) and connection errors
+RETRYABLE_STATUSES = {500, 502, 503, 504}
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter, plus optional request hedging."""
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    hedge_delay: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """Build a policy from RIOT_RETRY_* and RIOT_HEDGE_DELAY environment variables."""
+        hedge_delay = os.getenv("RIOT_HEDGE_DELAY")
+        return cls(
+            max_attempts=int(os.getenv("RIOT_RETRY_ATTEMPTS", cls.max_attempts)),
+            base_delay=float(os.getenv("RIOT_RETRY_BASE_DELAY", cls.base_delay)),
+            max_delay=float(os.getenv("RIOT_RETRY_MAX_DELAY", cls.max_delay)),
+            hedge_delay=float(hedge_delay) if hedge_delay else None,
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (1-based), drawn uniformly up to the exponential cap."""
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, cap)
+
+
+async def hedged(attempt: Callable[[], Awaitable[T]], hedge_delay: Optional[float]) -> T:
+    """Run `attempt`, starting a second copy if the first hasn't finished after hedge_delay.
+
+    The first copy to succeed wins and the other is cancelled. Only use this
+    for idempotent requests.
+    """
+    if not hedge_delay:
+        return await attempt()
+
+    # Every copy is cancelled on the way out, including when the caller itself
+    # is cancelled during the hedge delay, so none is left running unobserved
+    pending = {asyncio.ensure_future(attempt())}
+    error: Optional[BaseException] = None
+    try:
+        done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+        if done:
+            return done.pop().result()
+
+        pending.add(asyncio.ensure_future(attempt()))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class CircuitOpenError(Exception):
+    """Raised when a routing value's circuit breaker is rejecting requests."""
+
+    def __init__(self, routing: str, retry_in: float):
+        super().__init__(f"Circuit open for {routing}, retry in {retry_in:.1f}s")
+        self.routing = routing
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one routing value.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    requests fail fast. Once `recovery_timeout` has passed a single probe is
+    let through; its success closes the breaker and its failure reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def allow(self) -> float:
+        """Return 0 if a request may proceed, otherwise seconds until the next probe."""
+        if self.state == self.CLOSED:
+            return 0.0
+        if self.state == self.OPEN:
+            remaining = self.opened_at + self.recovery_timeout - self.clock()
+            if remaining > 0:
+                self.stats["rejected"] += 1
+                return remaining
+            self.state = self.HALF_OPEN
+        if self.probe_in_flight:
+            self.stats["rejected"] += 1
+            return self.recovery_timeout
+        self.probe_in_flight = True
+        return 0.0
+
+    def record_success(self):
+        self.stats["successes"] += 1
+        self.failures = 0
+        self.probe_in_flight = False
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        self.stats["failures"] += 1
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.stats["opened"] += 1
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+
+    def to_dict(self) -> Dict:
+        retry_in = 0.0
+        if self.state == self.OPEN:
+            retry_in = max(0.0, self.opened_at + self.recovery_timeout - self.clock())
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_in": round(retry_in, 3),
+            **self.stats,
+        }
+
+
+class CircuitBreakers:
+    """One circuit breaker per routing value, created on first use."""
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        recovery_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold or int(os.getenv("RIOT_BREAKER_THRESHOLD", "5"))
+        self.recovery_timeout = recovery_timeout or float(os.getenv("RIOT_BREAKER_RECOVERY", "30"))
+        self.clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, routing: str) -> CircuitBreaker:
+        breaker = self._breakers.get(routing)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.recovery_timeout, self.clock)
+            self._breakers[routing] = breaker
+        return breaker
+
+    def get_stats(self) -> Dict:
+        """Get the state of every breaker, keyed by routing value."""
+        return {routing: breaker.to_dict() for routing, breaker in self._breakers.items()}
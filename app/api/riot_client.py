@@ -1,18 +1,49 @@
 import os
 import aiohttp
-import json
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 from pathlib import Path
+from urllib.parse import urlsplit
 import asyncio
 from fastapi import HTTPException
+from .http_session import HTTPSessionPool, PoolSettings
+from .rate_limiter import RateLimiter, get_endpoint_family
+from .single_flight import SingleFlight
+from .cache import TTLCache
+from .resilience import RetryPolicy, CircuitBreakers, CircuitOpenError, RETRYABLE_STATUSES, hedged
+from ..services.match_store import MatchStore, TIMELINE
+from ..services.async_io import run_io
 
 # Try to load .env file from project root
 env_path = Path(__file__).parent.parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
+# Seconds each kind of lookup stays in the in-memory cache. Riot ID to PUUID
+# mappings almost never change, match id lists change with every game played.
+LOOKUP_CACHE_TTLS = {
+    'account': 24 * 60 * 60,
+    'summoner': 60 * 60,
+    'match_history': 60
+}
+
+# Memory budget for parsed match payloads kept in the hot tier
+MATCH_CACHE_MAX_BYTES = int(os.getenv("MATCH_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Where a match lookup was answered from
+MATCH_TIERS = ('memory', 'disk', 'network')
+
 class RiotAPIClient:
-    def __init__(self):
+    def __init__(
+        self,
+        pool_settings: Optional[PoolSettings] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_rate_limit_retries: int = 3,
+        lookup_cache: Optional[TTLCache] = None,
+        match_store: Optional[MatchStore] = None,
+        match_cache: Optional[TTLCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breakers: Optional[CircuitBreakers] = None
+    ):
         self.api_key = os.getenv("RIOT_API_KEY")
         if not self.api_key:
             raise ValueError(
@@ -25,6 +56,13 @@ class RiotAPIClient:
         # Create data directory if it doesn't exist
         self.data_dir = Path("data")
         self.data_dir.mkdir(exist_ok=True)
+
+        # Compressed match and timeline payloads, keyed by match id
+        self.match_store = match_store or MatchStore(str(self.data_dir / "matches.db"))
+
+        # Hot tier of parsed match payloads in front of the match store
+        self.match_cache = match_cache or TTLCache(max_entries=100000, max_bytes=MATCH_CACHE_MAX_BYTES)
+        self.match_tier_hits = {tier: 0 for tier in MATCH_TIERS}
         
         # Base URLs for different routing values
         self.region_routing = {
@@ -58,6 +96,73 @@ class RiotAPIClient:
             'sea': 'https://sea.api.riotgames.com'
         }
 
+        # Pooled HTTP sessions, opened on app startup and closed on shutdown
+        self.http_pool = HTTPSessionPool(pool_settings)
+
+        # Paces requests per routing value and endpoint family from Riot's headers
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_rate_limit_retries = max_rate_limit_retries
+
+        # Retries for 5xx/timeouts/connection errors, and fail-fast per routing value
+        self.retry_policy = retry_policy or RetryPolicy.from_env()
+        self.circuit_breakers = circuit_breakers or CircuitBreakers()
+
+        # Concurrent identical requests share one upstream call
+        self.single_flight = SingleFlight()
+
+        # Account, summoner and match history lookups
+        self.lookup_cache = lookup_cache or TTLCache()
+
+    async def start(self):
+        """Open pooled sessions for the regional routing hosts."""
+        self.http_pool.open(self.base_urls.keys())
+
+    async def close(self):
+        """Close pooled sessions and their keep-alive connections."""
+        await self.http_pool.close()
+
+    def get_stats(self) -> Dict:
+        """Get client statistics for monitoring."""
+        return {
+            "http_pool": self.http_pool.get_stats(),
+            "rate_limiter": self.rate_limiter.get_stats(),
+            "circuit_breakers": self.circuit_breakers.get_stats(),
+            "single_flight": self.single_flight.get_stats(),
+            "lookup_cache": self.lookup_cache.get_stats(),
+            "match_cache": self.match_cache.get_stats(),
+            "match_tiers": self._get_match_tier_stats()
+        }
+
+    def _get_match_tier_stats(self) -> Dict:
+        """Get how many match lookups each tier answered, with hit ratios."""
+        total = sum(self.match_tier_hits.values())
+        return {
+            tier: {
+                "hits": hits,
+                "ratio": round(hits / total, 4) if total else 0.0
+            }
+            for tier, hits in self.match_tier_hits.items()
+        }
+
+    @staticmethod
+    def _get_host_key(url: str) -> str:
+        """Get the routing host key (e.g. 'americas', 'na1') for a URL."""
+        return urlsplit(url).hostname.split('.')[0]
+
+    async def _cached_request(self, key: tuple, url: str, use_cache: bool = True):
+        """Make a request through the lookup cache; use_cache=False refreshes the entry."""
+        if use_cache:
+            cached = self.lookup_cache.get(key)
+            if cached is not None:
+                return cached
+        headers = {
+            "X-Riot-Token": self.api_key
+        }
+        data = await self._make_request(url, headers)
+        if data is not None:
+            self.lookup_cache.set(key, data, LOOKUP_CACHE_TTLS[key[0]])
+        return data
+
     def _get_routing_value(self, region: str) -> str:
         """Get the routing value for a given region."""
         routing = self.region_routing.get(region.lower())
@@ -66,99 +171,193 @@ class RiotAPIClient:
         return routing
 
     async def _make_request(self, url: str, headers: Dict[str, str]) -> Dict:
-        """Make a request to the Riot API with rate limit handling."""
-        async with aiohttp.ClientSession() as session:
+        """Make a request to the Riot API, joining an identical request already in flight."""
+        return await self.single_flight.do(url, lambda: self._send_request(url, headers))
+
+    async def _send_request(self, url: str, headers: Dict[str, str]) -> Dict:
+        """Send a request to the Riot API with rate limiting, retries and a circuit breaker."""
+        host_key = self._get_host_key(url)
+        family = get_endpoint_family(urlsplit(url).path)
+        breaker = self.circuit_breakers.get(host_key)
+        failures = 0
+        rate_limited = 0
+        while True:
+            retry_in = breaker.allow()
+            if retry_in:
+                error = CircuitOpenError(host_key, retry_in)
+                print(f"{str(error)}. Failed URL: {url}")
+                raise HTTPException(status_code=503, detail=f"Riot API unavailable: {str(error)}")
+            # allow() let this call through a breaker that isn't closed only as its probe
+            probing = breaker.state != breaker.CLOSED
             try:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    elif response.status == 404:
-                        error_text = await response.text()
-                        print(f"Resource not found. Failed URL: {url}. Response: {error_text}")
-                        raise HTTPException(status_code=404, detail=f"Resource not found: {error_text}")
-                    elif response.status == 429:  # Rate limit exceeded
-                        error_text = await response.text()
-                        print(f"Rate limit exceeded. Waiting 120 seconds before retrying. Failed URL: {url}")
-                        await asyncio.sleep(120)  # Wait for 2 minutes
-                        return await self._make_request(url, headers)  # Retry the request
-                    elif response.status == 403:
-                        error_text = await response.text()
-                        print(f"API key invalid or expired. Failed URL: {url}. Response: {error_text}")
-                        raise HTTPException(status_code=403, detail="API key invalid or expired")
-                    else:
-                        error_text = await response.text()
-                        print(f"API request failed with status {response.status}. Failed URL: {url}. Response: {error_text}")
-                        raise HTTPException(status_code=response.status, detail=f"API request failed: {error_text}")
-            except aiohttp.ClientError as e:
-                print(f"Request failed: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Request failed: {str(e)}")
-
-    def _save_match_data(self, match_id: str, data: Dict):
-        """Save match data to a JSON file."""
-        match_file = self.data_dir / f"match_{match_id}.json"
-        with open(match_file, 'w') as f:
-            json.dump(data, f, indent=2)
-
-    def _load_match_data(self, match_id: str) -> Optional[Dict]:
-        """Load match data from a JSON file if it exists."""
-        match_file = self.data_dir / f"match_{match_id}.json"
-        if match_file.exists():
-            with open(match_file, 'r') as f:
-                return json.load(f)
-        return None
+                data = await hedged(
+                    lambda: self._request_once(url, headers, host_key, family),
+                    self.retry_policy.hedge_delay
+                )
+            except HTTPException as e:
+                if e.status_code == 429:
+                    # The region is healthy, we are just over our limits
+                    breaker.record_success()
+                    rate_limited += 1
+                    if rate_limited > self.max_rate_limit_retries:
+                        raise HTTPException(status_code=429, detail="Rate limit exceeded, try again later")
+                    continue
+                if e.status_code not in RETRYABLE_STATUSES:
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                failures += 1
+                if failures >= self.retry_policy.max_attempts:
+                    raise
+                delay = self.retry_policy.backoff(failures)
+                print(f"Retrying in {delay:.2f} seconds (attempt {failures + 1}/{self.retry_policy.max_attempts}). Failed URL: {url}")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                if probing:
+                    # Cancelled while probing; let the next request probe instead
+                    breaker.probe_in_flight = False
+                raise
+            breaker.record_success()
+            return data
+
+    async def _request_once(self, url: str, headers: Dict[str, str], host_key: str, family: str) -> Dict:
+        """Make a single request, raising HTTPException for any non-200 response."""
+        # Wait for a token instead of finding out about the limit from a 429
+        await self.rate_limiter.acquire(host_key, family)
+        session = self.http_pool.session(host_key)
+        try:
+            async with session.get(url, headers=headers) as response:
+                self.rate_limiter.update(host_key, family, response.headers)
+                if response.status == 200:
+                    return await response.json()
+                elif response.status == 404:
+                    error_text = await response.text()
+                    print(f"Resource not found. Failed URL: {url}. Response: {error_text}")
+                    raise HTTPException(status_code=404, detail=f"Resource not found: {error_text}")
+                elif response.status == 429:  # Rate limit exceeded
+                    retry_after = self.rate_limiter.on_rate_limited(host_key, family, response.headers)
+                    print(f"Rate limit exceeded. Retrying in {retry_after} seconds. Failed URL: {url}")
+                    raise HTTPException(status_code=429, detail="Rate limit exceeded")
+                elif response.status == 403:
+                    error_text = await response.text()
+                    print(f"API key invalid or expired. Failed URL: {url}. Response: {error_text}")
+                    raise HTTPException(status_code=403, detail="API key invalid or expired")
+                else:
+                    error_text = await response.text()
+                    print(f"API request failed with status {response.status}. Failed URL: {url}. Response: {error_text}")
+                    raise HTTPException(status_code=response.status, detail=f"API request failed: {error_text}")
+        except asyncio.TimeoutError:
+            print(f"Request timed out. Failed URL: {url}")
+            raise HTTPException(status_code=504, detail="Request to Riot API timed out")
+        except aiohttp.ClientError as e:
+            print(f"Request failed: {str(e)}")
+            raise HTTPException(status_code=502, detail=f"Request failed: {str(e)}")
+
+    async def _save_match_data(self, match_id: str, data: Dict):
+        """Save match data to the match store and the hot tier."""
+        # The store serializes the match anyway, so its size comes back from the write
+        size = await run_io(self.match_store.put, match_id, data)
+        self.match_cache.set(('match', match_id), data, float('inf'), size)
+
+    async def _load_match_data(self, match_id: str) -> Optional[Dict]:
+        """Load match data from the hot tier or the match store if it exists."""
+        data, _ = await self._lookup_cached_match(match_id)
+        return data
+
+    async def _lookup_cached_match(self, match_id: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """Look a match up in memory, then on disk, returning the data and the tier that had it."""
+        key = ('match', match_id)
+        data = self.match_cache.get(key)
+        if data is not None:
+            return data, 'memory'
+        stored = await run_io(self.match_store.get_sized, match_id)
+        if stored is not None:
+            data, size = stored
+            # Finished matches never change, so they only leave memory by eviction
+            self.match_cache.set(key, data, float('inf'), size)
+            return data, 'disk'
+        return None, None
+
+    async def get_match(self, match_id: str, region: str) -> Tuple[Optional[Dict], str]:
+        """Get a match from memory, disk or the Riot API, in that order.
+
+        Returns the match data and the tier ('memory', 'disk' or 'network') that answered.
+        """
+        data, tier = await self._lookup_cached_match(match_id)
+        if data is None:
+            routing = self._get_routing_value(region)
+            url = f"{self.base_urls[routing]}/lol/match/v5/matches/{match_id}"
+            headers = {
+                "X-Riot-Token": self.api_key
+            }
+            data = await self._make_request(url, headers)
+            tier = 'network'
+            if data:
+                await self._save_match_data(match_id, data)
+        self.match_tier_hits[tier] += 1
+        return data, tier
 
     async def get_match_details(self, match_id: str, region: str) -> Optional[Dict]:
         """Get detailed information about a specific match using match-v5 endpoint."""
-        # Check if we already have this match data
-        cached_data = self._load_match_data(match_id)
-        if cached_data:
-            return cached_data
-
-        routing = self._get_routing_value(region)
-        url = f"{self.base_urls[routing]}/lol/match/v5/matches/{match_id}"
-        headers = {
-            "X-Riot-Token": self.api_key
-        }
-        data = await self._make_request(url, headers)
-        
-        if data:
-            self._save_match_data(match_id, data)
+        data, _ = await self.get_match(match_id, region)
         return data
 
-    async def get_match_history(self, puuid: str, region: str, count: int = 10) -> List[str]:
-        """Get recent match history for a summoner using match-v5 endpoint."""
+    async def get_match_history(
+        self,
+        puuid: str,
+        region: str,
+        count: int = 10,
+        use_cache: bool = True,
+        start: int = 0,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
+    ) -> List[str]:
+        """Get match history for a summoner using match-v5 endpoint, newest first.
+
+        start pages through older history (Riot allows up to 100 ids per call),
+        start_time (epoch seconds) limits the list to games started at or after
+        it and end_time to games started at or before it.
+        """
         routing = self._get_routing_value(region)
-        url = f"{self.base_urls[routing]}/lol/match/v5/matches/by-puuid/{puuid}/ids?start=0&count={count}"
-        headers = {
-            "X-Riot-Token": self.api_key
-        }
-        return await self._make_request(url, headers)
+        url = f"{self.base_urls[routing]}/lol/match/v5/matches/by-puuid/{puuid}/ids?start={start}&count={count}"
+        if start_time is not None:
+            url += f"&startTime={start_time}"
+        if end_time is not None:
+            url += f"&endTime={end_time}"
+        key = ('match_history', routing, puuid, count, start, start_time, end_time)
+        return await self._cached_request(key, url, use_cache)
 
     async def get_match_timeline(self, match_id: str, region: str) -> Optional[Dict]:
         """Get timeline information for a specific match using match-v5 endpoint."""
+        # Timelines never change once a match is over
+        cached_data = await run_io(self.match_store.get, match_id, TIMELINE)
+        if cached_data:
+            return cached_data
+
         routing = self._get_routing_value(region)
         url = f"{self.base_urls[routing]}/lol/match/v5/matches/{match_id}/timeline"
         headers = {
             "X-Riot-Token": self.api_key
         }
-        return await self._make_request(url, headers)
+        data = await self._make_request(url, headers)
 
-    async def get_account_by_riot_id(self, game_name: str, tag_line: str, region: str) -> Dict:
+        if data:
+            await run_io(self.match_store.put, match_id, data, TIMELINE)
+        return data
+
+    async def get_account_by_riot_id(self, game_name: str, tag_line: str, region: str, use_cache: bool = True) -> Dict:
         """Get account information using Riot ID (game name and tag line)."""
         routing = self._get_routing_value(region)
         url = f"{self.base_urls[routing]}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-        headers = {
-            "X-Riot-Token": self.api_key
-        }
-        return await self._make_request(url, headers)
+        # Riot IDs are case-insensitive
+        key = ('account', routing, game_name.lower(), tag_line.lower())
+        return await self._cached_request(key, url, use_cache)
 
-    async def get_summoner_by_puuid(self, puuid: str, region: str) -> Dict:
+    async def get_summoner_by_puuid(self, puuid: str, region: str, use_cache: bool = True) -> Dict:
         """Get summoner information by PUUID."""
         url = f"https://{region}.api.riotgames.com/lol/summoner/v4/summoners/by-puuid/{puuid}"
-        headers = {
-            "X-Riot-Token": self.api_key
-        }
-        return await self._make_request(url, headers)
+        return await self._cached_request(('summoner', region.lower(), puuid), url, use_cache)
 
     async def get_champion_mastery(self, summoner_id: str, region: str) -> List[Dict]:
         """Get champion mastery information for a summoner."""
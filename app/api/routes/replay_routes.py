@@ -3,6 +3,7 @@ from typing import List
 from ...replay.services.replay_service import ReplayService
 from ...replay.services.replay_parser import ReplayParser
 from ...replay.models.replay import ProcessedReplay
+from ...services.async_io import run_io, atomic_write_bytes
 import logging
 
 router = APIRouter()
@@ -22,7 +23,7 @@ async def list_replays():
         
         for file_path in replay_files:
             try:
-                replay = replay_service.load_replay(file_path.stem)
+                replay = await replay_service.load_replay_async(file_path.stem)
                 replays.append({
                     "match_id": replay.match_id,
                     "game_duration": replay.game_duration,
@@ -42,7 +43,7 @@ async def list_replays():
 async def get_replay(match_id: str):
     """Get a specific replay by match ID."""
     try:
-        return replay_service.load_replay(match_id)
+        return await replay_service.load_replay_async(match_id)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Replay not found")
     except Exception as e:
@@ -60,16 +61,15 @@ async def upload_replay(replay: UploadFile = File(...)):
         temp_path = replay_service.data_dir / "temp" / replay.filename
         temp_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(temp_path, "wb") as f:
-            content = await replay.read()
-            f.write(content)
+        content = await replay.read()
+        await run_io(atomic_write_bytes, temp_path, content)
         
         try:
             # Parse the replay file
             processed_replay = await replay_parser.parse_rofl_file(str(temp_path))
             
             # Save the processed replay
-            match_id = replay_service.save_replay(processed_replay)
+            match_id = await replay_service.save_replay_async(processed_replay)
             
             return {
                 "match_id": match_id,
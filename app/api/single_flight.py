@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    """A shared in-flight call and the number of callers awaiting it."""
+
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key.
+
+    The first caller for a key starts the call as a task; callers arriving while
+    it is in flight await the same task instead of starting their own. A caller
+    being cancelled does not cancel the shared call for the others, but the call
+    is cancelled once nobody is waiting for it. The key is forgotten as soon as
+    the call finishes, so errors are never cached.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.stats = {"calls": 0, "coalesced": 0, "errors": 0, "cancelled": 0}
+
+    def _forget(self, key: Hashable, call: _Call, task: "asyncio.Task"):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.stats["errors"] += 1
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `fn` for `key`, or join the call already in flight for it."""
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._forget(key, call, task))
+            self.stats["calls"] += 1
+        else:
+            self.stats["coalesced"] += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every caller gave up, so nobody needs the result
+                call.task.cancel()
+                self.stats["cancelled"] += 1
+
+    def get_stats(self) -> Dict:
+        """Get counters for started, coalesced, failed and cancelled calls."""
+        return {**self.stats, "in_flight": len(self._calls)}
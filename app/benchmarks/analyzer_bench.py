@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+from statistics import median
+from typing import Dict, List, Optional
+from app.analysis.stats_analyzer import StatsAnalyzer
+from app.benchmarks.synthetic import iter_matches, player_pool
+
+# Match counts run by default, one child process each so peak RSS is per size
+SIZES = [1000, 10000, 100000, 1000000]
+
+# Timed calls for the warm query benchmarks and sampled match ids for get_match_details
+QUERY_REPEATS = 20
+DETAIL_SAMPLES = 1000
+
+
+def peak_rss_mib() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+
+def _timings(samples: List[float]) -> Dict:
+    ordered = sorted(samples)
+    return {
+        "calls": len(ordered),
+        "mean_us": round(sum(ordered) / len(ordered) * 1e6, 2),
+        "p50_us": round(median(ordered) * 1e6, 2),
+        "p99_us": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6, 2),
+        "max_us": round(ordered[-1] * 1e6, 2)
+    }
+
+
+def _time_query(fn) -> Dict:
+    """Time the first call, which may build lazy state, then QUERY_REPEATS warm calls."""
+    started = time.perf_counter()
+    fn()
+    cold = time.perf_counter() - started
+    warm = []
+    for _ in range(QUERY_REPEATS):
+        started = time.perf_counter()
+        fn()
+        warm.append(time.perf_counter() - started)
+    return {"cold_us": round(cold * 1e6, 2), **_timings(warm)}
+
+
+def run_size(size: int, seed: int, pool_size: int) -> Dict:
+    """Benchmark one match count in this process.
+
+    Matches are generated on the fly and never kept, so memory reflects what
+    the analyzer holds. Only the timed calls count towards each phase.
+    """
+    focus = player_pool(pool_size)[0]
+    parser = StatsAnalyzer()
+    analyzer = StatsAnalyzer()
+    analyzer.puuid = focus
+    rss_start = peak_rss_mib()
+
+    parse = 0.0
+    add = 0.0
+    for match_data in iter_matches(size, seed=seed, pool_size=pool_size, focus=focus):
+        started = time.perf_counter()
+        parser._parse_match(match_data)
+        parse += time.perf_counter() - started
+        started = time.perf_counter()
+        analyzer.add_match(match_data)
+        add += time.perf_counter() - started
+    rss_loaded = peak_rss_mib()
+
+    phases = {
+        "parse": {"total_s": round(parse, 3), "per_match_us": round(parse / size * 1e6, 2)},
+        "add_match": {"total_s": round(add, 3), "per_match_us": round(add / size * 1e6, 2)},
+        "get_player_stats": _time_query(analyzer.get_player_stats),
+        "get_champion_stats": _time_query(analyzer.get_champion_stats)
+    }
+
+    rnd = random.Random(seed)
+    match_ids = [f"NA1_{4000000000 + rnd.randrange(size)}" for _ in range(DETAIL_SAMPLES)]
+    details = []
+    for match_id in match_ids:
+        started = time.perf_counter()
+        analyzer.get_match_details(match_id)
+        details.append(time.perf_counter() - started)
+    phases["get_match_details"] = _timings(details)
+
+    return {
+        "size": size,
+        "phases": phases,
+        "rss_mib": {
+            "start": rss_start,
+            "after_add": rss_loaded,
+            "peak": peak_rss_mib()
+        }
+    }
+
+
+def run_in_child(size: int, seed: int, pool_size: int) -> Dict:
+    """Run one size in a fresh interpreter so its peak RSS isn't inflated by earlier sizes."""
+    command = [
+        sys.executable, "-m", "app.benchmarks.analyzer_bench",
+        "--child", "--sizes", str(size), "--seed", str(seed), "--pool-size", str(pool_size)
+    ]
+    completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if completed.returncode != 0:
+        # A size too large for this machine is recorded rather than ending the run
+        return {"size": size, "error": f"exit code {completed.returncode}: {completed.stderr.strip()[-500:]}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(["git", "rev-parse", "--short", "HEAD"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+
+def compare(current: Dict, baseline: Dict) -> List[str]:
+    """Per size and phase, the ratio of current to baseline time (below 1 is faster)."""
+    lines = []
+    previous = {result["size"]: result for result in baseline["results"] if "phases" in result}
+    for result in current["results"]:
+        old = previous.get(result["size"])
+        if old is None or "phases" not in result:
+            continue
+        for phase, timing in result["phases"].items():
+            old_timing = old["phases"].get(phase)
+            if old_timing is None:
+                continue
+            key = "per_match_us" if "per_match_us" in timing else "p50_us"
+            if old_timing[key]:
+                lines.append(
+                    f"{result['size']:>8} {phase:<20} {old_timing[key]:>12.2f} -> {timing[key]:>12.2f} us"
+                    f"  x{timing[key] / old_timing[key]:.2f}"
+                )
+        if old["rss_mib"]["peak"]:
+            lines.append(
+                f"{result['size']:>8} {'peak_rss_mib':<20} {old['rss_mib']['peak']:>12.1f} -> "
+                f"{result['rss_mib']['peak']:>12.1f}     x{result['rss_mib']['peak'] / old['rss_mib']['peak']:.2f}"
+            )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark StatsAnalyzer throughput and memory on synthetic matches.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Match counts to benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pool-size", type=int, default=200, help="Distinct players the matches draw from")
+    parser.add_argument("--out", help="Write the results JSON to this path")
+    parser.add_argument("--compare", help="Results JSON from an earlier run to compare against")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_size(args.sizes[0], args.seed, args.pool_size)))
+        return
+
+    report = {
+        "meta": {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "pool_size": args.pool_size
+        },
+        "results": []
+    }
+    for size in args.sizes:
+        print(f"Benchmarking {size} matches...", file=sys.stderr)
+        result = run_in_child(size, args.seed, args.pool_size)
+        report["results"].append(result)
+        print(json.dumps(result), file=sys.stderr)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        print("\n".join(compare(report, baseline)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+from app.analysis.stats_analyzer import StatsAnalyzer
+from app.benchmarks.synthetic import iter_matches
+from app.services.match_store import MatchStore
+
+def build_store(path: Path, count: int, seed: int) -> List[str]:
+    """Fill a match store with synthetic matches and return their ids."""
+    store = MatchStore(str(path))
+    match_ids = []
+    batch = []
+    for match_data in iter_matches(count, seed=seed):
+        match_id = match_data['metadata']['matchId']
+        match_ids.append(match_id)
+        batch.append((match_id, match_data))
+        if len(batch) == 1000:
+            store.put_many(batch)
+            batch = []
+    store.put_many(batch)
+    store.close()
+    return match_ids
+
+def run_sequential(store: MatchStore, match_ids: List[str]) -> Dict:
+    """One store read and add_match per match, the way callers fed the analyzer before."""
+    analyzer = StatsAnalyzer()
+    started = time.perf_counter()
+    for match_id in match_ids:
+        analyzer.add_match(store.get(match_id))
+    elapsed = time.perf_counter() - started
+    return {"mode": "add_match", "workers": 0, "elapsed_s": round(elapsed, 2), "matches_per_s": round(len(match_ids) / elapsed)}
+
+def run_bulk(store: MatchStore, match_ids: List[str], workers: int, batch_size: int) -> Dict:
+    analyzer = StatsAnalyzer()
+    started = time.perf_counter()
+    added = analyzer.add_matches(match_ids, store=store, workers=workers, batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": "add_matches",
+        "workers": workers,
+        "added": added,
+        "elapsed_s": round(elapsed, 2),
+        "matches_per_s": round(added / elapsed)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Time StatsAnalyzer bulk imports from the match store.")
+    parser.add_argument("--matches", type=int, default=100000, help="Synthetic matches to import")
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="Process pool sizes to try (default: 0 and 1..cpu count in powers of two)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-sequential", action="store_true", help="Don't time the add_match loop")
+    args = parser.parse_args()
+
+    workers = args.workers
+    if workers is None:
+        workers = [0]
+        size = 2
+        while size <= (os.cpu_count() or 1):
+            workers.append(size)
+            size *= 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "matches.db"
+        print(f"Building a store of {args.matches} synthetic matches...")
+        match_ids = build_store(path, args.matches, args.seed)
+        store = MatchStore(str(path))
+        print(json.dumps({"cpu_count": os.cpu_count(), "matches": args.matches}))
+        if not args.skip_sequential:
+            print(json.dumps(run_sequential(store, match_ids)))
+        for count in workers:
+            print(json.dumps(run_bulk(store, match_ids, count, args.batch_size)))
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+from app.services.async_io import run_io, atomic_write_json
+from app.services.match_store import MatchStore, TIMELINE
+
+def make_timeline(frames: int = 40) -> Dict:
+    """Build a timeline-sized payload (a few hundred KB of JSON)."""
+    return {
+        "metadata": {"matchId": "BENCH_1", "participants": [f"puuid-{i}" for i in range(10)]},
+        "info": {
+            "frameInterval": 60000,
+            "frames": [
+                {
+                    "timestamp": frame * 60000,
+                    "participantFrames": {
+                        str(p): {
+                            "position": {"x": frame * 10 + p, "y": frame * 7 + p},
+                            "currentGold": frame * 100,
+                            "totalGold": frame * 350,
+                            "minionsKilled": frame * 6,
+                            "level": min(18, frame // 2 + 1),
+                            "championStats": {f"stat{k}": k * frame for k in range(25)},
+                            "damageStats": {f"damage{k}": k * frame * 3 for k in range(12)}
+                        }
+                        for p in range(1, 11)
+                    },
+                    "events": [
+                        {"type": "WARD_PLACED", "timestamp": frame * 60000 + e, "creatorId": e % 10 + 1}
+                        for e in range(40)
+                    ]
+                }
+                for frame in range(frames)
+            ]
+        }
+    }
+
+class LagMonitor:
+    """Measures how late a periodic task wakes up, i.e. how long the event loop was blocked."""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.lags: List[float] = []
+        self._running = False
+
+    async def run(self):
+        self._running = True
+        while self._running:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def stop(self):
+        self._running = False
+
+    def summary(self) -> Dict:
+        lags = sorted(self.lags) or [0.0]
+        return {
+            "samples": len(lags),
+            "mean_ms": round(statistics.mean(lags) * 1000, 3),
+            "p99_ms": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000, 3),
+            "max_ms": round(lags[-1] * 1000, 3)
+        }
+
+async def run_case(mode: str, workdir: Path, payload: Dict, concurrency: int, rounds: int) -> Dict:
+    """Run concurrent saves and loads of the payload, inline or on the I/O executor."""
+    store = MatchStore(str(workdir / f"{mode}.db"))
+    json_dir = workdir / mode
+    json_dir.mkdir(exist_ok=True)
+
+    async def call(fn, *args):
+        if mode == "executor":
+            return await run_io(fn, *args)
+        return fn(*args)
+
+    def load_json(path: Path) -> Dict:
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    async def worker(worker_id: int):
+        for i in range(rounds):
+            match_id = f"BENCH_{worker_id}_{i}"
+            await call(store.put, match_id, payload, TIMELINE)
+            await call(store.get, match_id, TIMELINE)
+            path = json_dir / f"{match_id}.json"
+            await call(atomic_write_json, path, payload)
+            await call(load_json, path)
+            # Yield between operations like a request handler would
+            await asyncio.sleep(0)
+
+    monitor = LagMonitor()
+    monitor_task = asyncio.create_task(monitor.run())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    monitor.stop()
+    await monitor_task
+    store.close()
+
+    return {"mode": mode, "elapsed_s": round(elapsed, 3), **monitor.summary()}
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare event-loop lag of inline vs executor disk I/O.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent simulated requests")
+    parser.add_argument("--rounds", type=int, default=5, help="Save/load rounds per request")
+    parser.add_argument("--frames", type=int, default=40, help="Timeline frames per payload")
+    args = parser.parse_args()
+
+    payload = make_timeline(args.frames)
+    print(f"Payload size: {len(json.dumps(payload)) / 1024:.0f} KiB")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("inline", "executor"):
+            result = await run_case(mode, Path(tmp), payload, args.concurrency, args.rounds)
+            print(json.dumps(result))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Dict
+from app.analysis.stats_analyzer import StatsAnalyzer
+from app.benchmarks.synthetic import iter_matches
+
+def measure_models(count: int, seed: int) -> Dict:
+    """Bytes held per parsed match model, with the source dicts dropped."""
+    analyzer = StatsAnalyzer()
+    source = list(iter_matches(count, seed=seed))
+    started = time.perf_counter()
+    for match_data in source:
+        analyzer._parse_match(match_data)
+    parse = time.perf_counter() - started
+    del source
+
+    models = []
+    gc.collect()
+    tracemalloc.start()
+    for match_data in iter_matches(count, seed=seed):
+        models.append(analyzer._parse_match(match_data))
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # First access to the fields the match details endpoint reads
+    started = time.perf_counter()
+    for match in models:
+        for participant in match.info.participants:
+            participant.perks
+            participant.challenges
+    access = time.perf_counter() - started
+
+    return {
+        "model_bytes_per_match": round(current / count),
+        "parse_us_per_match": round(parse / count * 1e6, 1),
+        "perks_challenges_access_us_per_match": round(access / count * 1e6, 1)
+    }
+
+def measure_analyzer(count: int, seed: int) -> Dict:
+    """Bytes held per match by a StatsAnalyzer, including its indexes and columns."""
+    source = list(iter_matches(count, seed=seed))
+    analyzer = StatsAnalyzer()
+    started = time.perf_counter()
+    for match_data in source:
+        analyzer.add_match(match_data)
+    elapsed = time.perf_counter() - started
+    del source, analyzer
+
+    gc.collect()
+    tracemalloc.start()
+    analyzer = StatsAnalyzer()
+    for match_data in iter_matches(count, seed=seed):
+        analyzer.add_match(match_data)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "analyzer_bytes_per_match": round(current / count),
+        "analyzer_peak_mib": round(peak / 2 ** 20, 1),
+        "add_match_us": round(elapsed / count * 1e6, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory held per stored match by the StatsAnalyzer model.")
+    parser.add_argument("--matches", type=int, default=2000, help="Synthetic matches to store")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = {"matches": args.matches}
+    result.update(measure_models(args.matches, args.seed))
+    result.update(measure_analyzer(args.matches, args.seed))
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import random
+from typing import Dict, Iterator, List, Optional
+
+# (championName, championId) pairs the generator picks from
+CHAMPIONS = [
+    ("Aatrox", 266), ("Ahri", 103), ("Akali", 84), ("Ashe", 22), ("Caitlyn", 51),
+    ("Darius", 122), ("Ezreal", 81), ("Garen", 86), ("Jax", 24), ("Jinx", 222),
+    ("KaiSa", 145), ("LeeSin", 64), ("Lulu", 117), ("Lux", 99), ("Nautilus", 111),
+    ("Orianna", 61), ("Sett", 875), ("Thresh", 412), ("Viego", 234), ("Yasuo", 157),
+]
+
+POSITIONS = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+
+QUEUES = [420, 440, 400, 450]
+
+# A sample of match-v5 challenge keys; real participants carry over a hundred
+CHALLENGE_KEYS = [
+    "abilityUses", "alliedJungleMonsterKills", "baronTakedowns", "bountyGold", "buffsStolen",
+    "controlWardsPlaced", "damagePerMinute", "damageTakenOnTeamPercentage", "dodgeSkillShotsSmallWindow",
+    "dragonTakedowns", "effectiveHealAndShielding", "enemyChampionImmobilizations", "enemyJungleMonsterKills",
+    "epicMonsterSteals", "firstTurretKilled", "gameLength", "goldPerMinute", "immobilizeAndKillWithAlly",
+    "initialBuffCount", "initialCragScuttleCount", "jungleCsBefore10Minutes", "kda", "killAfterHiddenWithAlly",
+    "killParticipation", "killsNearEnemyTurret", "laneMinionsFirst10Minutes", "landSkillShotsEarlyGame",
+    "maxCsAdvantageOnLaneOpponent", "maxKillDeficit", "maxLevelLeadLaneOpponent", "moreEnemyJungleThanOpponent",
+    "multiKillOneSpell", "outnumberedKills", "pickKillWithAlly", "quickSoloKills", "riftHeraldTakedowns",
+    "saveAllyFromDeath", "scuttleCrabKills", "skillshotsDodged", "skillshotsHit", "soloKills",
+    "stealthWardsPlaced", "takedownOnFirstTurret", "takedowns", "teamDamagePercentage", "turretPlatesTaken",
+    "turretTakedowns", "visionScoreAdvantageLaneOpponent", "visionScorePerMinute", "wardTakedowns",
+    "wardsGuarded", "abilityUsesPerMinute", "acesBefore15Minutes", "alliedJungleMonsterKillsPerMinute",
+    "blastConeOppositeOpponentCount", "completeSupportQuestInTime", "deathsByEnemyChamps", "doubleAces",
+    "earliestDragonTakedown", "elderDragonKillsWithOpposingSoul", "flawlessAces", "fullTeamTakedown",
+    "getTakedownsInAllLanesEarlyJungleAsLaner", "hadOpenNexus", "junglerTakedownsNearDamagedEpicMonster",
+    "killingSprees", "knockEnemyIntoTeamAndKill", "legendaryCount", "lostAnInhibitor", "mejaisFullStackInTime",
+    "multiTurretRiftHeraldCount", "multikills", "perfectDragonSoulsTaken", "poroExplosions",
+    "skillshotsEarlyGame", "survivedSingleDigitHpCount", "teleportTakedowns", "turretsTakenWithRiftHerald",
+]
+
+
+def _perks(rnd: random.Random) -> Dict:
+    return {
+        "statPerks": {"defense": 5002, "flex": 5008, "offense": rnd.choice([5005, 5008])},
+        "styles": [
+            {
+                "description": "primaryStyle",
+                "selections": [
+                    {"perk": rnd.randint(8000, 8500), "var1": rnd.randint(0, 2000), "var2": 0, "var3": 0}
+                    for _ in range(4)
+                ],
+                "style": rnd.choice([8000, 8100, 8200, 8300, 8400])
+            },
+            {
+                "description": "subStyle",
+                "selections": [
+                    {"perk": rnd.randint(8000, 8500), "var1": rnd.randint(0, 500), "var2": 0, "var3": 0}
+                    for _ in range(2)
+                ],
+                "style": rnd.choice([8000, 8100, 8200, 8300, 8400])
+            }
+        ]
+    }
+
+
+def _participant(rnd: random.Random, puuid: str, slot: int, win: bool, duration: int) -> Dict:
+    name, champion_id = rnd.choice(CHAMPIONS)
+    # Off-role games and remakes leave the position empty now and then
+    position = POSITIONS[slot % 5] if rnd.random() > 0.05 else ""
+    minutes = duration / 60
+    return {
+        "puuid": puuid,
+        "summonerId": f"summoner-{puuid}",
+        "summonerName": f"Player {puuid[-4:]}",
+        "championId": champion_id,
+        "championName": name,
+        "teamId": 100 if slot < 5 else 200,
+        "teamPosition": position,
+        "individualPosition": position if rnd.random() > 0.1 else rnd.choice(POSITIONS),
+        "win": win,
+        "kills": rnd.randint(0, 20),
+        "deaths": rnd.randint(0, 15),
+        "assists": rnd.randint(0, 25),
+        "totalDamageDealtToChampions": int(rnd.uniform(300, 1200) * minutes),
+        "totalDamageTaken": int(rnd.uniform(400, 1300) * minutes),
+        "goldEarned": int(rnd.uniform(250, 550) * minutes),
+        "visionScore": rnd.randint(0, int(minutes * 3)),
+        "timeCCingOthers": rnd.randint(0, 90),
+        "totalTimeSpentDead": rnd.randint(0, 600),
+        "doubleKills": rnd.randint(0, 3),
+        "tripleKills": rnd.randint(0, 1),
+        "quadraKills": 1 if rnd.random() < 0.02 else 0,
+        "pentaKills": 1 if rnd.random() < 0.003 else 0,
+        "totalMinionsKilled": rnd.randint(0, int(minutes * 9)),
+        "neutralMinionsKilled": rnd.randint(0, int(minutes * 6)),
+        "totalDamageDealt": int(rnd.uniform(1500, 6000) * minutes),
+        "magicDamageDealt": int(rnd.uniform(0, 3000) * minutes),
+        "physicalDamageDealt": int(rnd.uniform(0, 3000) * minutes),
+        "trueDamageDealt": int(rnd.uniform(0, 400) * minutes),
+        "perks": _perks(rnd),
+        "challenges": {
+            key: round(rnd.uniform(0, 100), 3) if index % 3 == 0 else rnd.randint(0, 20)
+            for index, key in enumerate(CHALLENGE_KEYS)
+        }
+    }
+
+
+def generate_match(rnd: random.Random, index: int, puuids: List[str], start_timestamp: int) -> Dict:
+    """Build one match-v5 match dict for ten players."""
+    duration = rnd.randint(15 * 60, 45 * 60)
+    blue_wins = rnd.random() < 0.5
+    participants = [
+        _participant(rnd, puuid, slot, blue_wins == (slot < 5), duration)
+        for slot, puuid in enumerate(puuids)
+    ]
+    return {
+        "metadata": {
+            "dataVersion": "2",
+            "matchId": f"NA1_{4000000000 + index}",
+            "participants": list(puuids)
+        },
+        "info": {
+            "gameId": 4000000000 + index,
+            "gameCreation": start_timestamp - 60000,
+            "gameDuration": duration,
+            "gameEndTimestamp": start_timestamp + duration * 1000,
+            "gameStartTimestamp": start_timestamp,
+            "gameMode": "CLASSIC",
+            "gameType": "MATCHED_GAME",
+            "gameVersion": f"14.{rnd.randint(1, 20)}.{rnd.randint(100, 999)}.1234",
+            "mapId": 11,
+            "participants": participants,
+            "teams": [
+                {"teamId": 100, "win": blue_wins, "objectives": {"baron": {"first": blue_wins, "kills": rnd.randint(0, 2)}}},
+                {"teamId": 200, "win": not blue_wins, "objectives": {"baron": {"first": not blue_wins, "kills": rnd.randint(0, 2)}}}
+            ],
+            "queueId": rnd.choice(QUEUES)
+        }
+    }
+
+
+def player_pool(size: int) -> List[str]:
+    """PUUID-like identifiers for a pool of players."""
+    return [f"synthetic-puuid-{i:06d}" for i in range(size)]
+
+
+def iter_matches(count: int, seed: int = 0, pool_size: int = 200, focus: Optional[str] = None) -> Iterator[Dict]:
+    """Yield `count` matches in chronological order.
+
+    Each match draws ten players from the pool. When `focus` is given that
+    PUUID plays in every match, like a summoner's own match history.
+    """
+    rnd = random.Random(seed)
+    pool = player_pool(pool_size)
+    timestamp = 1700000000000
+    for index in range(count):
+        puuids = rnd.sample(pool, 10)
+        if focus is not None and focus not in puuids:
+            puuids[rnd.randrange(10)] = focus
+        timestamp += rnd.randint(20, 120) * 60000
+        yield generate_match(rnd, index, puuids, timestamp)
+
+
+def generate_matches(count: int, seed: int = 0, pool_size: int = 200, focus: Optional[str] = None) -> List[Dict]:
+    return list(iter_matches(count, seed, pool_size, focus))
@@ -1,13 +1,16 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.requests import Request
 from pydantic import BaseModel
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple, AsyncIterator
 import uvicorn
+import json
 import traceback
 import sys
+import os
+import asyncio
 import logging
 from datetime import datetime
 from fastapi.middleware.cors import CORSMiddleware
@@ -15,7 +18,15 @@ from .api.routes import replay_routes
 from .api.routes import command_log
 
 from .api.riot_client import RiotAPIClient
-from .analysis.stats_analyzer import StatsAnalyzer
+from .api.match_history_sync import MatchHistorySync
+from .analysis.trends import TREND_WINDOW
+from .services.analysis_cache import MatchAnalysisCache
+from .services.analyzer_pool import AnalyzerPool
+from .services.async_io import run_io
+from .services.baseline_updater import BaselineUpdater
+from .services.debug_log import DebugLogBuffer
+from .services.job_queue import JobQueue
+from .services.response_cache import BuiltBody, CachedResponse, ResponseBuilder, ResponseCache, body_etag
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -40,10 +51,37 @@ templates = Jinja2Templates(directory="app/templates")
 
 # Initialize components
 riot_client = RiotAPIClient()
-stats_analyzer = StatsAnalyzer()
+history_sync = MatchHistorySync(riot_client)
+analysis_cache = MatchAnalysisCache(riot_client.match_store)
+analyzer_pool = AnalyzerPool()
+response_cache = ResponseCache()
+job_queue = JobQueue(riot_client.match_store)
 
-# Store debug logs
-debug_logs = []
+# Population percentile sketches are saved here periodically and at shutdown, and loaded at startup
+BASELINES_PATH = os.getenv("BASELINES_PATH", "data/baselines.json")
+baseline_updater = BaselineUpdater(BASELINES_PATH)
+
+# Recent debug logs, bounded and optionally spilled to disk as they age out
+debug_logs = DebugLogBuffer()
+
+# Most debug log entries one /api/debug-logs page may return
+DEBUG_LOG_PAGE_MAX = int(os.getenv("DEBUG_LOG_PAGE_MAX", "1000"))
+
+# Maximum number of match details fetched at once per request. The client's
+# rate limiter still paces the actual calls to Riot.
+MATCH_FETCH_CONCURRENCY = int(os.getenv("MATCH_FETCH_CONCURRENCY", "8"))
+
+# Upper bound on match_count when match ids come from the synced history
+MAX_SYNCED_MATCH_COUNT = int(os.getenv("MAX_SYNCED_MATCH_COUNT", "500"))
+
+# Most players one /api/compare/players request may ask for
+MAX_COMPARE_PLAYERS = int(os.getenv("MAX_COMPARE_PLAYERS", "10"))
+
+# Media types of the progressive /api/analyze formats
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream"
+}
 
 # Include replay system routers
 app.include_router(replay_routes.router, prefix="/api", tags=["replays"])
@@ -53,6 +91,7 @@ class SummonerRequest(BaseModel):
     summoner_name: str
     region: str
     match_count: int = 5
+    sync_history: bool = False
 
 class MatchAnalysis(BaseModel):
     match_id: str
@@ -79,6 +118,20 @@ class CompareRequest(BaseModel):
     summoner2_region: str
     match_count: int = 5
 
+class AnalyzeJobRequest(BaseModel):
+    summoner_name: str
+    region: str
+    match_count: int = 20
+    include_timelines: bool = False
+
+class ComparePlayer(BaseModel):
+    summoner_name: str
+    region: str
+
+class ComparePlayersRequest(BaseModel):
+    players: List[ComparePlayer]
+    match_count: int = 5
+
 def log_debug(level: str, message: str, exc_info=None):
     """Log debug information with timestamp and stack trace."""
     timestamp = datetime.now().isoformat()
@@ -105,14 +158,80 @@ def log_debug(level: str, message: str, exc_info=None):
         traceback=traceback_str,
         code_context=code_context
     )
-    debug_logs.append(log_entry)
+    debug_logs.add(level, log_entry.dict())
     return log_entry
 
+async def fetch_match(match_id: str, region: str, semaphore: asyncio.Semaphore) -> Tuple[Optional[Dict], bool]:
+    """Fetch one match's details as (match_data, from_cache).
+
+    A match that fails to load is logged and returned as (None, False) so it
+    doesn't fail the request. Loaded matches feed the population baselines.
+    """
+    try:
+        async with semaphore:
+            # Finished matches never change, so stored copies are always used
+            match_data, tier = await riot_client.get_match(match_id, region)
+    except Exception as e:
+        log_debug("WARNING", f"Failed to fetch match {match_id}: {str(e)}")
+        return None, False
+    if tier == "network":
+        log_debug("INFO", f"Fetched details for match {match_id}")
+    if match_data is not None:
+        baseline_updater.submit(match_data)
+    return match_data, tier != "network"
+
+async def fetch_matches(match_ids: List[str], region: str) -> List[Tuple[Optional[Dict], bool]]:
+    """Fetch match details concurrently, keeping match history order.
+
+    Returns a (match_data, from_cache) pair per match id, as fetch_match does.
+    """
+    semaphore = asyncio.Semaphore(MATCH_FETCH_CONCURRENCY)
+    return list(await asyncio.gather(*(fetch_match(match_id, region, semaphore) for match_id in match_ids)))
+
+async def fetch_matches_as_completed(
+    match_ids: List[str], region: str
+) -> AsyncIterator[Tuple[int, Optional[Dict], bool]]:
+    """Fetch match details concurrently, yielding (index, match_data, from_cache) as each one arrives."""
+    semaphore = asyncio.Semaphore(MATCH_FETCH_CONCURRENCY)
+
+    async def fetch(index: int, match_id: str) -> Tuple[int, Optional[Dict], bool]:
+        match_data, from_cache = await fetch_match(match_id, region, semaphore)
+        return index, match_data, from_cache
+
+    tasks = [asyncio.ensure_future(fetch(index, match_id)) for index, match_id in enumerate(match_ids)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Stop outstanding fetches if the consumer goes away, e.g. a closed stream
+        for task in tasks:
+            task.cancel()
+
 # Add test debug logs
 log_debug("INFO", "Application started")
 log_debug("WARNING", "This is a test warning message")
 log_debug("ERROR", "This is a test error message", sys.exc_info())
 
+@app.on_event("startup")
+async def startup():
+    """Open the Riot API client's pooled HTTP sessions, load baselines, resume saved jobs and drop outdated match analyses."""
+    await riot_client.start()
+    await baseline_updater.start()
+    await job_queue.start()
+    purged = await analysis_cache.purge_stale()
+    if purged:
+        logger.info(f"Removed {purged} match analyses from older analysis versions")
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop job workers, close pooled HTTP sessions and their keep-alive connections, then save baselines and debug logs."""
+    await job_queue.stop()
+    await riot_client.close()
+    # The replay parser mounted under /api keeps its own session pool
+    await replay_routes.replay_parser.close()
+    await baseline_updater.stop()
+    await run_io(debug_logs.close)
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to JaxStats API"}
@@ -127,140 +246,493 @@ async def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 @app.get("/api/debug-logs")
-async def get_debug_logs():
-    """Get all debug logs."""
+async def get_debug_logs(
+    cursor: Optional[int] = None,
+    limit: int = 100,
+    level: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    epoch: Optional[str] = None
+):
+    """Get debug logs after a cursor, oldest first, filtered by minimum level and time.
+
+    Pass the returned next_cursor and epoch on the next call to get only newer
+    entries; after a restart the epoch changes and reading starts over.
+    """
     try:
-        return {"logs": debug_logs}
+        if limit < 1 or limit > DEBUG_LOG_PAGE_MAX:
+            error_msg = f"Limit must be between 1 and {DEBUG_LOG_PAGE_MAX}"
+            log_debug("ERROR", error_msg)
+            raise ValueError(error_msg)
+        return debug_logs.query(cursor, limit, level, since, until, epoch)
     except Exception as e:
         error_msg = f"Error retrieving debug logs: {str(e)}"
         log_debug("ERROR", error_msg, sys.exc_info())
         raise HTTPException(status_code=500, detail=error_msg)
 
+@app.get("/api/client-stats")
+async def get_client_stats():
+    """Get Riot API client statistics such as connection pool reuse."""
+    return {
+        **riot_client.get_stats(),
+        "history_sync": history_sync.get_stats(),
+        "analysis_cache": analysis_cache.get_stats(),
+        "analyzer_pool": analyzer_pool.get_stats(),
+        "analyze_responses": response_cache.get_stats(),
+        "baselines": baseline_updater.get_stats(),
+        "jobs": job_queue.get_stats(),
+        "debug_logs": debug_logs.get_stats()
+    }
+
 @app.post("/api/analyze")
 async def analyze_summoner_post(request: SummonerRequest):
     """Analyze a summoner's match history and provide insights (POST endpoint)."""
     try:
-        return await analyze_summoner(request.summoner_name, request.region, request.match_count, use_cache=True)
+        entry, served = await get_analysis(
+            request.summoner_name, request.region, request.match_count,
+            use_cache=True, sync_history=request.sync_history
+        )
+        # 304 only answers conditional GETs, so POST always gets the body
+        return cached_json_response(entry, served)
     except Exception as e:
         error_msg = f"Error analyzing summoner: {str(e)}"
         log_debug("ERROR", error_msg, sys.exc_info())
         logger.error(f"Unhandled exception: {error_msg}", exc_info=True)
         raise HTTPException(status_code=500, detail=error_msg)
 
-@app.get("/api/analyze/{summoner_name}")
-async def analyze_summoner(summoner_name: str, region: str = "na1", match_count: int = 5, use_cache: bool = True):
-    """Analyze a summoner's match history and provide insights (GET endpoint)."""
-    try:
-        # Validate match_count
-        if match_count < 1 or match_count > 20:
-            error_msg = "Match count must be between 1 and 20"
-            log_debug("ERROR", error_msg)
-            raise ValueError(error_msg)
-            
-        # Split the summoner name into game name and tag line
-        if '#' not in summoner_name:
-            error_msg = "Summoner name must be in the format 'GameName#TAG'"
-            log_debug("ERROR", error_msg)
-            raise ValueError(error_msg)
-            
-        game_name, tag_line = summoner_name.split('#')
+async def resolve_summoner(
+    summoner_name: str,
+    region: str,
+    match_count: int,
+    use_cache: bool = True,
+    sync_history: bool = False
+) -> Tuple[str, Dict, List[str]]:
+    """Validate an analyze request and look up the PUUID, summoner and match ids to analyze."""
+    # Validate match_count
+    max_count = MAX_SYNCED_MATCH_COUNT if sync_history else 20
+    if match_count < 1 or match_count > max_count:
+        error_msg = f"Match count must be between 1 and {max_count}"
+        log_debug("ERROR", error_msg)
+        raise ValueError(error_msg)
         
-        # Get account info using Riot ID
-        log_debug("INFO", f"Fetching account info for {game_name}#{tag_line} in {region}")
-        account = await riot_client.get_account_by_riot_id(game_name, tag_line, region)
-        puuid = account['puuid']
+    # Split the summoner name into game name and tag line
+    if '#' not in summoner_name:
+        error_msg = "Summoner name must be in the format 'GameName#TAG'"
+        log_debug("ERROR", error_msg)
+        raise ValueError(error_msg)
         
-        # Get summoner info
-        log_debug("INFO", f"Fetching summoner info for PUUID {puuid}")
-        summoner = await riot_client.get_summoner_by_puuid(puuid, region)
-        
-        # Get match history with specified count
-        log_debug("INFO", f"Fetching {match_count} matches for PUUID {puuid}")
-        match_ids = await riot_client.get_match_history(puuid, region, count=match_count)
-        
-        # Get match details for each match
-        matches_data = []
-        cached_matches = []
-        new_matches = []
-        
-        for match_id in match_ids:
-            # Try to get cached match data first
-            cached_data = riot_client._load_match_data(match_id)
-            if cached_data and use_cache:
-                cached_matches.append(cached_data)
-            else:
-                log_debug("INFO", f"Fetching details for match {match_id}")
-                match_data = await riot_client.get_match_details(match_id, region)
-                if match_data:
-                    new_matches.append(match_data)
-        
-        # Combine cached and new matches
-        matches_data = cached_matches + new_matches
-        
-        # If we have no matches at all, return early
-        if not matches_data:
-            return {
-                "summoner_name": summoner.get("name", "Unknown"),
-                "summoner_level": summoner.get("summonerLevel", 0),
-                "profile_icon_id": summoner.get("profileIconId", 0),
-                "overall_stats": {},
-                "match_analyses": [],
-                "champion_stats": {},
-                "match_count": {
-                    "requested": match_count,
-                    "retrieved": len(match_ids),
-                    "analyzed": 0,
-                    "cached": 0,
-                    "new": 0
-                }
+    game_name, tag_line = summoner_name.split('#')
+    
+    # Get account info using Riot ID
+    log_debug("INFO", f"Fetching account info for {game_name}#{tag_line} in {region}")
+    account = await riot_client.get_account_by_riot_id(game_name, tag_line, region, use_cache=use_cache)
+    puuid = account['puuid']
+    
+    # Get summoner info
+    log_debug("INFO", f"Fetching summoner info for PUUID {puuid}")
+    summoner = await riot_client.get_summoner_by_puuid(puuid, region, use_cache=use_cache)
+    
+    # Get match history with specified count
+    log_debug("INFO", f"Fetching {match_count} matches for PUUID {puuid}")
+    if sync_history:
+        match_ids = await history_sync.get_match_ids(puuid, region, match_count)
+    else:
+        match_ids = await riot_client.get_match_history(puuid, region, count=match_count, use_cache=use_cache)
+    return puuid, summoner, match_ids
+
+def summoner_header(summoner: Dict) -> Dict:
+    return {
+        "summoner_name": summoner.get("name", "Unknown"),
+        "summoner_level": summoner.get("summonerLevel", 0),
+        "profile_icon_id": summoner.get("profileIconId", 0)
+    }
+
+def with_etag(body: Dict) -> BuiltBody:
+    # Hashed from the serialized body, since cache counts and dict key order
+    # can differ between builds of the same matches
+    etag, size = body_etag(body)
+    return body, etag, size
+
+async def summarize_analysis(
+    puuid: str,
+    summoner: Dict,
+    match_count: int,
+    match_ids: List[str],
+    matches_data: List[Dict],
+    match_analyses: List[MatchAnalysis],
+    cached_count: int,
+    new_count: int,
+    parsed: Optional[Dict] = None
+) -> BuiltBody:
+    """Build the analyze response body and its ETag from the fetched matches and their analyses.
+
+    `parsed` shares parsed match models with other players' analyzers.
+    """
+    header = summoner_header(summoner)
+
+    # If we have no matches at all, return early
+    if not matches_data:
+        return with_etag({
+            **header,
+            "overall_stats": {},
+            "match_analyses": [],
+            "champion_stats": {},
+            "match_count": {
+                "requested": match_count,
+                "retrieved": len(match_ids),
+                "analyzed": 0,
+                "cached": 0,
+                "new": 0
             }
-        
-        # Process matches
-        match_analyses = []
-        for match_data in matches_data:
-            # Get basic stats
-            basic_stats = stats_analyzer.get_basic_stats(match_data)
-            vision_stats = stats_analyzer.get_vision_stats(match_data)
-            objective_stats = stats_analyzer.get_objective_stats(match_data)
-            damage_stats = stats_analyzer.get_damage_stats(match_data)
-            timeline = stats_analyzer.get_timeline(match_data)
-            
-            # Create match analysis
-            match_analysis = MatchAnalysis(
-                match_id=match_data["metadata"]["matchId"],
-                performance_score=stats_analyzer.calculate_performance_score(match_data),
-                analysis=stats_analyzer.generate_analysis(match_data),
-                basic_stats=basic_stats,
-                vision_stats=vision_stats,
-                objective_stats=objective_stats,
-                damage_stats=damage_stats,
-                timeline=timeline,
-                improvement_suggestions=stats_analyzer.get_improvement_suggestions(match_data)
-            )
-            match_analyses.append(match_analysis)
-        
+        })
+    
+    # Matches already parsed for this player by earlier requests are reused
+    async with analyzer_pool.checkout(puuid, matches_data, parsed) as stats_analyzer:
         # Get overall stats
         overall_stats = stats_analyzer.get_player_stats()
         
         # Get champion stats
         champion_stats = stats_analyzer.get_champion_stats()
-        
-        return {
-            "summoner_name": summoner.get("name", "Unknown"),
-            "summoner_level": summoner.get("summonerLevel", 0),
-            "profile_icon_id": summoner.get("profileIconId", 0),
-            "overall_stats": overall_stats,
-            "match_analyses": [analysis.dict() for analysis in match_analyses],
-            "champion_stats": champion_stats,
-            "match_count": {
-                "requested": match_count,
-                "retrieved": len(match_ids),
-                "analyzed": len(matches_data),
-                "cached": len(cached_matches),
-                "new": len(new_matches)
-            }
+    
+    return with_etag({
+        **header,
+        "overall_stats": overall_stats,
+        "match_analyses": [analysis.dict() for analysis in match_analyses],
+        "champion_stats": champion_stats,
+        "match_count": {
+            "requested": match_count,
+            "retrieved": len(match_ids),
+            "analyzed": len(matches_data),
+            "cached": cached_count,
+            "new": new_count
         }
-        
+    })
+
+async def analyze_matches_as_completed(
+    puuid: str, match_ids: List[str], region: str
+) -> AsyncIterator[Tuple[int, Optional[Dict], bool, Optional[MatchAnalysis]]]:
+    """Fetch and analyze matches concurrently, yielding (index, match_data, from_cache, analysis) as each is ready.
+
+    match_data is None for a match that failed to load, and analysis is None
+    when the player isn't in the match.
+    """
+    async for index, match_data, from_cache in fetch_matches_as_completed(match_ids, region):
+        analysis = None
+        if match_data:
+            for result in await analysis_cache.analyze(puuid, [match_data]):
+                analysis = MatchAnalysis(**result)
+        yield index, match_data, from_cache, analysis
+
+async def summarize_in_history_order(
+    puuid: str,
+    summoner: Dict,
+    match_count: int,
+    match_ids: List[str],
+    fetched: Dict[int, Tuple[Dict, bool]],
+    analyses: Dict[int, MatchAnalysis]
+) -> BuiltBody:
+    """Run summarize_analysis on matches collected out of order, keyed by match history position."""
+    order = sorted(fetched)
+    cached_count = sum(1 for index in order if fetched[index][1])
+    return await summarize_analysis(
+        puuid, summoner, match_count, match_ids,
+        [fetched[index][0] for index in order],
+        [analyses[index] for index in order if index in analyses],
+        cached_count, len(order) - cached_count
+    )
+
+async def build_analysis(
+    summoner_name: str,
+    region: str,
+    match_count: int,
+    use_cache: bool = True,
+    sync_history: bool = False
+) -> BuiltBody:
+    """Analyze a summoner's match history and return the response body with its ETag.
+
+    With sync_history, match ids come from the incrementally synced history,
+    which allows up to MAX_SYNCED_MATCH_COUNT matches.
+    """
+    puuid, summoner, match_ids = await resolve_summoner(summoner_name, region, match_count, use_cache, sync_history)
+    
+    # Get match details for all matches concurrently, in match history order
+    matches_data = []
+    cached_count = 0
+    new_count = 0
+    
+    for match_data, from_cache in await fetch_matches(match_ids, region):
+        if not match_data:
+            continue
+        matches_data.append(match_data)
+        if from_cache:
+            cached_count += 1
+        else:
+            new_count += 1
+    
+    # Per-match analyses only depend on the match, so cached ones are reused
+    match_analyses = [
+        MatchAnalysis(**analysis)
+        for analysis in await analysis_cache.analyze(puuid, matches_data)
+    ]
+    
+    return await summarize_analysis(
+        puuid, summoner, match_count, match_ids, matches_data, match_analyses, cached_count, new_count
+    )
+
+async def build_analyses(players: List[Tuple[str, str]], match_count: int) -> List[BuiltBody]:
+    """Analyze several summoners at once, like build_analysis for each (Riot ID, region).
+
+    Players are resolved concurrently and the union of their match ids is
+    fetched once, so a game they share is downloaded and parsed once and
+    then scored for each PUUID.
+    """
+    resolved = await asyncio.gather(*(
+        resolve_summoner(summoner_name, region, match_count) for summoner_name, region in players
+    ))
+
+    # Each match is fetched from the region of the first player who has it
+    match_regions: Dict[str, str] = {}
+    for (_, region), (_, _, match_ids) in zip(players, resolved):
+        for match_id in match_ids:
+            match_regions.setdefault(match_id, region)
+    by_region: Dict[str, List[str]] = {}
+    for match_id, region in match_regions.items():
+        by_region.setdefault(region, []).append(match_id)
+    fetched: Dict[str, Tuple[Optional[Dict], bool]] = {}
+    results = await asyncio.gather(*(fetch_matches(match_ids, region) for region, match_ids in by_region.items()))
+    for match_ids, region_results in zip(by_region.values(), results):
+        fetched.update(zip(match_ids, region_results))
+
+    players_matches = []
+    for _, _, match_ids in resolved:
+        found = [fetched[match_id] for match_id in match_ids if fetched[match_id][0]]
+        players_matches.append([match_data for match_data, _ in found])
+    # Per-match scores depend on the PUUID, so each player's are looked up or computed separately
+    analyses = await asyncio.gather(*(
+        analysis_cache.analyze(puuid, matches_data)
+        for (puuid, _, _), matches_data in zip(resolved, players_matches)
+    ))
+
+    # One checkout at a time, so no request ever holds two players' analyzer locks
+    parsed: Dict = {}
+    built = []
+    for (puuid, summoner, match_ids), matches_data, player_analyses in zip(resolved, players_matches, analyses):
+        cached_count = sum(1 for match_id in match_ids if fetched[match_id][0] and fetched[match_id][1])
+        built.append(await summarize_analysis(
+            puuid, summoner, match_count, match_ids, matches_data,
+            [MatchAnalysis(**analysis) for analysis in player_analyses],
+            cached_count, len(matches_data) - cached_count, parsed
+        ))
+    return built
+
+def analysis_request(
+    summoner_name: str, region: str, match_count: int, sync_history: bool
+) -> Tuple[Tuple, ResponseBuilder]:
+    """Get the response cache key of an analyze request and the builder that fills it."""
+    key = ("analyze", summoner_name.lower(), region.lower(), match_count, sync_history)
+
+    async def build(upstream_cache: bool) -> BuiltBody:
+        return await build_analysis(summoner_name, region, match_count, upstream_cache, sync_history)
+
+    return key, build
+
+async def get_analysis(
+    summoner_name: str,
+    region: str,
+    match_count: int,
+    use_cache: bool = True,
+    sync_history: bool = False
+) -> Tuple[CachedResponse, str]:
+    """Get an analysis through the response cache, with how it was served."""
+    key, build = analysis_request(summoner_name, region, match_count, sync_history)
+    return await response_cache.get(key, build, use_cache)
+
+async def compare_analyses(players: List[Tuple[str, str]], match_count: int) -> List[Dict]:
+    """Get analyze responses for several (Riot ID, region) pairs, in order.
+
+    Cached responses are used as they are; the rest are built together by
+    build_analyses and cached.
+    """
+    requests = [analysis_request(summoner_name, region, match_count, False) for summoner_name, region in players]
+    bodies: List[Optional[Dict]] = [None] * len(players)
+    pending = []
+    for index, (key, build) in enumerate(requests):
+        found = response_cache.lookup(key, build)
+        if found is not None:
+            bodies[index] = found[0].body
+        else:
+            pending.append(index)
+    if pending:
+        built = await build_analyses([players[index] for index in pending], match_count)
+        for index, (body, etag, size) in zip(pending, built):
+            bodies[index] = response_cache.put(requests[index][0], body, etag, size).body
+    return bodies
+
+async def run_analyze_job(params: Dict, report) -> Dict:
+    """Job handler for a full analyze over the synced history, reporting matches fetched and analyzed.
+
+    Unlike a synced analyze request, it waits for the history backfill when
+    fewer ids than match_count are known. The result is also cached as the
+    matching sync_history response. With include_timelines, match timelines
+    are fetched into the match store as well.
+    """
+    summoner_name = params["summoner_name"]
+    region = params["region"]
+    match_count = params["match_count"]
+    puuid, summoner, match_ids = await resolve_summoner(summoner_name, region, match_count, sync_history=True)
+    if len(match_ids) < match_count:
+        await history_sync.backfill(puuid, region, match_count)
+        match_ids = await history_sync.get_match_ids(puuid, region, match_count)
+    report(matches_total=len(match_ids), matches_fetched=0, matches_analyzed=0)
+
+    fetched: Dict[int, Tuple[Dict, bool]] = {}
+    analyses: Dict[int, MatchAnalysis] = {}
+    async for index, match_data, from_cache, analysis in analyze_matches_as_completed(puuid, match_ids, region):
+        if match_data:
+            fetched[index] = (match_data, from_cache)
+        if analysis is not None:
+            analyses[index] = analysis
+        report(matches_fetched=len(fetched), matches_analyzed=len(analyses))
+
+    if params.get("include_timelines"):
+        semaphore = asyncio.Semaphore(MATCH_FETCH_CONCURRENCY)
+        timelines = 0
+
+        async def fetch_timeline(match_id: str):
+            nonlocal timelines
+            async with semaphore:
+                try:
+                    if await riot_client.get_match_timeline(match_id, region):
+                        timelines += 1
+                except Exception as e:
+                    log_debug("ERROR", f"Error fetching timeline for match {match_id}: {str(e)}")
+            report(timelines_fetched=timelines)
+
+        report(timelines_fetched=0)
+        await asyncio.gather(*(fetch_timeline(fetched[index][0]['metadata']['matchId']) for index in sorted(fetched)))
+
+    body, etag, size = await summarize_in_history_order(puuid, summoner, match_count, match_ids, fetched, analyses)
+    key, _ = analysis_request(summoner_name, region, match_count, True)
+    response_cache.put(key, body, etag, size)
+    return body
+
+job_queue.register("analyze", run_analyze_job)
+
+def stream_frame(kind: str, data: Dict, stream_format: str) -> str:
+    """Encode one stream frame as an NDJSON line or a Server-Sent Event."""
+    payload = json.dumps({"type": kind, **data})
+    if stream_format == "sse":
+        return f"event: {kind}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+async def stream_analysis(
+    summoner_name: str,
+    region: str,
+    match_count: int,
+    use_cache: bool,
+    sync_history: bool,
+    stream_format: str
+) -> AsyncIterator[str]:
+    """Yield an analysis as frames: the summoner, each match analysis as it's ready, then the stats.
+
+    Match frames carry their position in the match history as "index" and
+    arrive in completion order. A cached response is replayed in the same
+    frames; a live one is cached once complete. Errors after the first
+    frame end the stream with an "error" frame.
+    """
+    key, build = analysis_request(summoner_name, region, match_count, sync_history)
+    try:
+        cached = response_cache.lookup(key, build) if use_cache else None
+        if cached is not None:
+            body = cached[0].body
+            yield stream_frame("summoner", {
+                "summoner_name": body["summoner_name"],
+                "summoner_level": body["summoner_level"],
+                "profile_icon_id": body["profile_icon_id"],
+                "match_count": {"requested": match_count, "retrieved": body["match_count"]["retrieved"]}
+            }, stream_format)
+            for index, analysis in enumerate(body["match_analyses"]):
+                yield stream_frame("match", {"index": index, "match_analysis": analysis}, stream_format)
+            yield stream_frame("stats", {
+                "overall_stats": body["overall_stats"],
+                "champion_stats": body["champion_stats"],
+                "match_count": body["match_count"]
+            }, stream_format)
+            return
+
+        puuid, summoner, match_ids = await resolve_summoner(summoner_name, region, match_count, use_cache, sync_history)
+        yield stream_frame("summoner", {
+            **summoner_header(summoner),
+            "match_count": {"requested": match_count, "retrieved": len(match_ids)}
+        }, stream_format)
+
+        fetched: Dict[int, Tuple[Dict, bool]] = {}
+        analyses: Dict[int, MatchAnalysis] = {}
+        async for index, match_data, from_cache, analysis in analyze_matches_as_completed(puuid, match_ids, region):
+            if not match_data:
+                continue
+            fetched[index] = (match_data, from_cache)
+            if analysis is not None:
+                analyses[index] = analysis
+                yield stream_frame("match", {"index": index, "match_analysis": analysis.dict()}, stream_format)
+
+        body, etag, size = await summarize_in_history_order(puuid, summoner, match_count, match_ids, fetched, analyses)
+        response_cache.put(key, body, etag, size)
+        yield stream_frame("stats", {
+            "overall_stats": body["overall_stats"],
+            "champion_stats": body["champion_stats"],
+            "match_count": body["match_count"]
+        }, stream_format)
+    except Exception as e:
+        error_msg = f"Error analyzing summoner: {str(e)}"
+        log_debug("ERROR", error_msg, sys.exc_info())
+        yield stream_frame("error", {"detail": error_msg}, stream_format)
+
+def cached_json_response(entry: CachedResponse, served: str, if_none_match: Optional[str] = None) -> Response:
+    """Send a cached body with its ETag, or a bodiless 304 if the client already has it."""
+    headers = {
+        "ETag": entry.etag,
+        # Clients may keep the body but must revalidate it with If-None-Match
+        "Cache-Control": "private, no-cache",
+        "X-Cache": served.upper()
+    }
+    if response_cache.not_modified(entry, if_none_match):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=entry.body, headers=headers)
+
+@app.get("/api/analyze/{summoner_name}")
+async def analyze_summoner(
+    summoner_name: str,
+    request: Request,
+    region: str = "na1",
+    match_count: int = 5,
+    use_cache: bool = True,
+    sync_history: bool = False,
+    stream: Optional[str] = None
+):
+    """Analyze a summoner's match history and provide insights (GET endpoint).
+
+    Responses are cached per Riot ID, region and match count. A stale entry
+    is returned at once while it refreshes in the background; use_cache=false
+    rebuilds it first. A matching If-None-Match gets 304 Not Modified.
+
+    With stream=ndjson or stream=sse the response is sent progressively
+    instead, as stream_analysis describes.
+    """
+    try:
+        if stream is not None:
+            if stream not in STREAM_MEDIA_TYPES:
+                error_msg = f"Stream format must be one of {', '.join(STREAM_MEDIA_TYPES)}"
+                log_debug("ERROR", error_msg)
+                raise ValueError(error_msg)
+            return StreamingResponse(
+                stream_analysis(summoner_name, region, match_count, use_cache, sync_history, stream),
+                media_type=STREAM_MEDIA_TYPES[stream],
+                # Proxies such as nginx would otherwise buffer the frames
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        entry, served = await get_analysis(summoner_name, region, match_count, use_cache, sync_history)
+        return cached_json_response(entry, served, request.headers.get("if-none-match"))
     except Exception as e:
         error_msg = f"Error analyzing summoner: {str(e)}"
         log_debug("ERROR", error_msg, sys.exc_info())
@@ -293,23 +765,17 @@ async def get_champion_stats(summoner_name: str, region: str = "na1", match_coun
         log_debug("INFO", f"Fetching {match_count} matches for PUUID {puuid}")
         match_ids = await riot_client.get_match_history(puuid, region, count=match_count)
         
-        # Get match details for each match
+        # Get match details for all matches concurrently, in match history order
         matches_data = []
-        for match_id in match_ids:
-            log_debug("INFO", f"Fetching details for match {match_id}")
-            match_data = await riot_client.get_match_details(match_id, region)
+        for match_id, (match_data, _) in zip(match_ids, await fetch_matches(match_ids, region)):
             if match_data:
                 matches_data.append(match_data)
             else:
                 log_debug("WARNING", f"No data for match {match_id}")
         
         # Analyze matches
-        stats_analyzer = StatsAnalyzer()
-        stats_analyzer.puuid = puuid
-        for match in matches_data:
-            stats_analyzer.add_match(match)
-        
-        champion_stats = stats_analyzer.get_champion_stats()
+        async with analyzer_pool.checkout(puuid, matches_data) as stats_analyzer:
+            champion_stats = stats_analyzer.get_champion_stats()
         
         return {
             "summoner_name": summoner_name,
@@ -325,12 +791,171 @@ async def get_champion_stats(summoner_name: str, region: str = "na1", match_coun
         log_debug("ERROR", error_msg, sys.exc_info())
         raise HTTPException(status_code=500, detail=error_msg)
 
+@app.get("/api/trends/{summoner_name}")
+async def get_trends(summoner_name: str, region: str = "na1", match_count: int = 50, window: int = TREND_WINDOW):
+    """Get rolling-window and EWMA trends of KDA, deaths, vision, CS/min and win rate.
+
+    Match ids come from the synced history, so up to MAX_SYNCED_MATCH_COUNT
+    games can be covered.
+    """
+    try:
+        if match_count < 1 or match_count > MAX_SYNCED_MATCH_COUNT:
+            error_msg = f"Match count must be between 1 and {MAX_SYNCED_MATCH_COUNT}"
+            log_debug("ERROR", error_msg)
+            raise ValueError(error_msg)
+
+        if window < 1 or window > 100:
+            error_msg = "Window must be between 1 and 100"
+            log_debug("ERROR", error_msg)
+            raise ValueError(error_msg)
+
+        if '#' not in summoner_name:
+            error_msg = "Summoner name must be in the format 'GameName#TAG'"
+            log_debug("ERROR", error_msg)
+            raise ValueError(error_msg)
+
+        game_name, tag_line = summoner_name.split('#')
+        account = await riot_client.get_account_by_riot_id(game_name, tag_line, region)
+        puuid = account['puuid']
+
+        log_debug("INFO", f"Fetching {match_count} matches for trends of PUUID {puuid}")
+        match_ids = await history_sync.get_match_ids(puuid, region, match_count)
+        matches_data = [match_data for match_data, _ in await fetch_matches(match_ids, region) if match_data]
+
+        async with analyzer_pool.checkout(puuid, matches_data) as stats_analyzer:
+            trends = stats_analyzer.get_trends(window)
+
+        return {
+            "summoner_name": summoner_name,
+            "trends": trends,
+            "match_count": {
+                "requested": match_count,
+                "retrieved": len(match_ids),
+                "analyzed": len(matches_data)
+            }
+        }
+    except Exception as e:
+        error_msg = f"Error getting trends: {str(e)}"
+        log_debug("ERROR", error_msg, sys.exc_info())
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@app.get("/api/baselines/percentile")
+async def get_baseline_percentile(
+    metric: str,
+    value: float,
+    champion: Optional[str] = None,
+    position: Optional[str] = None,
+    queue: Optional[str] = None
+):
+    """Get the population percentile of a stat value for a champion, position and queue.
+
+    Omitted filters widen the scope; too few samples in a narrow scope fall
+    back to the next wider one, which the response reports.
+    """
+    try:
+        result = baseline_updater.engine.percentile(metric, value, champion, position, queue)
+        if result is None:
+            error_msg = "No baseline data for this scope yet"
+            log_debug("ERROR", error_msg)
+            raise ValueError(error_msg)
+        return result
+    except Exception as e:
+        error_msg = f"Error getting baseline percentile: {str(e)}"
+        log_debug("ERROR", error_msg, sys.exc_info())
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@app.get("/api/baselines/quantiles")
+async def get_baseline_quantiles(
+    metric: str,
+    champion: Optional[str] = None,
+    position: Optional[str] = None,
+    queue: Optional[str] = None
+):
+    """Get the 10th, 25th, 50th, 75th and 90th percentile values of a stat."""
+    try:
+        result = baseline_updater.engine.quantiles(metric, champion, position, queue)
+        if result is None:
+            error_msg = "No baseline data for this scope yet"
+            log_debug("ERROR", error_msg)
+            raise ValueError(error_msg)
+        return result
+    except Exception as e:
+        error_msg = f"Error getting baseline quantiles: {str(e)}"
+        log_debug("ERROR", error_msg, sys.exc_info())
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@app.post("/api/jobs/analyze")
+async def submit_analyze_job(request: AnalyzeJobRequest):
+    """Queue a background analyze job and return its id at once.
+
+    A request for the same summoner, region and options as a job still
+    queued or running returns that job instead.
+    """
+    try:
+        if request.match_count < 1 or request.match_count > MAX_SYNCED_MATCH_COUNT:
+            error_msg = f"Match count must be between 1 and {MAX_SYNCED_MATCH_COUNT}"
+            log_debug("ERROR", error_msg)
+            raise ValueError(error_msg)
+        if '#' not in request.summoner_name:
+            error_msg = "Summoner name must be in the format 'GameName#TAG'"
+            log_debug("ERROR", error_msg)
+            raise ValueError(error_msg)
+
+        key = f"{request.summoner_name.lower()}|{request.region.lower()}|{request.match_count}|{int(request.include_timelines)}"
+        job, created = await job_queue.submit("analyze", key, request.dict())
+        return {"job_id": job.job_id, "status": job.status, "merged": not created}
+    except Exception as e:
+        error_msg = f"Error submitting analyze job: {str(e)}"
+        log_debug("ERROR", error_msg, sys.exc_info())
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get a job's status and progress, and its result once done."""
+    try:
+        job = await job_queue.get(job_id)
+        if job is None:
+            error_msg = f"Job {job_id} not found"
+            log_debug("ERROR", error_msg)
+            raise ValueError(error_msg)
+        return job.to_dict()
+    except Exception as e:
+        error_msg = f"Error getting job: {str(e)}"
+        log_debug("ERROR", error_msg, sys.exc_info())
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@app.post("/api/history-sync/{summoner_name}")
+async def sync_match_history(summoner_name: str, region: str = "na1"):
+    """Sync a summoner's newer match ids and start paging older history in the background."""
+    try:
+        if '#' not in summoner_name:
+            error_msg = "Summoner name must be in the format 'GameName#TAG'"
+            log_debug("ERROR", error_msg)
+            raise ValueError(error_msg)
+
+        game_name, tag_line = summoner_name.split('#')
+        account = await riot_client.get_account_by_riot_id(game_name, tag_line, region)
+        puuid = account['puuid']
+
+        await history_sync.sync(puuid, region)
+        history_sync.start_backfill(puuid, region)
+        return {
+            "summoner_name": summoner_name,
+            **await history_sync.get_status(puuid)
+        }
+    except Exception as e:
+        error_msg = f"Error syncing match history: {str(e)}"
+        log_debug("ERROR", error_msg, sys.exc_info())
+        raise HTTPException(status_code=500, detail=error_msg)
+
 @app.post("/api/compare")
 async def compare_summoners(request: CompareRequest):
     """Compare two summoners' stats side by side."""
     try:
-        user1_stats = await analyze_summoner(request.summoner1_name, request.summoner1_region, request.match_count)
-        user2_stats = await analyze_summoner(request.summoner2_name, request.summoner2_region, request.match_count)
+        user1_stats, user2_stats = await compare_analyses(
+            [(request.summoner1_name, request.summoner1_region), (request.summoner2_name, request.summoner2_region)],
+            request.match_count
+        )
         return {
             "user1": user1_stats,
             "user2": user2_stats
@@ -340,5 +965,23 @@ async def compare_summoners(request: CompareRequest):
         log_debug("ERROR", error_msg, sys.exc_info())
         raise HTTPException(status_code=500, detail=error_msg)
 
+@app.post("/api/compare/players")
+async def compare_players(request: ComparePlayersRequest):
+    """Compare any number of summoners, up to MAX_COMPARE_PLAYERS, in request order."""
+    try:
+        if len(request.players) < 2 or len(request.players) > MAX_COMPARE_PLAYERS:
+            error_msg = f"Number of players must be between 2 and {MAX_COMPARE_PLAYERS}"
+            log_debug("ERROR", error_msg)
+            raise ValueError(error_msg)
+
+        players = await compare_analyses(
+            [(player.summoner_name, player.region) for player in request.players], request.match_count
+        )
+        return {"players": players}
+    except Exception as e:
+        error_msg = f"Error comparing summoners: {str(e)}"
+        log_debug("ERROR", error_msg, sys.exc_info())
+        raise HTTPException(status_code=500, detail=error_msg)
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
@@ -41,7 +41,7 @@ async def get_replay(replay_id: str):
     Get the complete processed replay data.
     """
     try:
-        replay = replay_service.load_replay(replay_id)
+        replay = await replay_service.load_replay_async(replay_id)
         return replay
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Replay {replay_id} not found")
@@ -54,7 +54,7 @@ async def get_game_state(replay_id: str, timestamp: int):
     Get the game state at a specific timestamp.
     """
     try:
-        replay = replay_service.load_replay(replay_id)
+        replay = await replay_service.load_replay_async(replay_id)
         game_state = replay_service.get_game_state(replay, timestamp)
         return game_state
     except FileNotFoundError:
@@ -72,7 +72,7 @@ async def process_replay(match_id: str, region: str = "na1"):
         replay = await replay_parser.parse_match_timeline(match_id, region)
         
         # Save the processed replay
-        replay_id = replay_service.save_replay(replay)
+        replay_id = await replay_service.save_replay_async(replay)
         
         # Log the command
         with open("/tmp/command_log.txt", "a") as f:
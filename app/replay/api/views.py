@@ -16,7 +16,7 @@ async def replay_view(request: Request, match_id: str):
     """
     try:
         # Load replay data
-        replay = replay_service.load_replay(match_id)
+        replay = await replay_service.load_replay_async(match_id)
         
         # Format game duration for display
         game_duration_formatted = format_game_duration(replay.game_duration)
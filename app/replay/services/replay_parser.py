@@ -2,25 +2,34 @@ import json
 import logging
 from pathlib import Path
 from typing import Dict, List, Optional
-import aiohttp
 import os
 
+from ...api.http_session import HTTPSessionPool
 from ..models.replay import ProcessedReplay, GameStateSnapshot, Position, ChampionState, GameEvent, Participant, PositionData
 
 logger = logging.getLogger(__name__)
 
 class ReplayParser:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, http_pool: Optional[HTTPSessionPool] = None):
         """
         Initialize the replay parser.
         
         Args:
             api_key: Riot API key. If None, will use the RIOT_API_KEY environment variable.
+            http_pool: Pooled sessions to share, e.g. RiotAPIClient.http_pool. If None,
+                the parser keeps its own pool, which must be closed with close().
         """
         self.api_key = api_key or os.getenv("RIOT_API_KEY")
         if not self.api_key:
             raise ValueError("RIOT_API_KEY environment variable is not set.")
         self.logger = logging.getLogger(__name__)
+        self._owns_pool = http_pool is None
+        self.http_pool = http_pool or HTTPSessionPool()
+
+    async def close(self):
+        """Close the parser's HTTP sessions if it owns them."""
+        if self._owns_pool:
+            await self.http_pool.close()
         
     async def parse_match_timeline(self, match_id: str, region: str = "na1") -> ProcessedReplay:
         """
@@ -35,14 +44,14 @@ class ReplayParser:
             url = f"https://{routing}.api.riotgames.com/lol/match/v5/matches/{match_id}/timeline"
             headers = {"X-Riot-Token": self.api_key}
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        self.logger.error(f"Failed to fetch match timeline: {error_text}")
-                        raise RuntimeError(f"Failed to fetch match timeline: {error_text}")
-                    
-                    timeline_data = await response.json()
+            session = self.http_pool.session(routing)
+            async with session.get(url, headers=headers) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    self.logger.error(f"Failed to fetch match timeline: {error_text}")
+                    raise RuntimeError(f"Failed to fetch match timeline: {error_text}")
+                
+                timeline_data = await response.json()
             
             # Extract participants from the timeline metadata
             participants = []
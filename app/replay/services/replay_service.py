@@ -3,6 +3,7 @@ import logging
 from pathlib import Path
 from typing import Dict, List, Optional
 from ..models.replay import ProcessedReplay, GameStateSnapshot
+from ...services.async_io import run_io, atomic_write_json
 
 class ReplayService:
     def __init__(self, data_dir: str = "data/replays"):
@@ -16,12 +17,15 @@ class ReplayService:
         match_id = replay.match_id
         file_path = self.data_dir / f"{match_id}.json"
         
-        with open(file_path, 'w') as f:
-            json.dump(replay.dict(), f, indent=2)
+        atomic_write_json(file_path, replay.dict(), indent=2)
         
         self.logger.info(f"Saved replay data for match {match_id}")
         return match_id
 
+    async def save_replay_async(self, replay: ProcessedReplay) -> str:
+        """Save a processed replay without blocking the event loop."""
+        return await run_io(self.save_replay, replay)
+
     def load_replay(self, match_id: str) -> ProcessedReplay:
         """Load a processed replay from disk."""
         file_path = self.data_dir / f"{match_id}.json"
@@ -41,6 +45,10 @@ class ReplayService:
             self.logger.error(f"Error loading replay data for match {match_id}: {str(e)}")
             raise RuntimeError(f"Failed to load replay data: {str(e)}")
 
+    async def load_replay_async(self, match_id: str) -> ProcessedReplay:
+        """Load a processed replay without blocking the event loop."""
+        return await run_io(self.load_replay, match_id)
+
     def get_game_state(self, match_id: str, timestamp: int) -> GameStateSnapshot:
         """Get the game state at a specific timestamp."""
         try:
@@ -0,0 +1,32 @@
+import argparse
+import json
+import time
+from app.analysis.baselines import BaselineEngine
+from app.services.match_store import MatchStore
+
+def build(db_path: str, out_path: str, batch_size: int, rebuild: bool) -> dict:
+    """Ingest every stored match into the saved baselines, which are created if missing."""
+    engine = BaselineEngine() if rebuild else BaselineEngine.load(out_path)
+    store = MatchStore(db_path)
+    match_ids = [match_id for match_id in store.match_ids() if not engine.has_ingested(match_id)]
+    started = time.perf_counter()
+    added = 0
+    for start in range(0, len(match_ids), batch_size):
+        batch = store.get_many(match_ids[start:start + batch_size])
+        added += engine.ingest_many(batch.values())
+    elapsed = time.perf_counter() - started
+    store.close()
+    engine.save(out_path)
+    return {"added": added, "elapsed_s": round(elapsed, 2), **engine.get_stats()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Build population percentile baselines from the match store.")
+    parser.add_argument("--db", default="data/matches.db")
+    parser.add_argument("--out", default="data/baselines.json")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--rebuild", action="store_true", help="Start from empty baselines instead of the saved ones")
+    args = parser.parse_args()
+    print(json.dumps(build(args.db, args.out, args.batch_size, args.rebuild)))
+
+if __name__ == "__main__":
+    main()
@@ -1,59 +1,32 @@
 import asyncio
-import json
-from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Dict, Optional
 from app.api.riot_client import RiotAPIClient
+from app.services.async_io import run_io
+from app.services.match_store import TIMELINE
 
 class AphaeDataCollector:
     def __init__(self):
         self.client = RiotAPIClient()
-        self.data_dir = Path("data/aphae")
-        self.data_dir.mkdir(parents=True, exist_ok=True)
+        # Matches and timelines go to the same store the app reads from
+        self.store = self.client.match_store
         self.region = "na1"
         self.game_name = "aphae"
         self.tag_line = "raph"
-        self.processed_matches_file = self.data_dir / "processed_matches.json"
-
-    def _load_processed_matches(self) -> set:
-        """Load the set of already processed match IDs."""
-        if self.processed_matches_file.exists():
-            with open(self.processed_matches_file, 'r') as f:
-                return set(json.load(f))
-        return set()
-
-    def _save_processed_matches(self, processed_matches: set):
-        """Save the set of processed match IDs."""
-        with open(self.processed_matches_file, 'w') as f:
-            json.dump(list(processed_matches), f)
 
     async def collect_match_data(self, match_id: str) -> Optional[Dict]:
         """Collect and store match data if not already processed."""
-        processed_matches = self._load_processed_matches()
-        
-        if match_id in processed_matches:
+        has_match = await run_io(self.store.contains, match_id)
+        has_timeline = await run_io(self.store.contains, match_id, TIMELINE)
+        if has_match and has_timeline:
             print(f"Match {match_id} already processed, skipping...")
             return None
 
         print(f"Processing match {match_id}...")
-        match_data = await self.client.get_match_details(match_id, self.region)
-        
+        # The client stores both in the match store as it fetches them
+        match_data, _ = await self.client.get_match(match_id, self.region)
         if match_data:
-            # Save match data
-            match_file = self.data_dir / f"match_{match_id}.json"
-            with open(match_file, 'w') as f:
-                json.dump(match_data, f, indent=2)
-            
-            # Update processed matches
-            processed_matches.add(match_id)
-            self._save_processed_matches(processed_matches)
-            
-            # Get and save timeline if available
-            timeline = await self.client.get_match_timeline(match_id, self.region)
-            if timeline:
-                timeline_file = self.data_dir / f"timeline_{match_id}.json"
-                with open(timeline_file, 'w') as f:
-                    json.dump(timeline, f, indent=2)
-        
+            await self.client.get_match_timeline(match_id, self.region)
+
         return match_data
 
     async def collect_all_data(self, count: int = 100):
@@ -75,7 +48,11 @@ class AphaeDataCollector:
 
 async def main():
     collector = AphaeDataCollector()
-    await collector.collect_all_data()
+    await collector.client.start()
+    try:
+        await collector.collect_all_data()
+    finally:
+        await collector.client.close()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
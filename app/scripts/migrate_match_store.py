@@ -0,0 +1,90 @@
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple
+from app.services.match_store import MatchStore, MATCH, TIMELINE
+
+# File name prefixes written by RiotAPIClient and the data collectors
+PREFIXES = {
+    "match_": MATCH,
+    "timeline_": TIMELINE
+}
+
+class MatchStoreMigration:
+    def __init__(self, data_dir: str = "data", db_path: str = "data/matches.db", batch_size: int = 500):
+        self.data_dir = Path(data_dir)
+        self.store = MatchStore(db_path)
+        self.batch_size = batch_size
+
+    def _find_files(self) -> List[Tuple[Path, str, str]]:
+        """Find match_{id}.json and timeline_{id}.json files under the data directory."""
+        files = []
+        for path in sorted(self.data_dir.rglob("*.json")):
+            for prefix, kind in PREFIXES.items():
+                if path.name.startswith(prefix):
+                    files.append((path, kind, path.stem[len(prefix):]))
+                    break
+        return files
+
+    def _flush(self, batch: Dict[str, List[Tuple[str, Dict]]]) -> int:
+        imported = 0
+        for kind, items in batch.items():
+            if items:
+                imported += self.store.put_many(items, kind)
+                items.clear()
+        return imported
+
+    def migrate(self, delete: bool = False) -> Dict[str, int]:
+        """Import every JSON file into the store, optionally deleting it afterwards."""
+        files = self._find_files()
+        batch: Dict[str, List[Tuple[str, Dict]]] = {MATCH: [], TIMELINE: []}
+        pending: List[Path] = []
+        imported = 0
+        failed = 0
+
+        for path, kind, match_id in files:
+            try:
+                with open(path, 'r') as f:
+                    batch[kind].append((match_id, json.load(f)))
+                pending.append(path)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Skipping {path}: {str(e)}")
+                failed += 1
+                continue
+
+            if len(pending) >= self.batch_size:
+                imported += self._flush(batch)
+                if delete:
+                    for done in pending:
+                        done.unlink()
+                pending.clear()
+                print(f"Imported {imported}/{len(files)} files...")
+
+        imported += self._flush(batch)
+        if delete:
+            for done in pending:
+                done.unlink()
+
+        return {
+            "found": len(files),
+            "imported": imported,
+            "failed": failed,
+            "matches": self.store.count(MATCH),
+            "timelines": self.store.count(TIMELINE)
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Import match and timeline JSON files into the match store.")
+    parser.add_argument("--data-dir", default="data", help="Directory to scan for match_*.json and timeline_*.json")
+    parser.add_argument("--db", default="data/matches.db", help="Path of the match store database")
+    parser.add_argument("--batch-size", type=int, default=500, help="Files imported per transaction")
+    parser.add_argument("--delete", action="store_true", help="Delete JSON files once they are imported")
+    args = parser.parse_args()
+
+    migration = MatchStoreMigration(args.data_dir, args.db, args.batch_size)
+    result = migration.migrate(delete=args.delete)
+    print(f"Found {result['found']} files, imported {result['imported']}, failed {result['failed']}.")
+    print(f"Store now holds {result['matches']} matches and {result['timelines']} timelines.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+from typing import Dict, List, Optional
+from ..analysis.match_analysis import ANALYSIS_VERSION, analyze_match
+from ..api.cache import TTLCache
+from .async_io import run_io
+from .match_store import MatchStore
+
+# Analyses never change for a given version, so the in-memory copy only expires to free space
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", "3600"))
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+
+class MatchAnalysisCache:
+    """Computed per-match analyses keyed by (match id, PUUID, analysis version).
+
+    Lookups go memory -> match store -> compute, and only analyses missing
+    from both tiers are computed. Entries from other analysis versions are
+    never read, so changing the scoring or suggestion code invalidates them.
+    """
+
+    def __init__(self, store: MatchStore, version: str = ANALYSIS_VERSION, memory: Optional[TTLCache] = None):
+        self.store = store
+        self.version = version
+        self.memory = memory or TTLCache(max_entries=50000, max_bytes=ANALYSIS_CACHE_MAX_BYTES)
+        self.stats = {"memory_hits": 0, "store_hits": 0, "computed": 0}
+
+    async def analyze(self, puuid: str, matches_data: List[Dict]) -> List[Dict]:
+        """Get the analysis of each match for a player, in match order.
+
+        Matches the player isn't in are skipped.
+        """
+        analyses: Dict[str, Dict] = {}
+        missing = []
+        for match_data in matches_data:
+            match_id = match_data['metadata']['matchId']
+            cached = self.memory.get(("analysis", match_id, puuid))
+            if cached is not None:
+                analyses[match_id] = cached
+                self.stats["memory_hits"] += 1
+            else:
+                missing.append(match_data)
+
+        if missing:
+            stored = await run_io(
+                self.store.get_analyses, puuid, [m['metadata']['matchId'] for m in missing], self.version
+            )
+            computed = []
+            for match_data in missing:
+                match_id = match_data['metadata']['matchId']
+                analysis = stored.get(match_id)
+                if analysis is not None:
+                    self.stats["store_hits"] += 1
+                else:
+                    analysis = analyze_match(match_data, puuid)
+                    if analysis is None:
+                        continue
+                    computed.append((match_id, analysis))
+                    self.stats["computed"] += 1
+                analyses[match_id] = analysis
+                self.memory.set(("analysis", match_id, puuid), analysis, ANALYSIS_CACHE_TTL)
+            if computed:
+                await run_io(self.store.put_analyses, puuid, computed, self.version)
+
+        return [
+            analyses[match_data['metadata']['matchId']]
+            for match_data in matches_data
+            if match_data['metadata']['matchId'] in analyses
+        ]
+
+    async def purge_stale(self) -> int:
+        """Delete stored analyses from other analysis versions."""
+        return await run_io(self.store.delete_stale_analyses, self.version)
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "version": self.version, "memory": self.memory.get_stats()}
@@ -0,0 +1,137 @@
+import asyncio
+import os
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+from ..analysis.stats_analyzer import Match, StatsAnalyzer
+
+# Bounds on the pool: players kept, and match slots held across all their analyzers
+ANALYZER_POOL_MAX_PLAYERS = int(os.getenv("ANALYZER_POOL_MAX_PLAYERS", "64"))
+ANALYZER_POOL_MAX_MATCHES = int(os.getenv("ANALYZER_POOL_MAX_MATCHES", "20000"))
+
+
+class _PoolEntry:
+    __slots__ = ('analyzer', 'lock', 'users')
+
+    def __init__(self, puuid: str):
+        self.analyzer = StatsAnalyzer()
+        self.analyzer.puuid = puuid
+        self.lock = asyncio.Lock()
+        # Requests holding or waiting for this entry; it isn't evicted while above zero
+        self.users = 0
+
+
+class AnalyzerPool:
+    """StatsAnalyzers per PUUID, reused across requests and evicted least recently used first.
+
+    checkout() brings a player's analyzer to exactly the requested matches:
+    stored matches that weren't requested are removed and only missing ones
+    are parsed, so stats match a fresh analyzer over the same matches. Only
+    the order of keys in champion and position dicts can differ, since it
+    follows the order matches were first added. A per-PUUID lock keeps
+    concurrent requests for one player from changing its analyzer under each
+    other, and analyzers in use are never evicted.
+
+    Memory is bounded by player count and by match slots held across all
+    analyzers. Slots emptied by removed matches count too, and an analyzer
+    is rebuilt once they outnumber the matches it needs.
+    """
+
+    def __init__(self, max_players: int = ANALYZER_POOL_MAX_PLAYERS, max_matches: int = ANALYZER_POOL_MAX_MATCHES):
+        self.max_players = max_players
+        self.max_matches = max_matches
+        self._entries: "OrderedDict[str, _PoolEntry]" = OrderedDict()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "rebuilds": 0,
+            "matches_reused": 0,
+            "matches_added": 0,
+            "matches_removed": 0
+        }
+
+    @asynccontextmanager
+    async def checkout(
+        self, puuid: str, matches_data: List[Dict], parsed: Optional[Dict[str, Match]] = None
+    ) -> AsyncIterator[StatsAnalyzer]:
+        """Lock a player's analyzer holding exactly `matches_data` for the duration of the block.
+
+        `parsed` shares match models between checkouts, as in StatsAnalyzer.add_matches.
+        """
+        entry = self._entries.get(puuid)
+        if entry is None:
+            entry = self._entries[puuid] = _PoolEntry(puuid)
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+        self._entries.move_to_end(puuid)
+        entry.users += 1
+        try:
+            async with entry.lock:
+                self._sync(entry, puuid, matches_data, parsed)
+                self._evict()
+                yield entry.analyzer
+        finally:
+            entry.users -= 1
+            self._evict()
+
+    def _sync(self, entry: _PoolEntry, puuid: str, matches_data: List[Dict], parsed: Optional[Dict[str, Match]]):
+        """Remove unrequested matches from the analyzer and add the missing ones."""
+        analyzer = entry.analyzer
+        wanted = {match_data['metadata']['matchId'] for match_data in matches_data}
+        stale = [match_id for match_id in analyzer.match_ids() if match_id not in wanted]
+        empty_slots = analyzer.slot_count - (len(analyzer.match_ids()) - len(stale))
+        if empty_slots > len(wanted):
+            # Mostly dead rows; parsing the requested matches again is cheaper to keep than the leftovers
+            entry.analyzer = StatsAnalyzer()
+            entry.analyzer.puuid = puuid
+            self.stats["rebuilds"] += 1
+            self.stats["matches_removed"] += len(stale)
+            self.stats["matches_added"] += entry.analyzer.add_matches(matches_data, parsed=parsed)
+            return
+
+        for match_id in stale:
+            analyzer.remove_match(match_id)
+        self.stats["matches_removed"] += len(stale)
+        missing = {}
+        for match_data in matches_data:
+            match_id = match_data['metadata']['matchId']
+            if match_id not in analyzer:
+                missing.setdefault(match_id, match_data)
+        self.stats["matches_reused"] += len(wanted) - len(missing)
+        if missing:
+            self.stats["matches_added"] += analyzer.add_matches(missing.values(), parsed=parsed)
+
+    def _held_matches(self) -> int:
+        return sum(entry.analyzer.slot_count for entry in self._entries.values())
+
+    def _evict(self):
+        """Drop least recently used idle analyzers until the pool is within its bounds."""
+        held = self._held_matches()
+        for puuid in list(self._entries):
+            if len(self._entries) <= self.max_players and held <= self.max_matches:
+                break
+            entry = self._entries[puuid]
+            if entry.users:
+                continue
+            held -= entry.analyzer.slot_count
+            del self._entries[puuid]
+            self.stats["evictions"] += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict:
+        """Get pool size plus analyzer and match reuse rates."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        requested = self.stats["matches_reused"] + self.stats["matches_added"]
+        return {
+            **self.stats,
+            "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "match_reuse_ratio": round(self.stats["matches_reused"] / requested, 4) if requested else 0.0,
+            "players": len(self._entries),
+            "held_matches": self._held_matches(),
+            "max_players": self.max_players,
+            "max_matches": self.max_matches
+        }
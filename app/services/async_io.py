@@ -0,0 +1,59 @@
+import asyncio
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Union
+
+# Dedicated pool for disk I/O so large reads and writes never run on the event loop
+IO_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("IO_WORKERS", "4")),
+    thread_name_prefix="jaxstats-io"
+)
+
+
+async def run_io(fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking I/O function on the I/O executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(IO_EXECUTOR, partial(fn, *args, **kwargs))
+
+
+def atomic_write_json(path: Union[str, Path], data: Any, **dump_kwargs):
+    """Write JSON to a temp file in the target directory, then rename it into place.
+
+    Readers see either the old file or the complete new one, never a partial write.
+    """
+    path = Path(path)
+    fd, temp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_bytes(path: Union[str, Path], content: bytes):
+    """Write bytes to a temp file in the target directory, then rename it into place."""
+    path = Path(path)
+    fd, temp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
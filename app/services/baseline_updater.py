@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional
+from ..analysis.baselines import BaselineEngine
+from .async_io import run_io
+
+logger = logging.getLogger(__name__)
+
+# Seconds between saves of changed baselines, so a crash loses at most this much
+BASELINES_SAVE_INTERVAL = float(os.getenv("BASELINES_SAVE_INTERVAL", "300"))
+
+# Matches waiting to be ingested; more are dropped rather than queued without bound
+BASELINES_PENDING_MAX = int(os.getenv("BASELINES_PENDING_MAX", "2000"))
+
+
+class BaselineUpdater:
+    """Feeds fetched matches into a BaselineEngine off the event loop and saves it periodically.
+
+    submit() only queues a match. A single background task hands queued
+    matches to the I/O executor in batches, where the sketch updates run,
+    and another saves the baselines every save_interval seconds when they
+    changed. stop() ingests what is still queued and saves once more.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        save_interval: float = BASELINES_SAVE_INTERVAL,
+        max_pending: int = BASELINES_PENDING_MAX
+    ):
+        self.path = path
+        self.save_interval = save_interval
+        self.max_pending = max_pending
+        self.engine = BaselineEngine()
+        self._pending: List[Dict] = []
+        self._ingesting: Optional[asyncio.Task] = None
+        self._saving: Optional[asyncio.Task] = None
+        self._dirty = False
+        self.stats = {"submitted": 0, "dropped": 0, "ingested": 0, "ingest_errors": 0, "saves": 0, "save_errors": 0}
+
+    async def start(self):
+        """Load saved baselines and start saving them periodically."""
+        self.engine = await run_io(BaselineEngine.load, self.path)
+        self._saving = asyncio.ensure_future(self._save_periodically())
+
+    async def stop(self):
+        """Ingest the queued matches, stop periodic saves and save the baselines."""
+        if self._saving is not None:
+            self._saving.cancel()
+            await asyncio.gather(self._saving, return_exceptions=True)
+            self._saving = None
+        if self._ingesting is not None:
+            await self._ingesting
+        await self.save()
+
+    def submit(self, match_data: Dict):
+        """Queue a match for ingestion unless it was ingested already."""
+        if self.engine.has_ingested(match_data['metadata']['matchId']):
+            return
+        if len(self._pending) >= self.max_pending:
+            self.stats["dropped"] += 1
+            return
+        self._pending.append(match_data)
+        self.stats["submitted"] += 1
+        if self._ingesting is None or self._ingesting.done():
+            self._ingesting = asyncio.ensure_future(self._ingest_pending())
+
+    async def _ingest_pending(self):
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                added = await run_io(self.engine.ingest_many, batch)
+            except Exception as e:
+                self.stats["ingest_errors"] += 1
+                logger.warning(f"Baseline ingest failed for {len(batch)} matches: {str(e)}")
+                continue
+            self.stats["ingested"] += added
+            self._dirty = self._dirty or added > 0
+
+    async def _save_periodically(self):
+        while True:
+            await asyncio.sleep(self.save_interval)
+            await self.save()
+
+    async def save(self):
+        """Save the baselines if they changed since the last save."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            await run_io(self.engine.save, self.path)
+            self.stats["saves"] += 1
+        except Exception as e:
+            self._dirty = True
+            self.stats["save_errors"] += 1
+            logger.warning(f"Saving baselines to {self.path} failed: {str(e)}")
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.engine.get_stats(),
+            **self.stats,
+            "pending": len(self._pending),
+            "save_interval": self.save_interval
+        }
@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Entries kept in memory; older ones are dropped, or spilled to disk when a path is set
+DEBUG_LOG_CAPACITY = int(os.getenv("DEBUG_LOG_CAPACITY", "2000"))
+
+# Entries below this level are discarded, and only one in every N below WARNING is kept
+DEBUG_LOG_MIN_LEVEL = os.getenv("DEBUG_LOG_MIN_LEVEL", "INFO")
+DEBUG_LOG_INFO_SAMPLE_EVERY = int(os.getenv("DEBUG_LOG_INFO_SAMPLE_EVERY", "1"))
+
+# Rotating JSON lines file for entries pushed out of memory; empty disables spilling
+DEBUG_LOG_SPILL_PATH = os.getenv("DEBUG_LOG_SPILL_PATH", "")
+DEBUG_LOG_SPILL_MAX_BYTES = int(os.getenv("DEBUG_LOG_SPILL_MAX_BYTES", str(10 * 1024 * 1024)))
+DEBUG_LOG_SPILL_BACKUPS = int(os.getenv("DEBUG_LOG_SPILL_BACKUPS", "5"))
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+
+def level_number(level: str) -> int:
+    number = LEVELS.get(level.upper())
+    if number is None:
+        raise ValueError(f"Unknown log level '{level}', expected one of {', '.join(LEVELS)}")
+    return number
+
+
+class DebugLogBuffer:
+    """Fixed-capacity ring buffer of debug log entries, read with a cursor.
+
+    Each kept entry gets a sequence number one above the previous one, and a
+    cursor is the last sequence number a reader has seen, so polling with
+    the returned cursor yields only newer entries. Sequence numbers restart
+    with the process, so results also carry an epoch naming this buffer; a
+    cursor from another epoch, or one past the newest entry, reads from the
+    oldest entry again. Entries below `min_level`
+    are discarded, and of those below WARNING only one in `sample_every` is
+    kept. With a spill path, entries pushed out of the buffer are appended
+    to a size-rotated JSON lines file instead of being lost.
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEBUG_LOG_CAPACITY,
+        min_level: str = DEBUG_LOG_MIN_LEVEL,
+        sample_every: int = DEBUG_LOG_INFO_SAMPLE_EVERY,
+        spill_path: str = DEBUG_LOG_SPILL_PATH,
+        spill_max_bytes: int = DEBUG_LOG_SPILL_MAX_BYTES,
+        spill_backups: int = DEBUG_LOG_SPILL_BACKUPS
+    ):
+        self.capacity = capacity
+        self.min_level = level_number(min_level)
+        self.sample_every = max(1, sample_every)
+        # (seq, level number, time, entry)
+        self._entries: Deque[Tuple[int, int, datetime, Dict]] = deque()
+        self._next_seq = 1
+        self.epoch = uuid.uuid4().hex
+        self._sampled = 0
+        # log_debug may be called from IO threads as well as the event loop
+        self._lock = threading.Lock()
+        self._spill: Optional[RotatingFileHandler] = None
+        if spill_path:
+            os.makedirs(os.path.dirname(spill_path) or ".", exist_ok=True)
+            self._spill = RotatingFileHandler(
+                spill_path, maxBytes=spill_max_bytes, backupCount=spill_backups, encoding="utf-8", delay=True
+            )
+            self._spill.setFormatter(logging.Formatter("%(message)s"))
+        self.stats = {"added": 0, "filtered": 0, "sampled_out": 0, "evicted": 0, "spilled": 0}
+
+    def add(self, level: str, entry: Dict) -> Optional[int]:
+        """Keep an entry with an ISO "timestamp", returning its sequence number, or None if it was filtered out."""
+        number = LEVELS.get(level.upper(), LEVELS["INFO"])
+        with self._lock:
+            if number < self.min_level:
+                self.stats["filtered"] += 1
+                return None
+            if number < LEVELS["WARNING"]:
+                self._sampled += 1
+                if (self._sampled - 1) % self.sample_every:
+                    self.stats["sampled_out"] += 1
+                    return None
+
+            seq = self._next_seq
+            self._next_seq += 1
+            if len(self._entries) >= self.capacity:
+                self._evict(self._entries.popleft())
+            self._entries.append((seq, number, datetime.fromisoformat(entry["timestamp"]), entry))
+            self.stats["added"] += 1
+            return seq
+
+    def _evict(self, item: Tuple[int, int, datetime, Dict]):
+        self.stats["evicted"] += 1
+        if self._spill is not None:
+            seq, _, _, entry = item
+            self._spill.handle(logging.makeLogRecord({"msg": json.dumps({"seq": seq, **entry}, default=str)}))
+            self.stats["spilled"] += 1
+
+    def query(
+        self,
+        cursor: Optional[int] = None,
+        limit: int = 100,
+        level: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        epoch: Optional[str] = None
+    ) -> Dict:
+        """Get up to `limit` entries after `cursor`, oldest first, that match the filters.
+
+        `level` is a minimum level, and `since`/`until` bound the entry time
+        inclusively. The returned next_cursor continues after the last entry
+        examined, so filtered out entries aren't scanned again. "missed"
+        counts entries after the cursor that already left the buffer.
+        A cursor is only trusted with this buffer's epoch, when one is given.
+        """
+        min_level = level_number(level) if level else 0
+        since, until = _local(since), _local(until)
+        with self._lock:
+            if cursor is not None and ((epoch is not None and epoch != self.epoch) or cursor >= self._next_seq):
+                # Issued before a restart; its sequence numbers mean nothing here
+                cursor = None
+            if cursor is None:
+                cursor = self._entries[0][0] - 1 if self._entries else self._next_seq - 1
+            first_seq = self._entries[0][0] if self._entries else self._next_seq
+            missed = max(0, first_seq - cursor - 1)
+            # Sequence numbers in the buffer are consecutive, so the cursor maps straight to a position
+            start = max(0, cursor + 1 - first_seq)
+            logs: List[Dict] = []
+            next_cursor = cursor
+            for index in range(start, len(self._entries)):
+                if len(logs) >= limit:
+                    break
+                seq, number, created, entry = self._entries[index]
+                next_cursor = seq
+                if number < min_level or (since is not None and created < since) or (until is not None and created > until):
+                    continue
+                logs.append({"seq": seq, **entry})
+            return {
+                "logs": logs,
+                "epoch": self.epoch,
+                "next_cursor": max(next_cursor, cursor),
+                "has_more": next_cursor < self._next_seq - 1,
+                "missed": missed
+            }
+
+    def close(self):
+        """Spill the entries still in memory and close the spill file."""
+        with self._lock:
+            if self._spill is None:
+                return
+            while self._entries:
+                self._evict(self._entries.popleft())
+            self._spill.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "capacity": self.capacity,
+            "min_level": next(name for name, number in LEVELS.items() if number == self.min_level),
+            "sample_every": self.sample_every,
+            "spill": self._spill is not None
+        }
+
+
+def _local(moment: Optional[datetime]) -> Optional[datetime]:
+    """Entries carry naive local times, so aware filter times are converted to match."""
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone().replace(tzinfo=None)
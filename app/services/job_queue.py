@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from .async_io import run_io
+from .match_store import MatchStore
+
+logger = logging.getLogger(__name__)
+
+# Jobs run at once, and jobs allowed to wait in the queue
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "100"))
+
+# Finished jobs are kept this many seconds, and the most recent ones also in memory
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", str(24 * 3600)))
+JOB_MEMORY_MAX = 500
+
+# Progress is written to the store at most this often per job
+JOB_PROGRESS_SAVE_INTERVAL = 1.0
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+FINISHED_STATUSES = (DONE, FAILED)
+
+# A job handler gets the job parameters and a report(**progress) callback and returns the result
+JobHandler = Callable[[Dict, Callable[..., None]], Awaitable[Dict]]
+
+
+class Job:
+    __slots__ = (
+        'job_id', 'kind', 'key', 'params', 'status', 'progress', 'result', 'error',
+        'created_at', 'started_at', 'finished_at', 'merged', 'saved_at'
+    )
+
+    def __init__(self, job_id: str, kind: str, key: str, params: Dict, created_at: float):
+        self.job_id = job_id
+        self.kind = kind
+        # Identifies duplicate jobs, which are merged while one is queued or running
+        self.key = key
+        self.params = params
+        self.status = QUEUED
+        self.progress: Dict = {}
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.created_at = created_at
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # Submissions merged into this job after the first
+        self.merged = 0
+        self.saved_at = 0.0
+
+    def to_dict(self, include_result: bool = True) -> Dict:
+        data = {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "key": self.key,
+            "params": self.params,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "merged": self.merged
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Job":
+        job = cls(data["job_id"], data["kind"], data["key"], data["params"], data["created_at"])
+        job.status = data["status"]
+        job.progress = data["progress"]
+        job.result = data.get("result")
+        job.error = data["error"]
+        job.started_at = data["started_at"]
+        job.finished_at = data["finished_at"]
+        job.merged = data["merged"]
+        return job
+
+
+class JobQueue:
+    """Background jobs run by a bounded pool of worker tasks and persisted in the match store.
+
+    submit() returns at once. A job with the same kind and key as one still
+    queued or running is merged into it instead of queued again. Every
+    status change is saved, and progress at most once per
+    JOB_PROGRESS_SAVE_INTERVAL, so after a restart start() queues the
+    unfinished jobs again, including those that were running.
+    """
+
+    def __init__(
+        self,
+        store: MatchStore,
+        workers: int = JOB_WORKERS,
+        max_queued: int = JOB_QUEUE_MAX,
+        clock: Callable[[], float] = time.time
+    ):
+        self.store = store
+        self.workers = workers
+        self.max_queued = max_queued
+        self.clock = clock
+        self._handlers: Dict[str, JobHandler] = {}
+        # Created by start() so they belong to the running event loop
+        self._queue: Optional["asyncio.Queue[Job]"] = None
+        self._save_lock: Optional[asyncio.Lock] = None
+        self._active: Dict[Tuple[str, str], Job] = {}
+        self._finished: "OrderedDict[str, Job]" = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+        self._saves: Set[asyncio.Task] = set()
+        self.stats = {"submitted": 0, "merged": 0, "rejected": 0, "done": 0, "failed": 0, "restored": 0}
+
+    def register(self, kind: str, handler: JobHandler):
+        self._handlers[kind] = handler
+
+    async def start(self):
+        """Queue the unfinished jobs saved by a previous run and start the workers."""
+        self._queue = asyncio.Queue()
+        self._save_lock = asyncio.Lock()
+        purged = await run_io(self.store.delete_jobs, FINISHED_STATUSES, self.clock() - JOB_RETENTION)
+        if purged:
+            logger.info(f"Removed {purged} finished jobs older than {JOB_RETENTION:.0f}s")
+        for data in await run_io(self.store.get_jobs, ACTIVE_STATUSES):
+            job = Job.from_dict(data)
+            job.status = QUEUED
+            self._active[(job.kind, job.key)] = job
+            self._queue.put_nowait(job)
+            self.stats["restored"] += 1
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stop the workers; jobs they were running stay saved as running and resume on the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._saves:
+            await asyncio.gather(*self._saves, return_exceptions=True)
+
+    async def submit(self, kind: str, key: str, params: Dict) -> Tuple[Job, bool]:
+        """Queue a job, or find the queued or running duplicate. Returns the job and whether it is new."""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        job = self._active.get((kind, key))
+        if job is not None:
+            job.merged += 1
+            self.stats["merged"] += 1
+            return job, False
+        if self._queue is None:
+            raise RuntimeError("Job queue isn't started")
+        if self._queue.qsize() >= self.max_queued:
+            self.stats["rejected"] += 1
+            raise ValueError(f"Job queue is full ({self.max_queued} jobs waiting)")
+
+        job = Job(uuid.uuid4().hex, kind, key, params, self.clock())
+        self._active[(kind, key)] = job
+        await self._save(job)
+        self._queue.put_nowait(job)
+        self.stats["submitted"] += 1
+        return job, True
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Find a job by id, in memory or in the store."""
+        for job in self._active.values():
+            if job.job_id == job_id:
+                return job
+        job = self._finished.get(job_id)
+        if job is not None:
+            return job
+        data = await run_io(self.store.get_job, job_id)
+        return Job.from_dict(data) if data else None
+
+    async def _save(self, job: Job):
+        # One write at a time, each taking its snapshot when it starts, so an
+        # earlier progress save can never land after the final one
+        async with self._save_lock:
+            job.saved_at = self.clock()
+            await run_io(self.store.save_job, job.job_id, job.status, job.saved_at, job.to_dict())
+
+    def _report(self, job: Job, **progress):
+        job.progress.update(progress)
+        if self.clock() - job.saved_at >= JOB_PROGRESS_SAVE_INTERVAL:
+            job.saved_at = self.clock()
+            task = asyncio.ensure_future(self._save(job))
+            self._saves.add(task)
+            task.add_done_callback(self._saves.discard)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = RUNNING
+        job.started_at = self.clock()
+        await self._save(job)
+        try:
+            job.result = await self._handlers[job.kind](job.params, lambda **progress: self._report(job, **progress))
+            job.status = DONE
+            self.stats["done"] += 1
+        except asyncio.CancelledError:
+            # Shutting down; the job is still saved as running and is queued again on restart
+            raise
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+            self.stats["failed"] += 1
+            logger.warning(f"Job {job.job_id} ({job.kind}) failed: {str(e)}")
+        job.finished_at = self.clock()
+        del self._active[(job.kind, job.key)]
+        self._finished[job.job_id] = job
+        while len(self._finished) > JOB_MEMORY_MAX:
+            self._finished.popitem(last=False)
+        await self._save(job)
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": sum(1 for job in self._active.values() if job.status == RUNNING),
+            "workers": self.workers,
+            "max_queued": self.max_queued
+        }
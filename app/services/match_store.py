@@ -0,0 +1,305 @@
+import json
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MATCH = "match"
+TIMELINE = "timeline"
+
+
+def encode_payload(data: Dict) -> bytes:
+    """Serialize a payload as compact, zlib-compressed JSON."""
+    return encode_payload_sized(data)[0]
+
+
+def encode_payload_sized(data: Dict) -> Tuple[bytes, int]:
+    """encode_payload, plus the uncompressed JSON size in bytes."""
+    raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    return zlib.compress(raw, 6), len(raw)
+
+
+def decode_payload(blob: bytes) -> Dict:
+    """Inverse of encode_payload."""
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+class MatchStore:
+    """Single-file SQLite store of compressed match-v5 and timeline payloads.
+
+    Payloads are keyed by (match_id, kind) where kind is 'match' or
+    'timeline', so one database file replaces the per-match JSON files in
+    data/. The connection is shared between threads and guarded by a lock.
+    """
+
+    def __init__(self, path: str = "data/matches.db"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS payloads ("
+            " match_id TEXT NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " data BLOB NOT NULL,"
+            " PRIMARY KEY (match_id, kind)"
+            ") WITHOUT ROWID"
+        )
+        # Match ids known per PUUID; higher sort_key means more recent
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS match_history ("
+            " puuid TEXT NOT NULL,"
+            " match_id TEXT NOT NULL,"
+            " sort_key INTEGER NOT NULL,"
+            " PRIMARY KEY (puuid, match_id)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS match_history_order ON match_history (puuid, sort_key)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS history_sync ("
+            " puuid TEXT PRIMARY KEY,"
+            " state TEXT NOT NULL"
+            ")"
+        )
+        # Computed per-match analyses; version identifies the analysis code
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " match_id TEXT NOT NULL,"
+            " puuid TEXT NOT NULL,"
+            " version TEXT NOT NULL,"
+            " data BLOB NOT NULL,"
+            " PRIMARY KEY (match_id, puuid, version)"
+            ") WITHOUT ROWID"
+        )
+        # Background jobs; data holds parameters, progress and the result
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " data BLOB NOT NULL"
+            ")"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, updated_at)")
+        self._conn.commit()
+
+    def get(self, match_id: str, kind: str = MATCH) -> Optional[Dict]:
+        """Get one payload, or None if it isn't stored."""
+        stored = self.get_sized(match_id, kind)
+        return stored[0] if stored else None
+
+    def get_sized(self, match_id: str, kind: str = MATCH) -> Optional[Tuple[Dict, int]]:
+        """Get one payload with its uncompressed JSON size in bytes."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM payloads WHERE match_id = ? AND kind = ?",
+                (match_id, kind)
+            ).fetchone()
+        if not row:
+            return None
+        raw = zlib.decompress(row[0])
+        return json.loads(raw.decode('utf-8')), len(raw)
+
+    def get_many(self, match_ids: Iterable[str], kind: str = MATCH) -> Dict[str, Dict]:
+        """Get several payloads at once; ids that aren't stored are left out."""
+        match_ids = list(match_ids)
+        rows: List[Tuple[str, bytes]] = []
+        with self._lock:
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(match_ids), 500):
+                chunk = match_ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows.extend(self._conn.execute(
+                    f"SELECT match_id, data FROM payloads WHERE kind = ? AND match_id IN ({placeholders})",
+                    (kind, *chunk)
+                ).fetchall())
+        return {match_id: decode_payload(blob) for match_id, blob in rows}
+
+    def put(self, match_id: str, data: Dict, kind: str = MATCH) -> int:
+        """Store or replace one payload, returning its uncompressed JSON size in bytes."""
+        blob, size = encode_payload_sized(data)
+        self._insert([(match_id, kind, blob)])
+        return size
+
+    def put_many(self, items: Iterable[Tuple[str, Dict]], kind: str = MATCH) -> int:
+        """Store or replace several payloads in one transaction."""
+        return self._insert([(match_id, kind, encode_payload(data)) for match_id, data in items])
+
+    def _insert(self, rows: List[Tuple[str, str, bytes]]) -> int:
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO payloads (match_id, kind, data) VALUES (?, ?, ?)",
+                    rows
+                )
+        return len(rows)
+
+    def contains(self, match_id: str, kind: str = MATCH) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM payloads WHERE match_id = ? AND kind = ?",
+                (match_id, kind)
+            ).fetchone()
+        return row is not None
+
+    def match_ids(self, kind: str = MATCH) -> List[str]:
+        """List the ids of every stored payload of a kind."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT match_id FROM payloads WHERE kind = ? ORDER BY match_id", (kind,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, kind: str = MATCH) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM payloads WHERE kind = ?", (kind,)
+            ).fetchone()[0]
+
+    def delete(self, match_id: str, kind: str = MATCH):
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM payloads WHERE match_id = ? AND kind = ?", (match_id, kind)
+                )
+
+    def add_history_ids(self, puuid: str, match_ids: List[str], newer: bool) -> int:
+        """Record match ids for a PUUID, given newest first.
+
+        Ids from a sync of newer games are placed above everything already
+        known; ids from a page of older history are placed below it. Ids that
+        are already known keep their position. Returns how many were new.
+        """
+        with self._lock:
+            with self._conn:
+                low, high = self._conn.execute(
+                    "SELECT MIN(sort_key), MAX(sort_key) FROM match_history WHERE puuid = ?", (puuid,)
+                ).fetchone()
+                if newer:
+                    base = (high or 0) + len(match_ids)
+                    keys = [base - i for i in range(len(match_ids))]
+                else:
+                    base = (low or 0) - 1
+                    keys = [base - i for i in range(len(match_ids))]
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO match_history (puuid, match_id, sort_key) VALUES (?, ?, ?)",
+                    [(puuid, match_id, key) for match_id, key in zip(match_ids, keys)]
+                )
+                return self._conn.total_changes - before
+
+    def get_history_ids(self, puuid: str, limit: int, offset: int = 0) -> List[str]:
+        """Get known match ids for a PUUID, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT match_id FROM match_history WHERE puuid = ?"
+                " ORDER BY sort_key DESC LIMIT ? OFFSET ?",
+                (puuid, limit, offset)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_oldest_history_id(self, puuid: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT match_id FROM match_history WHERE puuid = ? ORDER BY sort_key ASC LIMIT 1", (puuid,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def count_history_ids(self, puuid: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM match_history WHERE puuid = ?", (puuid,)
+            ).fetchone()[0]
+
+    def get_history_state(self, puuid: str) -> Optional[Dict]:
+        """Get the history sync state saved for a PUUID."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM history_sync WHERE puuid = ?", (puuid,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_history_state(self, puuid: str, state: Dict):
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO history_sync (puuid, state) VALUES (?, ?)",
+                    (puuid, json.dumps(state))
+                )
+
+    def get_analyses(self, puuid: str, match_ids: Iterable[str], version: str) -> Dict[str, Dict]:
+        """Get stored analyses of a PUUID's matches for one analysis version, keyed by match id."""
+        match_ids = list(match_ids)
+        rows: List[Tuple[str, bytes]] = []
+        with self._lock:
+            for start in range(0, len(match_ids), 500):
+                chunk = match_ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows.extend(self._conn.execute(
+                    "SELECT match_id, data FROM analyses"
+                    f" WHERE puuid = ? AND version = ? AND match_id IN ({placeholders})",
+                    (puuid, version, *chunk)
+                ).fetchall())
+        return {match_id: decode_payload(blob) for match_id, blob in rows}
+
+    def put_analyses(self, puuid: str, analyses: Iterable[Tuple[str, Dict]], version: str) -> int:
+        """Store or replace analyses of a PUUID's matches in one transaction."""
+        rows = [(match_id, puuid, version, encode_payload(data)) for match_id, data in analyses]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO analyses (match_id, puuid, version, data) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+        return len(rows)
+
+    def delete_stale_analyses(self, version: str) -> int:
+        """Delete analyses computed by any other analysis version. Returns how many were deleted."""
+        with self._lock:
+            with self._conn:
+                return self._conn.execute(
+                    "DELETE FROM analyses WHERE version != ?", (version,)
+                ).rowcount
+
+    def save_job(self, job_id: str, status: str, updated_at: float, data: Dict):
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO jobs (job_id, status, updated_at, data) VALUES (?, ?, ?, ?)",
+                    (job_id, status, updated_at, encode_payload(data))
+                )
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return decode_payload(row[0]) if row else None
+
+    def get_jobs(self, statuses: Iterable[str]) -> List[Dict]:
+        """Get jobs in any of the given statuses, least recently updated first."""
+        statuses = list(statuses)
+        placeholders = ','.join('?' * len(statuses))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT data FROM jobs WHERE status IN ({placeholders}) ORDER BY updated_at", statuses
+            ).fetchall()
+        return [decode_payload(row[0]) for row in rows]
+
+    def delete_jobs(self, statuses: Iterable[str], updated_before: float) -> int:
+        """Delete jobs in the given statuses last updated before a time. Returns how many were deleted."""
+        statuses = list(statuses)
+        placeholders = ','.join('?' * len(statuses))
+        with self._lock:
+            with self._conn:
+                return self._conn.execute(
+                    f"DELETE FROM jobs WHERE status IN ({placeholders}) AND updated_at < ?",
+                    (*statuses, updated_before)
+                ).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
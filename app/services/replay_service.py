@@ -4,6 +4,7 @@ from datetime import datetime
 from typing import List, Dict, Optional
 import logging
 from ..models.replay import ProcessedReplay, ReplayListItem, GameState, ChampionState
+from .async_io import run_io, atomic_write_json
 
 logger = logging.getLogger(__name__)
 
@@ -16,13 +17,16 @@ class ReplayService:
         """Save a processed replay to disk."""
         try:
             file_path = os.path.join(self.data_dir, f"{replay.match_id}.json")
-            with open(file_path, 'w') as f:
-                json.dump(replay.dict(), f, default=str)
+            atomic_write_json(file_path, replay.dict(), default=str)
             logger.info(f"Saved replay {replay.match_id}")
         except Exception as e:
             logger.error(f"Error saving replay {replay.match_id}: {str(e)}")
             raise
 
+    async def save_replay_async(self, replay: ProcessedReplay) -> None:
+        """Save a processed replay without blocking the event loop."""
+        await run_io(self.save_replay, replay)
+
     def load_replay(self, match_id: str) -> ProcessedReplay:
         """Load a processed replay from disk."""
         try:
@@ -37,6 +41,10 @@ class ReplayService:
             logger.error(f"Error loading replay {match_id}: {str(e)}")
             raise
 
+    async def load_replay_async(self, match_id: str) -> ProcessedReplay:
+        """Load a processed replay without blocking the event loop."""
+        return await run_io(self.load_replay, match_id)
+
     def list_replays(self) -> List[ReplayListItem]:
         """List all available replays."""
         try:
@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from ..api.cache import TTLCache, estimate_size
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached response is served as is, then how much longer it is served while refreshing
+ANALYZE_RESPONSE_TTL = float(os.getenv("ANALYZE_RESPONSE_TTL", "120"))
+ANALYZE_RESPONSE_STALE_TTL = float(os.getenv("ANALYZE_RESPONSE_STALE_TTL", "1800"))
+ANALYZE_RESPONSE_CACHE_MAX_BYTES = int(os.getenv("ANALYZE_RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# A response body with its ETag and serialized length, as body_etag gives them
+BuiltBody = Tuple[Dict, str, int]
+
+# Builds a response body and its ETag; the flag says whether upstream caches may be used
+ResponseBuilder = Callable[[bool], Awaitable[BuiltBody]]
+
+
+def strong_etag(*parts: str) -> str:
+    """Quoted ETag hashed from the parts that determine a response."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def body_etag(body: Dict) -> Tuple[str, int]:
+    """Strong ETag of a JSON body, hashed from the same bytes JSONResponse sends for it, and their length."""
+    serialized = json.dumps(body, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+    return strong_etag(serialized), len(serialized)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag, using weak comparison as RFC 9110 requires."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+class CachedResponse:
+    __slots__ = ('body', 'etag', 'created_at')
+
+    def __init__(self, body: Dict, etag: str, created_at: float):
+        self.body = body
+        self.etag = etag
+        self.created_at = created_at
+
+
+class ResponseCache:
+    """Whole responses with ETags, served stale while a background refresh runs.
+
+    An entry younger than `ttl` is returned as is. Up to `stale_ttl` seconds
+    after that it is still returned at once, and one refresh per key is
+    started in the background; older entries are rebuilt before responding.
+    Concurrent builds of one key share a single task. A refresh that yields
+    the same ETag keeps the previous body, so an ETag always stands for the
+    same bytes.
+    """
+
+    def __init__(
+        self,
+        ttl: float = ANALYZE_RESPONSE_TTL,
+        stale_ttl: float = ANALYZE_RESPONSE_STALE_TTL,
+        memory: Optional[TTLCache] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self.memory = memory or TTLCache(max_entries=5000, max_bytes=ANALYZE_RESPONSE_CACHE_MAX_BYTES, clock=clock)
+        self._building: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {
+            "fresh_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "bypasses": 0,
+            "builds": 0,
+            "refresh_errors": 0,
+            "not_modified": 0
+        }
+
+    async def get(self, key: Hashable, build: ResponseBuilder, use_cache: bool = True) -> Tuple[CachedResponse, str]:
+        """Get a response and how it was served: 'fresh', 'stale', 'miss' or 'bypass'.
+
+        With use_cache False the cached entry is skipped and replaced.
+        """
+        if not use_cache:
+            self.stats["bypasses"] += 1
+            return await self._build(key, build, False), "bypass"
+
+        found = self.lookup(key, build)
+        if found is not None:
+            return found
+
+        self.stats["misses"] += 1
+        return await self._build(key, build, True), "miss"
+
+    def lookup(self, key: Hashable, build: ResponseBuilder) -> Optional[Tuple[CachedResponse, str]]:
+        """Get a cached response served 'fresh' or 'stale', refreshing stale ones; None on a miss."""
+        entry = self.memory.get(key)
+        if entry is None:
+            return None
+        if self.clock() - entry.created_at < self.ttl:
+            self.stats["fresh_hits"] += 1
+            return entry, "fresh"
+        self.stats["stale_hits"] += 1
+        self.refresh(key, build)
+        return entry, "stale"
+
+    def refresh(self, key: Hashable, build: ResponseBuilder):
+        """Rebuild an entry in the background, bypassing upstream caches."""
+        if key in self._building:
+            return
+        task = self._start(key, build, False)
+        task.add_done_callback(self._log_refresh_error)
+
+    def _log_refresh_error(self, task: asyncio.Task):
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            # The stale entry stays in place until it expires
+            self.stats["refresh_errors"] += 1
+            logger.warning(f"Background response refresh failed: {error}")
+
+    def _start(self, key: Hashable, build: ResponseBuilder, use_cache: bool) -> asyncio.Task:
+        task = asyncio.ensure_future(self._store(key, build, use_cache))
+        self._building[key] = task
+        task.add_done_callback(lambda _: self._building.pop(key, None))
+        return task
+
+    async def _build(self, key: Hashable, build: ResponseBuilder, use_cache: bool) -> CachedResponse:
+        task = self._building.get(key)
+        if task is None:
+            task = self._start(key, build, use_cache)
+        # Shielded so one client disconnecting doesn't cancel a build others are waiting on
+        return await asyncio.shield(task)
+
+    async def _store(self, key: Hashable, build: ResponseBuilder, use_cache: bool) -> CachedResponse:
+        body, etag, size = await build(use_cache)
+        self.stats["builds"] += 1
+        return self.put(key, body, etag, size)
+
+    def put(self, key: Hashable, body: Dict, etag: str, size: Optional[int] = None) -> CachedResponse:
+        """Store a built response, keeping the previous body if the ETag is unchanged.
+
+        `size` is the body's serialized length, estimated when not given.
+        """
+        # Peeked, so replacing an entry doesn't count as a hit or refresh its LRU position
+        previous = self.memory.peek(key)
+        if previous is not None and previous.etag == etag:
+            body = previous.body
+        entry = CachedResponse(body, etag, self.clock())
+        self.memory.set(key, entry, self.ttl + self.stale_ttl, size=size if size is not None else estimate_size(body))
+        return entry
+
+    def not_modified(self, entry: CachedResponse, if_none_match: Optional[str]) -> bool:
+        """Check whether a client's If-None-Match already names this entry."""
+        if etag_matches(if_none_match, entry.etag):
+            self.stats["not_modified"] += 1
+            return True
+        return False
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "ttl": self.ttl, "stale_ttl": self.stale_ttl, "memory": self.memory.get_stats()}
@@ -96,9 +96,14 @@ document.addEventListener('DOMContentLoaded', () => {
             if (!useCache || data.match_count.new > 0) {
                 loadingSpinner.classList.remove('hidden');
 
-                // Fetch fresh data in the background
-                const freshResponse = await fetch(`/api/analyze/${currentSummoner}?region=${currentRegion}&match_count=20&use_cache=false`);
-                if (freshResponse.ok) {
+                // Fetch fresh data in the background. Only an explicit refresh bypasses the
+                // server cache; otherwise revalidate, and a 304 means nothing changed
+                const freshUrl = `/api/analyze/${currentSummoner}?region=${currentRegion}&match_count=20`;
+                const etag = response.headers.get('ETag');
+                const freshResponse = useCache
+                    ? await fetch(freshUrl, { headers: etag ? { 'If-None-Match': etag } : {} })
+                    : await fetch(`${freshUrl}&use_cache=false`);
+                if (freshResponse.ok && freshResponse.status !== 304) {
                     const freshData = await freshResponse.json();
                     
                     // Update UI with fresh data
@@ -0,0 +1,31 @@
+import asyncio
+from typing import List
+import pytest
+
+
+class FakeClock:
+    """Manually advanced clock for exercising the rate limiter without real waiting.
+
+    Pass `clock.time` and `clock.sleep` to RateLimiter; sleeping advances the
+    clock instantly and records the requested delay.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self.sleeps: List[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    async def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
@@ -0,0 +1,36 @@
+from app.analysis.baselines import ANY, BaselineEngine
+from app.benchmarks.synthetic import generate_matches
+
+
+def _ingested(count: int = 60) -> BaselineEngine:
+    engine = BaselineEngine(min_samples=1)
+    engine.ingest_many(generate_matches(count, seed=7))
+    return engine
+
+
+def test_any_queue_scope_counts_every_queue():
+    engine = _ingested()
+    per_queue = sum(
+        len(sketches["kda"]) for (champion, position, queue), sketches in engine.sketches.items()
+        if champion == ANY and position == ANY and queue != ANY
+    )
+    result = engine.percentile("kda", 3.0)
+    assert result["scope"] == {"champion": ANY, "position": ANY, "queue": ANY}
+    assert result["samples"] == per_queue == 60 * 10
+
+
+def test_any_queue_scope_updates_on_ingest():
+    engine = _ingested()
+    before = engine.percentile("deaths", 5)["samples"]
+    engine.ingest_many(generate_matches(61, seed=7)[60:])
+    assert engine.percentile("deaths", 5)["samples"] == before + 10
+
+
+def test_version_1_files_rebuild_any_queue_scopes():
+    engine = _ingested()
+    data = engine.to_dict()
+    del data["version"]
+    data["sketches"] = [entry for entry in data["sketches"] if entry["key"][2] != ANY]
+    loaded = BaselineEngine.from_dict(data, min_samples=1)
+    assert loaded.percentile("kda", 3.0)["samples"] == engine.percentile("kda", 3.0)["samples"]
+    assert sorted(loaded.sketches) == sorted(engine.sketches)
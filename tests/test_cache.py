@@ -0,0 +1,41 @@
+from app.api.cache import TTLCache
+
+
+def test_oversized_value_replaces_old_entry():
+    cache = TTLCache(max_bytes=100)
+    cache.set(("match", "NA1_1"), {"v": 1}, ttl=60)
+    cache.set(("match", "NA1_1"), {"v": "x" * 200}, ttl=60)
+    assert cache.get(("match", "NA1_1")) is None
+    assert cache.total_bytes == 0
+
+
+def test_expired_entries_are_missed():
+    now = [0.0]
+    cache = TTLCache(clock=lambda: now[0])
+    cache.set(("account", "a"), {"puuid": "p"}, ttl=10)
+    assert cache.get(("account", "a")) == {"puuid": "p"}
+    now[0] = 10
+    assert cache.get(("account", "a")) is None
+    assert cache.stats["expirations"] == 1
+
+
+def test_least_recently_used_is_evicted_first():
+    cache = TTLCache(max_entries=2)
+    cache.set(("k", 1), 1, ttl=60)
+    cache.set(("k", 2), 2, ttl=60)
+    cache.get(("k", 1))
+    cache.set(("k", 3), 3, ttl=60)
+    assert cache.get(("k", 2)) is None
+    assert cache.get(("k", 1)) == 1
+    assert cache.get(("k", 3)) == 3
+
+
+def test_peek_neither_counts_nor_promotes():
+    cache = TTLCache(max_entries=2)
+    cache.set(("k", 1), 1, ttl=60)
+    cache.set(("k", 2), 2, ttl=60)
+    assert cache.peek(("k", 1)) == 1
+    assert cache.peek(("k", 9)) is None
+    assert cache.stats["hits"] == cache.stats["misses"] == 0
+    cache.set(("k", 3), 3, ttl=60)
+    assert cache.peek(("k", 1)) is None
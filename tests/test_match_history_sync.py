@@ -0,0 +1,75 @@
+import asyncio
+from typing import Dict, List, Optional
+from app.api.match_history_sync import PAGE_SIZE, MatchHistorySync
+from app.services.match_store import MatchStore
+
+
+class FakeHistoryClient:
+    """Serves a player's match list like match-v5, newest first, with one game a minute."""
+
+    def __init__(self, store: MatchStore, games: int):
+        self.match_store = store
+        self.starts: Dict[str, int] = {}
+        self.history: List[str] = []
+        for _ in range(games):
+            self.play()
+        self.pages = 0
+        self.after_page = None
+
+    def play(self):
+        match_id = f"NA1_{len(self.starts) + 1}"
+        self.starts[match_id] = (len(self.starts) + 1) * 60000
+        self.history.insert(0, match_id)
+
+    async def get_match_history(
+        self, puuid, region, count=10, use_cache=True, start=0, start_time=None, end_time=None
+    ) -> List[str]:
+        ids = [
+            match_id for match_id in self.history
+            if (start_time is None or self.starts[match_id] // 1000 >= start_time)
+            and (end_time is None or self.starts[match_id] // 1000 <= end_time)
+        ]
+        self.pages += 1
+        page = ids[start:start + count]
+        if self.after_page:
+            self.after_page(self.pages)
+        return page
+
+    async def get_match(self, match_id, region) -> Optional[Dict]:
+        return {"info": {"gameStartTimestamp": self.starts[match_id]}}, "memory"
+
+
+def known_ids(store: MatchStore) -> List[str]:
+    return store.get_history_ids("p", 100000)
+
+
+def test_backfill_pages_whole_history(tmp_path):
+    store = MatchStore(str(tmp_path / "matches.db"))
+    client = FakeHistoryClient(store, 350)
+    asyncio.run(MatchHistorySync(client).backfill("p", "na1", 1000))
+    assert known_ids(store) == client.history
+    assert store.get_history_state("p")["backfill_complete"]
+
+
+def test_games_played_during_backfill_leave_no_gaps(tmp_path):
+    store = MatchStore(str(tmp_path / "matches.db"))
+    client = FakeHistoryClient(store, 350)
+    # A new game finishes after every page, shifting every position in Riot's list
+    client.after_page = lambda pages: client.play()
+    sync = MatchHistorySync(client)
+    asyncio.run(sync.backfill("p", "na1", 200))
+    # The next sync picks up the new games, then a later backfill continues
+    asyncio.run(sync.sync("p", "na1"))
+    asyncio.run(sync.backfill("p", "na1", 1000))
+    client.after_page = None
+    asyncio.run(sync.sync("p", "na1"))
+    assert known_ids(store) == client.history
+
+
+def test_backfill_stops_at_limit(tmp_path):
+    store = MatchStore(str(tmp_path / "matches.db"))
+    client = FakeHistoryClient(store, 1000)
+    asyncio.run(MatchHistorySync(client).backfill("p", "na1", 250))
+    assert 250 <= store.count_history_ids("p") < 250 + PAGE_SIZE
+    assert known_ids(store) == client.history[:len(known_ids(store))]
+    assert not store.get_history_state("p")["backfill_complete"]
@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+from app.api.rate_limiter import RateLimiter, get_endpoint_family, parse_rate_limits
+
+
+def acquire(limiter: RateLimiter, times: int, routing: str = "americas", family: str = "match"):
+    async def run():
+        for _ in range(times):
+            await limiter.acquire(routing, family)
+    asyncio.run(run())
+
+
+def test_parse_rate_limits_skips_malformed_parts():
+    assert parse_rate_limits("20:1,100:120") == [(20, 1), (100, 120)]
+    assert parse_rate_limits("20:1,oops,5") == [(20, 1)]
+    assert parse_rate_limits(None) == []
+
+
+def test_endpoint_family():
+    assert get_endpoint_family("/lol/match/v5/matches/NA1_1") == "match"
+    assert get_endpoint_family("/riot/account/v1/accounts/by-riot-id/a/b") == "account"
+    assert get_endpoint_family("/lol/status/v4/platform-data") == "other"
+
+
+def test_app_limit_paces_short_window_burst(clock):
+    limiter = RateLimiter("2:1,100:120", clock=clock.time, sleep=clock.sleep)
+    acquire(limiter, 2)
+    assert clock.sleeps == []
+    acquire(limiter, 1)
+    # 2 tokens per second refill, so the third request waits half a second
+    assert clock.sleeps == [pytest.approx(0.5)]
+    assert limiter.get_stats()["delayed"] == 1
+
+
+def test_app_limit_paces_long_window(clock):
+    limiter = RateLimiter("100:1,3:30", clock=clock.time, sleep=clock.sleep)
+    acquire(limiter, 3)
+    assert clock.sleeps == []
+    acquire(limiter, 1)
+    # The 30 second window refills one token every 10 seconds
+    assert sum(clock.sleeps) == pytest.approx(10)
+
+
+def test_app_limit_is_per_routing_value(clock):
+    limiter = RateLimiter("1:1", clock=clock.time, sleep=clock.sleep)
+    acquire(limiter, 1, routing="americas")
+    acquire(limiter, 1, routing="europe")
+    assert clock.sleeps == []
+    assert limiter.delay("americas", "match") == pytest.approx(1)
+
+
+def test_method_limit_from_headers_only_holds_its_family(clock):
+    limiter = RateLimiter("100:1", clock=clock.time, sleep=clock.sleep)
+    acquire(limiter, 1)
+    limiter.update("americas", "match", {"X-Method-Rate-Limit": "1:5", "X-Method-Rate-Limit-Count": "1:5"})
+    assert limiter.delay("americas", "match") == pytest.approx(5)
+    assert limiter.delay("americas", "summoner") == 0
+    acquire(limiter, 1)
+    assert clock.sleeps == [pytest.approx(5)]
+
+
+def test_app_rate_limit_count_header_syncs_buckets(clock):
+    limiter = RateLimiter("20:1,100:120", clock=clock.time, sleep=clock.sleep)
+    assert limiter.delay("americas", "match") == 0
+    # Another process sharing the key has used the whole short window
+    limiter.update("americas", "match", {"X-App-Rate-Limit": "20:1,100:120", "X-App-Rate-Limit-Count": "20:1,20:120"})
+    assert limiter.delay("americas", "match") == pytest.approx(1 / 20)
+    clock.advance(1)
+    assert limiter.delay("americas", "match") == 0
+    assert limiter.get_stats()["app"]["americas"]["limits"]["100:120"] == pytest.approx(80, abs=1)
+
+
+def test_new_app_limits_from_headers_replace_defaults(clock):
+    limiter = RateLimiter("20:1", clock=clock.time, sleep=clock.sleep)
+    limiter.update("americas", "match", {"X-App-Rate-Limit": "500:10", "X-App-Rate-Limit-Count": "1:10"})
+    assert list(limiter.get_stats()["app"]["americas"]["limits"]) == ["500:10"]
+
+
+def test_retry_after_blocks_routing_value(clock):
+    limiter = RateLimiter("100:1", clock=clock.time, sleep=clock.sleep)
+    retry_after = limiter.on_rate_limited("americas", "match", {"Retry-After": "7", "X-Rate-Limit-Type": "application"})
+    assert retry_after == 7
+    assert limiter.delay("americas", "summoner") == pytest.approx(7)
+    assert limiter.delay("europe", "match") == 0
+    acquire(limiter, 1)
+    assert clock.sleeps == [pytest.approx(7)]
+    assert limiter.get_stats()["throttled"] == 1
+
+
+def test_method_retry_after_only_blocks_its_family(clock):
+    limiter = RateLimiter("100:1", clock=clock.time, sleep=clock.sleep)
+    limiter.on_rate_limited("americas", "match", {"Retry-After": "3", "X-Rate-Limit-Type": "method"})
+    assert limiter.delay("americas", "match") == pytest.approx(3)
+    assert limiter.delay("americas", "summoner") == 0
+
+
+def test_missing_or_bad_retry_after_uses_default(clock):
+    limiter = RateLimiter("100:1", clock=clock.time, sleep=clock.sleep, default_retry_after=2)
+    assert limiter.on_rate_limited("americas", "match", {}) == 2
+    assert limiter.on_rate_limited("americas", "match", {"Retry-After": "soon"}) == 2
+    assert limiter.delay("americas", "match") == pytest.approx(2)
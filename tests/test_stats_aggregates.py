@@ -0,0 +1,138 @@
+import json
+import random
+from typing import Dict, List, Optional
+import pytest
+from app.analysis.stats_analyzer import StatsAnalyzer
+from app.benchmarks.synthetic import generate_matches, player_pool
+
+def _first_participants(matches: List[Dict], puuid: str) -> List[Dict]:
+    """The player's first participant entry in each match, in match order."""
+    found = []
+    for match in matches:
+        for participant in match['info']['participants']:
+            if participant['puuid'] == puuid:
+                found.append(participant)
+                break
+    return found
+
+def reference_player_stats(matches: List[Dict], puuid: Optional[str]) -> Dict:
+    """get_player_stats computed from scratch, as StatsAnalyzer did before running aggregates."""
+    players = _first_participants(matches, puuid) if puuid else []
+    if not players:
+        return StatsAnalyzer().get_player_stats()
+
+    total_matches = len(players)
+    wins = sum(1 for p in players if p['win'])
+    kills = sum(p['kills'] for p in players)
+    deaths = sum(p['deaths'] for p in players)
+    assists = sum(p['assists'] for p in players)
+    kda = 0.0
+    if deaths > 0:
+        kda = (kills + assists) / deaths
+    elif kills + assists > 0:
+        kda = kills + assists
+
+    champions_played = {}
+    positions_played = {}
+    for p in players:
+        champion = champions_played.setdefault(p['championName'], {"games": 0, "wins": 0, "kills": 0, "deaths": 0, "assists": 0})
+        champion["games"] += 1
+        champion["wins"] += 1 if p['win'] else 0
+        champion["kills"] += p['kills']
+        champion["deaths"] += p['deaths']
+        champion["assists"] += p['assists']
+        position = positions_played.setdefault(p['teamPosition'], {"games": 0, "wins": 0})
+        position["games"] += 1
+        position["wins"] += 1 if p['win'] else 0
+
+    return {
+        "total_matches": total_matches,
+        "wins": wins,
+        "losses": total_matches - wins,
+        "win_rate": round(wins / total_matches * 100, 2),
+        "kills": kills,
+        "deaths": deaths,
+        "assists": assists,
+        "kda": round(kda, 2),
+        "total_damage_dealt": sum(p['totalDamageDealtToChampions'] for p in players),
+        "total_damage_taken": sum(p['totalDamageTaken'] for p in players),
+        "total_gold_earned": sum(p['goldEarned'] for p in players),
+        "vision_score": sum(p['visionScore'] for p in players),
+        "champions_played": champions_played,
+        "positions_played": positions_played
+    }
+
+def reference_champion_stats(matches: List[Dict], puuid: Optional[str]) -> Dict:
+    """get_champion_stats computed from scratch, as StatsAnalyzer did before running aggregates."""
+    if not puuid:
+        return {}
+    champion_stats = {}
+    for p in _first_participants(matches, puuid):
+        stats = champion_stats.setdefault(p['championName'], {
+            "games_played": 0, "wins": 0, "losses": 0, "kills": 0, "deaths": 0, "assists": 0,
+            "total_damage_dealt": 0, "total_damage_taken": 0, "total_gold_earned": 0,
+            "vision_score": 0, "positions": {}
+        })
+        stats["games_played"] += 1
+        stats["wins"] += 1 if p['win'] else 0
+        stats["losses"] += 0 if p['win'] else 1
+        stats["kills"] += p['kills']
+        stats["deaths"] += p['deaths']
+        stats["assists"] += p['assists']
+        stats["total_damage_dealt"] += p['totalDamageDealtToChampions']
+        stats["total_damage_taken"] += p['totalDamageTaken']
+        stats["total_gold_earned"] += p['goldEarned']
+        stats["vision_score"] += p['visionScore']
+        stats["positions"][p['individualPosition']] = stats["positions"].get(p['individualPosition'], 0) + 1
+
+    for stats in champion_stats.values():
+        games = stats["games_played"]
+        stats["win_rate"] = stats["wins"] / games * 100
+        deaths = stats["deaths"]
+        stats["kda"] = (stats["kills"] + stats["assists"]) / deaths if deaths > 0 else stats["kills"] + stats["assists"]
+        stats["avg_kills"] = stats["kills"] / games
+        stats["avg_deaths"] = stats["deaths"] / games
+        stats["avg_assists"] = stats["assists"] / games
+        stats["avg_damage"] = stats["total_damage_dealt"] / games
+        stats["avg_gold"] = stats["total_gold_earned"] / games
+        stats["avg_vision"] = stats["vision_score"] / games
+    return champion_stats
+
+def run_trial(seed: int, operations: int, pool_size: int) -> int:
+    """Apply random adds, re-adds, removals and player switches, checking every read.
+
+    Returns the number of comparisons made. Raises AssertionError on the first mismatch.
+    """
+    rnd = random.Random(seed)
+    candidates = generate_matches(operations, seed=seed, pool_size=pool_size)
+    pool = player_pool(pool_size)
+    analyzer = StatsAnalyzer()
+    stored: List[Dict] = []
+    checks = 0
+
+    for step in range(operations):
+        roll = rnd.random()
+        if roll < 0.6 or not stored:
+            match = rnd.choice(candidates) if rnd.random() < 0.1 else candidates[step]
+            analyzer.add_match(match)
+            stored.append(match)
+        elif roll < 0.8:
+            match_id = rnd.choice(stored)['metadata']['matchId']
+            assert analyzer.remove_match(match_id)
+            stored = [m for m in stored if m['metadata']['matchId'] != match_id]
+        elif roll < 0.9:
+            analyzer.puuid = rnd.choice(pool)
+
+        if rnd.random() < 0.5:
+            expected = (reference_player_stats(stored, analyzer.puuid), reference_champion_stats(stored, analyzer.puuid))
+            actual = (analyzer.get_player_stats(), analyzer.get_champion_stats())
+            # json.dumps compares key order as well as values
+            assert json.dumps(actual) == json.dumps(expected), f"seed {seed}, step {step}, puuid {analyzer.puuid}"
+            checks += 1
+    return checks
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_running_aggregates_match_recompute(seed):
+    # Small player pools repeat players often, exercising switches and removals
+    assert run_trial(seed, operations=150, pool_size=15) > 0